@@ -0,0 +1,82 @@
+"""Initial schema
+
+Matches the tables previously created by ``Base.metadata.create_all``;
+existing databases are stamped at this revision instead of upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('wallet_address', sa.String(length=42), nullable=True),
+        sa.Column('tier', sa.String(length=20), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_wallet_address', 'users', ['wallet_address'])
+
+    op.create_table(
+        'subscriptions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tier', sa.String(length=20), nullable=False),
+        sa.Column('source', sa.String(length=20), nullable=False),
+        sa.Column('token_id', sa.Integer(), nullable=True),
+        sa.Column('token_contract_address', sa.String(length=42), nullable=True),
+        sa.Column('token_network', sa.String(length=20), nullable=True),
+        sa.Column('expires_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_subscriptions_user_id', 'subscriptions', ['user_id'])
+
+    op.create_table(
+        'token_verifications',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('wallet_address', sa.String(length=42), nullable=False),
+        sa.Column('token_id', sa.Integer(), nullable=False),
+        sa.Column('contract_address', sa.String(length=42), nullable=False),
+        sa.Column('network', sa.String(length=20), nullable=False),
+        sa.Column('tier', sa.String(length=20), nullable=False),
+        sa.Column('verified_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('expires_at', sa.TIMESTAMP(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_token_verifications_user_id', 'token_verifications', ['user_id'])
+    op.create_index('ix_token_verifications_wallet_address', 'token_verifications', ['wallet_address'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('token_verifications')
+    op.drop_table('subscriptions')
+    op.drop_table('users')
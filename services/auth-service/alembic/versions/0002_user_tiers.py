@@ -0,0 +1,57 @@
+"""Materialized effective tier and subscription lookup index
+
+Guarded with existence checks because pods running create_all may have
+created these objects before migrations were adopted.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode():
+        existing_indexes, has_user_tiers = set(), False
+    else:
+        inspector = sa.inspect(op.get_bind())
+        existing_indexes = {index['name'] for index in inspector.get_indexes('subscriptions')}
+        has_user_tiers = inspector.has_table('user_tiers')
+
+    if 'idx_subscriptions_user_active_expires' not in existing_indexes:
+        op.create_index(
+            'idx_subscriptions_user_active_expires',
+            'subscriptions',
+            ['user_id', 'is_active', 'expires_at']
+        )
+
+    if not has_user_tiers:
+        op.create_table(
+            'user_tiers',
+            sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('tier', sa.String(length=20), nullable=False),
+            sa.Column('valid_until', sa.TIMESTAMP(), nullable=True),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_tiers')
+    op.drop_index('idx_subscriptions_user_active_expires', table_name='subscriptions')
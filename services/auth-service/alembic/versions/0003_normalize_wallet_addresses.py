@@ -0,0 +1,34 @@
+"""Lower-case stored wallet addresses
+
+Wallet logins look addresses up with a plain equality on the indexed
+column, so addresses linked before they were normalized on write are
+lower-cased here.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "UPDATE users SET wallet_address = LOWER(wallet_address) "
+        "WHERE wallet_address <> LOWER(wallet_address)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema (original casing is not recoverable)."""
+    pass
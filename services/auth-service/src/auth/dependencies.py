@@ -2,15 +2,22 @@
 FastAPI dependencies for authentication
 """
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Security, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 from sqlalchemy.orm import Session
 from typing import Optional
+from uuid import UUID
+import logging
+import os
+import secrets
 from ..database.connection import get_db
 from ..database.models import User
 from .jwt import decode_access_token
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
+service_key_header = APIKeyHeader(name="X-Service-Key", auto_error=False)
 
 
 async def get_current_user(
@@ -28,7 +35,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id = payload.get("sub")
+    try:
+        user_id = UUID(payload.get("sub"))
+    except (TypeError, ValueError):
+        user_id = None
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,3 +70,32 @@ async def get_optional_current_user(
     except HTTPException:
         return None
 
+
+
+async def verify_service_key(
+    service_key: Optional[str] = Security(service_key_header)
+) -> bool:
+    """
+    Verify internal service-to-service key for bulk endpoints.
+    
+    Fails closed when SERVICE_API_KEY is unset, unless
+    ALLOW_UNAUTHENTICATED_SERVICE_CALLS=true outside production.
+    """
+    expected_key = os.getenv("SERVICE_API_KEY")
+    if not expected_key:
+        allow_unauthenticated = os.getenv("ALLOW_UNAUTHENTICATED_SERVICE_CALLS", "false").lower() == "true"
+        if allow_unauthenticated and os.getenv("ENVIRONMENT") != "production":
+            logger.warning("SERVICE_API_KEY not set - allowing unauthenticated bulk access (dev only)")
+            return True
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="SERVICE_API_KEY not configured - server misconfiguration"
+        )
+    
+    if not service_key or not secrets.compare_digest(service_key.encode(), expected_key.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing service key"
+        )
+    
+    return True
@@ -48,15 +48,17 @@ def get_db():
 
 def init_db():
     """
-    Initialize database - create tables if they don't exist.
+    Initialize database according to DB_SCHEMA_MODE.
+    
+    - ``create_all`` (default): create tables if they don't exist
+    - ``migrations``: only verify the schema version; DDL is applied by the
+      one-shot migration job (``python -m src.database.migrations upgrade``)
     """
-    # #region agent log
-    try:
-        from ..debug_log import debug_log
-        debug_log("debug-session", "startup", "H4", "auth-service/src/database/connection.py:51", "init_db() called, checking database connection", {"database_url": DATABASE_URL.split('@')[1] if '@' in DATABASE_URL else "hidden"})
-    except Exception:
-        pass
-    # #endregion
+    if os.getenv("DB_SCHEMA_MODE", "create_all").lower() == "migrations":
+        from .migrations import check_schema_version
+        check_schema_version()
+        return
+    
     try:
         # #region agent log
         try:
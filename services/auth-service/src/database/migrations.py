@@ -0,0 +1,153 @@
+"""
+Schema migrations and startup schema version check
+
+Migrations are applied once per rollout by a one-shot job
+(``python -m src.database.migrations upgrade``). Application pods only
+run ``check_schema_version()``, a single-row read of ``alembic_version``,
+instead of issuing DDL on every boot.
+
+During a rolling deploy the job migrates the database before old pods
+are replaced, so a pod accepts a revision newer than its own head (one
+its build does not know). Migrations must therefore keep the previous
+release working: add columns and tables first, drop them a release later.
+"""
+
+import sys
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+
+from .connection import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision matching the schema created by the old create_all() startup path
+BASELINE_REVISION = "0001"
+BASELINE_TABLE = "users"
+
+# Serializes concurrent migration jobs on PostgreSQL. Advisory lock IDs are
+# shared by every service on a server: see docs/architecture/postgres-advisory-locks.md
+MIGRATION_LOCK_ID = 815_002
+
+
+def _alembic_config() -> Config:
+    """Build Alembic config for this service"""
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+@lru_cache(maxsize=1)
+def get_head_revision() -> str:
+    """Get the latest migration revision shipped with this build"""
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+def is_known_revision(revision: str) -> bool:
+    """Whether a revision is one of this build's migrations"""
+    try:
+        return ScriptDirectory.from_config(_alembic_config()).get_revision(revision) is not None
+    except CommandError:
+        return False
+
+
+def get_current_revision(bind: Engine = engine) -> Optional[str]:
+    """
+    Get the revision the database is at.
+
+    Returns:
+        Revision ID, or None if the database has not been migrated
+    """
+    try:
+        with bind.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        return None
+
+
+def check_schema_version(bind: Engine = engine):
+    """
+    Verify the database schema is at this build's head, or newer.
+
+    This build ships every revision up to its head, so a revision it does
+    not know was added by a newer build (migrated ahead of a rolling
+    deploy) and is accepted with a warning.
+
+    Raises:
+        RuntimeError: If migrations up to this build's head have not been applied
+    """
+    current = get_current_revision(bind)
+    head = get_head_revision()
+    if current == head:
+        logger.info(f"Database schema at revision {current}")
+        return
+    if current is not None and not is_known_revision(current):
+        logger.warning(f"Database schema at revision {current}, newer than this build's {head}")
+        return
+    raise RuntimeError(
+        f"Database schema is at revision {current or 'none'}, expected {head}. "
+        "Run the migration job (python -m src.database.migrations upgrade)."
+    )
+
+
+def run_migrations(bind: Engine = engine) -> str:
+    """
+    Apply all pending migrations.
+
+    Databases created by the old create_all() startup path are stamped at
+    the baseline revision first, then upgraded.
+
+    Returns:
+        Revision the database is at afterwards
+    """
+    config = _alembic_config()
+
+    with bind.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+
+        config.attributes["connection"] = connection
+        inspector = inspect(connection)
+        if not inspector.has_table("alembic_version") and inspector.has_table(BASELINE_TABLE):
+            logger.info(f"Existing schema found, stamping baseline revision {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+
+        command.upgrade(config, "head")
+
+    revision = get_current_revision(bind)
+    logger.info(f"Database migrated to revision {revision}")
+    return revision
+
+
+def main(argv=None) -> int:
+    """Entry point for the one-shot migration job"""
+    logging.basicConfig(level=logging.INFO)
+    action = (argv or sys.argv[1:] or ["upgrade"])[0]
+
+    if action == "upgrade":
+        run_migrations()
+    elif action == "check":
+        try:
+            check_schema_version()
+        except RuntimeError as e:
+            logger.error(str(e))
+            return 1
+    elif action == "current":
+        print(get_current_revision() or "none")
+    else:
+        logger.error(f"Unknown action '{action}' (expected upgrade, check or current)")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
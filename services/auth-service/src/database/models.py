@@ -2,7 +2,7 @@
 SQLAlchemy models for Auth Service
 """
 
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Integer, Boolean, Text
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Integer, Boolean, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -27,6 +27,7 @@ class User(Base):
     # Relationships
     subscriptions = relationship("Subscription", back_populates="user", cascade="all, delete-orphan")
     token_verifications = relationship("TokenVerification", back_populates="user", cascade="all, delete-orphan")
+    effective_tier = relationship("UserTier", back_populates="user", uselist=False, cascade="all, delete-orphan")
 
 
 class Subscription(Base):
@@ -48,6 +49,26 @@ class Subscription(Base):
     
     # Relationships
     user = relationship("User", back_populates="subscriptions")
+    
+    __table_args__ = (
+        # Covers the effective tier lookup: active, unexpired subscriptions per user
+        Index("idx_subscriptions_user_active_expires", "user_id", "is_active", "expires_at"),
+    )
+
+
+class UserTier(Base):
+    """Materialized effective tier per user (maintained on subscription changes)"""
+    
+    __tablename__ = "user_tiers"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tier = Column(String(20), nullable=False)  # free, bronze, silver, gold
+    valid_until = Column(TIMESTAMP, nullable=True)  # Expiry of the subscription that granted the tier
+    version = Column(Integer, default=1, nullable=False)  # Bumped whenever the tier changes (used for ETags)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    # Relationships
+    user = relationship("User", back_populates="effective_tier")
 
 
 class TokenVerification(Base):
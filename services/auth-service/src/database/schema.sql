@@ -27,6 +27,15 @@ CREATE TABLE IF NOT EXISTS subscriptions (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
 
+-- Materialized effective tier per user
+CREATE TABLE IF NOT EXISTS user_tiers (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    tier VARCHAR(20) NOT NULL,
+    valid_until TIMESTAMP, -- expiry of the subscription that granted the tier
+    version INTEGER DEFAULT 1 NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
 -- Token verification cache
 CREATE TABLE IF NOT EXISTS token_verifications (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -46,6 +55,7 @@ CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_wallet_address ON users(wallet_address);
 CREATE INDEX IF NOT EXISTS idx_users_tier ON users(tier);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON subscriptions(user_id);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_user_active_expires ON subscriptions(user_id, is_active, expires_at);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_tier ON subscriptions(tier);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_source ON subscriptions(source);
 CREATE INDEX IF NOT EXISTS idx_token_verifications_wallet_address ON token_verifications(wallet_address);
@@ -2,8 +2,8 @@
 Pydantic schemas for request/response models
 """
 
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
 
@@ -35,6 +35,35 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserSummary(BaseModel):
+    id: UUID
+    email: EmailStr
+    wallet_address: Optional[str] = None
+    tier: str
+    is_active: bool
+    
+    class Config:
+        from_attributes = True
+
+
+# Bulk lookup schemas
+MAX_BATCH_SIZE = 500
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class UserBatchResponse(BaseModel):
+    users: List[UserSummary]
+    not_found: List[UUID]
+
+
+class TierBatchResponse(BaseModel):
+    tiers: Dict[str, str]  # user_id -> tier
+    not_found: List[UUID]
+
+
 # Auth schemas
 class Token(BaseModel):
     access_token: str
@@ -52,6 +81,16 @@ class RegisterRequest(UserCreate):
 
 
 # Wallet schemas
+class WalletNonceRequest(BaseModel):
+    wallet_address: str
+
+
+class WalletNonceResponse(BaseModel):
+    nonce: str
+    message: str  # SIWE (EIP-4361) message to sign
+    expires_at: datetime
+
+
 class WalletLinkRequest(BaseModel):
     wallet_address: str
     signature: str
@@ -2,8 +2,9 @@
 Auth Service - FastAPI Application
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 import logging
@@ -11,11 +12,16 @@ import logging
 from .database.connection import get_db, init_db
 from .database.models import User, Subscription, TokenVerification
 from .auth.jwt import create_access_token, get_password_hash, verify_password
-from .auth.dependencies import get_current_user, get_optional_current_user
+from .auth.dependencies import get_current_user, get_optional_current_user, verify_service_key
+from .wallet.nonce_store import nonce_store, extract_nonce, normalize_wallet_address
+from .wallet.signature_verifier import signature_verifier
+from .tiers import TIER_ORDER, get_effective_tier, get_effective_tiers, refresh_effective_tier, tier_etag
 from .schemas import (
     UserResponse, UserCreate, UserUpdate,
     Token, LoginRequest, RegisterRequest,
     WalletLinkRequest, WalletVerifyRequest,
+    WalletNonceRequest, WalletNonceResponse,
+    BatchGetRequest, UserBatchResponse, TierBatchResponse,
     SubscriptionResponse, SubscriptionCreate
 )
 
@@ -65,13 +71,15 @@ async def startup_event():
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    signature_verifier.shutdown()
+
+
 @app.get("/health")
 async def health():
     """Health check"""
-    # #region agent log
-    from .debug_log import debug_log
-    debug_log("debug-session", "health", "H2,H3", "auth-service/src/server.py:52", "Health check endpoint called", {"service": "auth-service"})
-    # #endregion
     return {"status": "healthy", "service": "auth-service"}
 
 
@@ -94,7 +102,7 @@ async def register(
     user = User(
         email=request.email,
         password_hash=get_password_hash(request.password),
-        wallet_address=request.wallet_address,
+        wallet_address=normalize_wallet_address(request.wallet_address) if request.wallet_address else None,
         tier='free'
     )
     db.add(user)
@@ -166,16 +174,45 @@ async def get_current_user_info(
 
 
 # Wallet management endpoints
+async def verify_wallet_challenge(wallet_address: str, message: str, signature: str) -> bool:
+    """
+    Verify a signed sign-in challenge.
+    
+    The message must be exactly the one issued to this wallet with its
+    nonce. The nonce is consumed once the signature verifies, so each
+    challenge can only be used once and bad signatures don't burn it.
+    """
+    nonce = extract_nonce(message)
+    if not nonce or not nonce_store.matches(nonce, wallet_address, message):
+        return False
+    
+    if not await signature_verifier.verify(wallet_address, message, signature):
+        return False
+    
+    # Of concurrent requests with the same valid signature only one gets the nonce
+    return nonce_store.consume(nonce)
+
+
+@app.post("/v1/wallet/nonce", response_model=WalletNonceResponse)
+async def get_wallet_nonce(request: WalletNonceRequest):
+    """Issue a single-use sign-in challenge for a wallet"""
+    return nonce_store.issue(request.wallet_address)
+
+
 @app.post("/v1/wallet/link")
 async def link_wallet(
     request: WalletLinkRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Link wallet address to user account"""
-    # TODO: Verify signature
-    # For now, we'll just link the address
-    current_user.wallet_address = request.wallet_address
+    """Link wallet address to user account (requires a signed challenge)"""
+    if not await verify_wallet_challenge(request.wallet_address, request.message, request.signature):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid wallet signature"
+        )
+    
+    current_user.wallet_address = normalize_wallet_address(request.wallet_address)
     db.commit()
     db.refresh(current_user)
     
@@ -187,10 +224,24 @@ async def verify_wallet(
     request: WalletVerifyRequest,
     db: Session = Depends(get_db)
 ):
-    """Verify wallet signature"""
-    # TODO: Implement signature verification
-    # This should verify that the user controls the wallet
-    return {"verified": True, "wallet_address": request.wallet_address}
+    """Verify wallet signature and log in the linked user, if any"""
+    verified = await verify_wallet_challenge(request.wallet_address, request.message, request.signature)
+    result = {"verified": verified, "wallet_address": request.wallet_address}
+    if not verified:
+        return result
+    
+    user = db.query(User).filter(
+        User.wallet_address == normalize_wallet_address(request.wallet_address),
+        User.is_active == True
+    ).first()
+    if user:
+        result.update({
+            "access_token": create_access_token(data={"sub": str(user.id), "email": user.email}),
+            "token_type": "bearer",
+            "expires_in": 86400
+        })
+    
+    return result
 
 
 @app.get("/v1/wallet/addresses")
@@ -205,6 +256,41 @@ async def get_wallet_addresses(
 
 
 # User management endpoints
+# Bulk lookups are registered before /v1/users/{user_id} routes and are
+# restricted to internal services (workflow workers, dashboard).
+@app.post("/v1/users:batchGet", response_model=UserBatchResponse)
+async def batch_get_users(
+    request: BatchGetRequest,
+    db: Session = Depends(get_db),
+    _: bool = Depends(verify_service_key)
+):
+    """Resolve many users by ID in a single query"""
+    ids = list(dict.fromkeys(request.ids))
+    users = db.query(User).filter(User.id.in_(ids)).all()
+    
+    found = {user.id for user in users}
+    return {
+        "users": users,
+        "not_found": [user_id for user_id in ids if user_id not in found]
+    }
+
+
+@app.post("/v1/users/tiers:batchGet", response_model=TierBatchResponse)
+async def batch_get_user_tiers(
+    request: BatchGetRequest,
+    db: Session = Depends(get_db),
+    _: bool = Depends(verify_service_key)
+):
+    """Resolve effective tiers for many users in a single query"""
+    ids = list(dict.fromkeys(request.ids))
+    tiers = get_effective_tiers(db, ids)
+    
+    return {
+        "tiers": {str(user_id): tier for user_id, tier in tiers.items()},
+        "not_found": [user_id for user_id in ids if user_id not in tiers]
+    }
+
+
 @app.get("/v1/users/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
@@ -238,9 +324,10 @@ async def update_user(
     if user_update.email is not None:
         current_user.email = user_update.email
     if user_update.wallet_address is not None:
-        current_user.wallet_address = user_update.wallet_address
+        current_user.wallet_address = normalize_wallet_address(user_update.wallet_address)
     if user_update.tier is not None:
         current_user.tier = user_update.tier
+        refresh_effective_tier(db, current_user)
     
     db.commit()
     db.refresh(current_user)
@@ -250,27 +337,29 @@ async def update_user(
 @app.get("/v1/users/{user_id}/tier")
 async def get_user_tier(
     user_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user tier"""
+    """Get user tier (supports If-None-Match revalidation)"""
     if str(current_user.id) != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized"
         )
     
-    # Get highest active subscription tier
-    active_subscription = db.query(Subscription).filter(
-        Subscription.user_id == current_user.id,
-        Subscription.is_active == True
-    ).order_by(
-        Subscription.created_at.desc()
-    ).first()
+    # Materialized tier - primary-key read, recomputed only when lapsed
+    effective_tier = get_effective_tier(db, current_user)
+    etag = tier_etag(effective_tier)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    tier = active_subscription.tier if active_subscription else current_user.tier
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return {"user_id": user_id, "tier": tier}
+    return JSONResponse(
+        content={"user_id": user_id, "tier": effective_tier.tier},
+        headers=headers
+    )
 
 
 # Subscription endpoints
@@ -294,8 +383,7 @@ async def create_subscription(
 ):
     """Create a new subscription"""
     # Update user tier if this is higher
-    tier_order = {'free': 0, 'bronze': 1, 'silver': 2, 'gold': 3}
-    if tier_order.get(subscription.tier, 0) > tier_order.get(current_user.tier, 0):
+    if TIER_ORDER.get(subscription.tier, 0) > TIER_ORDER.get(current_user.tier, 0):
         current_user.tier = subscription.tier
     
     new_subscription = Subscription(
@@ -309,6 +397,7 @@ async def create_subscription(
         is_active=True
     )
     db.add(new_subscription)
+    refresh_effective_tier(db, current_user)
     db.commit()
     db.refresh(new_subscription)
     
@@ -341,6 +430,7 @@ async def update_subscription(
     sub.token_contract_address = subscription.token_contract_address
     sub.token_network = subscription.token_network
     sub.expires_at = subscription.expires_at
+    refresh_effective_tier(db, current_user)
     
     db.commit()
     db.refresh(sub)
@@ -366,6 +456,7 @@ async def cancel_subscription(
         )
     
     sub.is_active = False
+    refresh_effective_tier(db, current_user)
     db.commit()
     
     return {"message": "Subscription cancelled"}
@@ -0,0 +1,150 @@
+"""
+Effective tier resolution
+
+The effective tier of a user is the tier of their most recent active,
+unexpired subscription, falling back to the tier stored on the user.
+It is materialized in the ``user_tiers`` table whenever subscriptions or
+the user's tier change, so reads are a single primary-key lookup.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .database.models import User, Subscription, UserTier
+
+# Tier hierarchy
+TIER_ORDER = {'free': 0, 'bronze': 1, 'silver': 2, 'gold': 3}
+
+
+def resolve_effective_tier(db: Session, user: User) -> Tuple[str, Optional[datetime]]:
+    """
+    Resolve a user's effective tier from their subscriptions.
+
+    Args:
+        db: Database session
+        user: User to resolve
+
+    Returns:
+        Tuple of (tier, valid_until) where valid_until is the expiry of the
+        granting subscription, or None if the tier does not expire
+    """
+    now = datetime.utcnow()
+    active_subscription = db.query(
+        Subscription.tier,
+        Subscription.expires_at
+    ).filter(
+        Subscription.user_id == user.id,
+        Subscription.is_active == True,
+        or_(Subscription.expires_at.is_(None), Subscription.expires_at > now)
+    ).order_by(
+        Subscription.created_at.desc()
+    ).first()
+
+    if active_subscription:
+        return active_subscription.tier, active_subscription.expires_at
+    return user.tier, None
+
+
+def refresh_effective_tier(db: Session, user: User) -> UserTier:
+    """
+    Recompute and store a user's effective tier.
+
+    Must be called after subscription or user tier changes have been
+    flushed (or are pending in the session) and before commit. The row is
+    upserted, so concurrent first reads of a user do not collide on the
+    primary key; the version only changes when the tier does.
+
+    Args:
+        db: Database session
+        user: User whose tier changed
+
+    Returns:
+        Updated UserTier row
+    """
+    db.flush()
+    tier, valid_until = resolve_effective_tier(db, user)
+
+    table = UserTier.__table__
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table).values(user_id=user.id, tier=tier, valid_until=valid_until, version=1)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "tier": statement.excluded.tier,
+            "valid_until": statement.excluded.valid_until,
+            "version": table.c.version + 1,
+            "updated_at": func.now()
+        },
+        where=or_(
+            table.c.tier.is_distinct_from(statement.excluded.tier),
+            table.c.valid_until.is_distinct_from(statement.excluded.valid_until)
+        )
+    ))
+
+    return db.get(UserTier, user.id, populate_existing=True)
+
+
+def get_effective_tier(db: Session, user: User) -> UserTier:
+    """
+    Get a user's effective tier, recomputing it only when missing or lapsed.
+
+    Args:
+        db: Database session
+        user: User to look up
+
+    Returns:
+        UserTier row
+    """
+    row = db.get(UserTier, user.id)
+    if row is not None and (row.valid_until is None or row.valid_until > datetime.utcnow()):
+        return row
+
+    row = refresh_effective_tier(db, user)
+    db.commit()
+    return row
+
+
+def get_effective_tiers(db: Session, user_ids: Iterable[UUID]) -> Dict[UUID, str]:
+    """
+    Get effective tiers for many users with a single IN query.
+
+    Users whose materialized tier is missing or lapsed are recomputed
+    individually; this only happens once per user per tier change.
+
+    Args:
+        db: Database session
+        user_ids: User IDs to look up
+
+    Returns:
+        Mapping of user_id to tier for users that exist
+    """
+    now = datetime.utcnow()
+    rows = db.query(User, UserTier).outerjoin(
+        UserTier, UserTier.user_id == User.id
+    ).filter(
+        User.id.in_(list(user_ids))
+    ).all()
+
+    tiers: Dict[UUID, str] = {}
+    stale = []
+    for user, row in rows:
+        if row is not None and (row.valid_until is None or row.valid_until > now):
+            tiers[user.id] = row.tier
+        else:
+            stale.append(user)
+
+    if stale:
+        for user in stale:
+            tiers[user.id] = refresh_effective_tier(db, user).tier
+        db.commit()
+
+    return tiers
+
+
+def tier_etag(row: UserTier) -> str:
+    """Build a strong ETag for a materialized tier"""
+    return f'"{row.tier}-{row.version}"'
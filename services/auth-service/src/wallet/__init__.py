@@ -0,0 +1,3 @@
+"""
+Wallet challenge issuance and signature verification
+"""
@@ -0,0 +1,190 @@
+"""
+SIWE-style nonce store for wallet sign-in challenges
+"""
+
+import os
+import re
+import hmac
+import json
+import hashlib
+import secrets
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Nonce TTL (5 minutes)
+NONCE_TTL = int(os.getenv("WALLET_NONCE_TTL", "300"))
+
+# Values embedded in the signed message
+SIWE_DOMAIN = os.getenv("WALLET_AUTH_DOMAIN", "localhost")
+SIWE_URI = os.getenv("WALLET_AUTH_URI", f"https://{SIWE_DOMAIN}")
+SIWE_CHAIN_ID = int(os.getenv("WALLET_AUTH_CHAIN_ID", "1"))
+SIWE_STATEMENT = "Sign in to the Marketing Automation Platform."
+
+_NONCE_PATTERN = re.compile(r"^Nonce: ([A-Za-z0-9]+)$", re.MULTILINE)
+
+
+def build_siwe_message(wallet_address: str, nonce: str, issued_at: datetime, expires_at: datetime) -> str:
+    """Build an EIP-4361 (Sign-In with Ethereum) message"""
+    return (
+        f"{SIWE_DOMAIN} wants you to sign in with your Ethereum account:\n"
+        f"{wallet_address}\n"
+        f"\n"
+        f"{SIWE_STATEMENT}\n"
+        f"\n"
+        f"URI: {SIWE_URI}\n"
+        f"Version: 1\n"
+        f"Chain ID: {SIWE_CHAIN_ID}\n"
+        f"Nonce: {nonce}\n"
+        f"Issued At: {issued_at.isoformat()}Z\n"
+        f"Expiration Time: {expires_at.isoformat()}Z"
+    )
+
+
+def normalize_wallet_address(wallet_address: str) -> str:
+    """Canonical (lower-cased) form in which wallet addresses are stored and compared"""
+    return wallet_address.strip().lower()
+
+
+def message_digest(message: str) -> str:
+    """SHA-256 of a challenge message, stored instead of the message itself"""
+    return hashlib.sha256(message.encode("utf-8")).hexdigest()
+
+
+def extract_nonce(message: str) -> Optional[str]:
+    """Extract the nonce from a SIWE message"""
+    match = _NONCE_PATTERN.search(message)
+    return match.group(1) if match else None
+
+
+class NonceStore:
+    """
+    Redis-backed single-use nonce store.
+
+    Falls back to an in-process store when Redis is unavailable, which is
+    only correct for a single replica (development).
+    """
+
+    def __init__(self):
+        redis_url = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+        # nonce -> (challenge JSON, expiry)
+        self._local: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        try:
+            self.redis_client = redis.from_url(redis_url, decode_responses=True)
+            self.redis_client.ping()
+            self.enabled = True
+            logger.info("Redis nonce store enabled")
+        except Exception as e:
+            logger.warning(f"Redis not available, using in-process nonce store: {str(e)}")
+            self.redis_client = None
+            self.enabled = False
+
+    def _make_key(self, nonce: str) -> str:
+        """Generate storage key"""
+        return f"wallet_nonce:{nonce}"
+
+    def issue(self, wallet_address: str) -> Dict[str, str]:
+        """
+        Issue a new sign-in challenge for a wallet.
+
+        Args:
+            wallet_address: Wallet address that will sign the challenge
+
+        Returns:
+            Dictionary with nonce, message and expires_at
+        """
+        nonce = secrets.token_hex(16)
+        issued_at = datetime.utcnow()
+        expires_at = issued_at + timedelta(seconds=NONCE_TTL)
+        message = build_siwe_message(wallet_address, nonce, issued_at, expires_at)
+        # The exact message is bound to the nonce, so a message with our nonce
+        # but another domain, URI, chain or expiry is rejected
+        challenge = json.dumps({
+            "address": normalize_wallet_address(wallet_address),
+            "message_sha256": message_digest(message)
+        })
+
+        if self.enabled:
+            self.redis_client.setex(self._make_key(nonce), NONCE_TTL, challenge)
+        else:
+            with self._lock:
+                self._purge_expired()
+                self._local[nonce] = (challenge, time.monotonic() + NONCE_TTL)
+
+        return {
+            "nonce": nonce,
+            "message": message,
+            "expires_at": expires_at.isoformat()
+        }
+
+    def matches(self, nonce: str, wallet_address: str, message: str) -> bool:
+        """
+        Check that a pending nonce was issued to a wallet with exactly this message.
+
+        Does not consume the nonce, so a request with a bad signature cannot
+        burn another wallet's pending challenge.
+
+        Args:
+            nonce: Nonce from the signed message
+            wallet_address: Wallet claiming to have signed it
+            message: Signed message
+
+        Returns:
+            True if the nonce is pending and was issued for this wallet and message
+        """
+        if self.enabled:
+            try:
+                challenge = self.redis_client.get(self._make_key(nonce))
+            except Exception as e:
+                logger.error(f"Error reading nonce: {str(e)}")
+                return False
+        else:
+            with self._lock:
+                entry = self._local.get(nonce)
+            challenge = entry[0] if entry and entry[1] >= time.monotonic() else None
+
+        if challenge is None:
+            return False
+        challenge = json.loads(challenge)
+        return (
+            challenge["address"] == normalize_wallet_address(wallet_address)
+            and hmac.compare_digest(challenge["message_sha256"], message_digest(message))
+        )
+
+    def consume(self, nonce: str) -> bool:
+        """
+        Atomically consume a nonce.
+
+        Args:
+            nonce: Nonce to consume
+
+        Returns:
+            True if the nonce was pending, False if it is unknown, expired or
+            already used
+        """
+        if self.enabled:
+            try:
+                return self.redis_client.getdel(self._make_key(nonce)) is not None
+            except Exception as e:
+                logger.error(f"Error consuming nonce: {str(e)}")
+                return False
+
+        with self._lock:
+            entry = self._local.pop(nonce, None)
+        return entry is not None and entry[1] >= time.monotonic()
+
+    def _purge_expired(self):
+        """Drop expired in-process nonces (caller holds the lock)"""
+        now = time.monotonic()
+        for nonce in [n for n, (_, expiry) in self._local.items() if expiry < now]:
+            del self._local[nonce]
+
+
+# Global nonce store instance
+nonce_store = NonceStore()
@@ -0,0 +1,92 @@
+"""
+Wallet signature verification (ecrecover) in a worker process pool
+
+Recovering the signer of a personal_sign message is CPU-bound, so it runs
+in worker processes instead of on the event loop. Signatures are
+dispatched in chunks so a batch costs one round-trip per worker.
+"""
+
+import asyncio
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (wallet_address, message, signature)
+SignatureItem = Tuple[str, str, str]
+
+VERIFY_WORKERS = int(os.getenv("WALLET_VERIFY_WORKERS", str(min(4, os.cpu_count() or 1))))
+VERIFY_CHUNK_SIZE = int(os.getenv("WALLET_VERIFY_CHUNK_SIZE", "64"))
+
+
+def _recover_chunk(items: Sequence[SignatureItem]) -> List[bool]:
+    """Verify a chunk of signatures (runs in a worker process)"""
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+
+    results = []
+    for wallet_address, message, signature in items:
+        try:
+            recovered = Account.recover_message(
+                encode_defunct(text=message),
+                signature=signature
+            )
+            results.append(recovered.lower() == wallet_address.lower())
+        except Exception:
+            results.append(False)
+    return results
+
+
+class SignatureVerifier:
+    """Batched ecrecover verification backed by a process pool"""
+
+    def __init__(self, max_workers: int = VERIFY_WORKERS, chunk_size: int = VERIFY_CHUNK_SIZE):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Started signature verification pool with {self.max_workers} workers")
+        return self._pool
+
+    async def verify_many(self, items: Sequence[SignatureItem]) -> List[bool]:
+        """
+        Verify many signatures concurrently.
+
+        Args:
+            items: Sequence of (wallet_address, message, signature)
+
+        Returns:
+            List of booleans in the same order as items
+        """
+        if not items:
+            return []
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        results = await asyncio.gather(*[
+            loop.run_in_executor(pool, _recover_chunk, list(chunk))
+            for chunk in chunks
+        ])
+        return [verified for chunk_result in results for verified in chunk_result]
+
+    async def verify(self, wallet_address: str, message: str, signature: str) -> bool:
+        """Verify a single signature"""
+        results = await self.verify_many([(wallet_address, message, signature)])
+        return results[0]
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global verifier instance
+signature_verifier = SignatureVerifier()
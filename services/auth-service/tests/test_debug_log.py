@@ -0,0 +1,14 @@
+"""
+Tests for the debug event log settings
+"""
+
+from src.debug_log import _parse_sample_rate
+
+
+def test_sample_rate_is_parsed_defensively():
+    """Test that a bad DEBUG_LOG_SAMPLE_RATE is clamped or ignored instead of failing startup"""
+    assert _parse_sample_rate("0.25") == 0.25
+    assert _parse_sample_rate("7") == 1.0
+    assert _parse_sample_rate("-1") == 0.0
+    assert _parse_sample_rate("ten percent") == 1.0
+    assert _parse_sample_rate("nan") == 1.0
@@ -0,0 +1,102 @@
+"""
+Tests for materialized tiers and bulk lookups
+"""
+
+from uuid import UUID, uuid4
+from src.database.models import User, UserTier
+from src.schemas import MAX_BATCH_SIZE
+from src.tiers import get_effective_tier, refresh_effective_tier
+
+
+def test_tier_etag_revalidation(client, register):
+    """Test that an unchanged tier revalidates with 304 and a changed one does not"""
+    user_id, headers = register()
+
+    first = client.get(f"/v1/users/{user_id}/tier", headers=headers)
+    assert first.status_code == 200
+    assert first.json()["tier"] == "free"
+    etag = first.headers["etag"]
+
+    cached = client.get(f"/v1/users/{user_id}/tier", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    assert client.put(f"/v1/users/{user_id}", json={"tier": "gold"}, headers=headers).status_code == 200
+    changed = client.get(f"/v1/users/{user_id}/tier", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["tier"] == "gold"
+    assert changed.headers["etag"] != etag
+
+
+def test_concurrent_first_reads_share_one_tier_row(session_factory):
+    """Test that a second first read upserts instead of failing on the primary key"""
+    with session_factory() as db:
+        user = User(email="race@example.com", password_hash="x", tier="silver")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    # Both requests looked up the user before either stored its tier
+    first, second = session_factory(), session_factory()
+    try:
+        first_user, second_user = first.get(User, user_id), second.get(User, user_id)
+        assert second.get(UserTier, user_id) is None
+        assert get_effective_tier(first, first_user).version == 1
+
+        row = refresh_effective_tier(second, second_user)
+        second.commit()
+        assert (row.tier, row.version) == ("silver", 1)
+    finally:
+        first.close()
+        second.close()
+
+
+def test_batch_get_rejects_oversized_requests(client, monkeypatch):
+    """Test the bulk lookup size limit"""
+    monkeypatch.setenv("SERVICE_API_KEY", "service-key")
+    headers = {"X-Service-Key": "service-key"}
+
+    too_many = {"ids": [str(uuid4()) for _ in range(MAX_BATCH_SIZE + 1)]}
+    assert client.post("/v1/users:batchGet", json=too_many, headers=headers).status_code == 422
+    assert client.post("/v1/users/tiers:batchGet", json=too_many, headers=headers).status_code == 422
+
+    missing = str(uuid4())
+    response = client.post("/v1/users/tiers:batchGet", json={"ids": [missing]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"tiers": {}, "not_found": [missing]}
+
+
+def test_batch_get_resolves_tiers(client, register, monkeypatch):
+    """Test that bulk tier lookups return the effective tier of each user"""
+    monkeypatch.setenv("SERVICE_API_KEY", "service-key")
+    first_id, headers = register("first@example.com")
+    second_id, _ = register("second@example.com")
+    client.put(f"/v1/users/{first_id}", json={"tier": "bronze"}, headers=headers)
+
+    response = client.post(
+        "/v1/users/tiers:batchGet",
+        json={"ids": [first_id, second_id, first_id]},
+        headers={"X-Service-Key": "service-key"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["tiers"] == {str(UUID(first_id)): "bronze", str(UUID(second_id)): "free"}
+
+
+def test_service_key_fails_closed(client, monkeypatch):
+    """Test that bulk endpoints need a valid key, and a configured one unless explicitly allowed"""
+    body = {"ids": [str(uuid4())]}
+    monkeypatch.delenv("SERVICE_API_KEY", raising=False)
+    monkeypatch.delenv("ALLOW_UNAUTHENTICATED_SERVICE_CALLS", raising=False)
+    monkeypatch.delenv("ENVIRONMENT", raising=False)
+    assert client.post("/v1/users:batchGet", json=body).status_code == 500
+
+    monkeypatch.setenv("ALLOW_UNAUTHENTICATED_SERVICE_CALLS", "true")
+    assert client.post("/v1/users:batchGet", json=body).status_code == 200
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    assert client.post("/v1/users:batchGet", json=body).status_code == 500
+
+    monkeypatch.setenv("SERVICE_API_KEY", "service-key")
+    assert client.post("/v1/users:batchGet", json=body).status_code == 403
+    assert client.post("/v1/users:batchGet", json=body, headers={"X-Service-Key": "wrong"}).status_code == 403
+    assert client.post("/v1/users:batchGet", json=body, headers={"X-Service-Key": "service-key"}).status_code == 200
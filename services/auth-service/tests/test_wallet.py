@@ -0,0 +1,45 @@
+"""
+Tests for wallet sign-in challenges
+"""
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+
+def sign(account, message: str) -> str:
+    return account.sign_message(encode_defunct(text=message)).signature.hex()
+
+
+def test_signed_challenge_cannot_be_replayed(client):
+    """Test that a valid signature verifies once and its nonce is then spent"""
+    account = Account.create()
+    challenge = client.post("/v1/wallet/nonce", json={"wallet_address": account.address}).json()
+    request = {
+        "wallet_address": account.address,
+        "message": challenge["message"],
+        "signature": sign(account, challenge["message"])
+    }
+
+    assert client.post("/v1/wallet/verify", json=request).json()["verified"] is True
+    assert client.post("/v1/wallet/verify", json=request).json()["verified"] is False
+
+
+def test_mismatched_challenges_are_rejected_without_burning_the_nonce(client):
+    """Test that another message, wallet or a bad signature is rejected and the nonce stays usable"""
+    account, other = Account.create(), Account.create()
+    challenge = client.post("/v1/wallet/nonce", json={"wallet_address": account.address}).json()
+    message = challenge["message"]
+
+    # Same nonce, but a message the server did not issue (another chain)
+    forged = message.replace("Chain ID: 1", "Chain ID: 137")
+    attempts = [
+        {"wallet_address": account.address, "message": forged, "signature": sign(account, forged)},
+        {"wallet_address": other.address, "message": message, "signature": sign(other, message)},
+        {"wallet_address": account.address, "message": message, "signature": sign(other, message)}
+    ]
+    for attempt in attempts:
+        assert client.post("/v1/wallet/verify", json=attempt).json()["verified"] is False
+
+    # Checksummed and lower-cased addresses are the same wallet
+    request = {"wallet_address": account.address.lower(), "message": message, "signature": sign(account, message)}
+    assert client.post("/v1/wallet/verify", json=request).json()["verified"] is True
@@ -0,0 +1,88 @@
+"""Initial schema
+
+Matches the tables previously created by ``Base.metadata.create_all``;
+existing databases are stamped at this revision instead of upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'service_registry',
+        sa.Column('id', sa.String(length=255), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('icon_url', sa.String(length=500), nullable=True),
+        sa.Column('definition_path', sa.String(length=500), nullable=True),
+        sa.Column('connector_class', sa.String(length=255), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('popularity_score', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'service_configurations',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('service_id', sa.String(length=255), nullable=False),
+        sa.Column('config_name', sa.String(length=255), nullable=False),
+        sa.Column('encrypted_credentials', sa.LargeBinary(), nullable=False),
+        sa.Column('settings', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('last_tested_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('last_test_result', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['service_id'], ['service_registry.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'service_connectors',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('service_id', sa.String(length=255), nullable=False),
+        sa.Column('connector_class', sa.String(length=255), nullable=False),
+        sa.Column('version', sa.String(length=50), nullable=True),
+        sa.Column('capabilities', sa.JSON(), nullable=True),
+        sa.Column('is_loaded', sa.Boolean(), nullable=True),
+        sa.Column('loaded_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['service_id'], ['service_registry.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'connection_tests',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('configuration_id', sa.Integer(), nullable=False),
+        sa.Column('test_status', sa.String(length=50), nullable=False),
+        sa.Column('test_result', sa.JSON(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('test_duration_ms', sa.Integer(), nullable=True),
+        sa.Column('tested_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['configuration_id'], ['service_configurations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('connection_tests')
+    op.drop_table('service_connectors')
+    op.drop_table('service_configurations')
+    op.drop_table('service_registry')
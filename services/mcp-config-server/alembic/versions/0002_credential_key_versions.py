@@ -0,0 +1,47 @@
+"""Track the master key version of encrypted credentials
+
+Guarded with existence checks because pods running create_all may have
+created these objects before migrations were adopted.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode():
+        existing_columns, existing_indexes = set(), set()
+    else:
+        inspector = sa.inspect(op.get_bind())
+        existing_columns = {column['name'] for column in inspector.get_columns('service_configurations')}
+        existing_indexes = {index['name'] for index in inspector.get_indexes('service_configurations')}
+
+    if 'encryption_key_id' not in existing_columns:
+        op.add_column('service_configurations', sa.Column('encryption_key_id', sa.String(length=64), nullable=True))
+
+    if 'idx_service_configurations_encryption_key_id' not in existing_indexes:
+        op.create_index(
+            'idx_service_configurations_encryption_key_id',
+            'service_configurations',
+            ['encryption_key_id'],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_service_configurations_encryption_key_id', table_name='service_configurations')
+    op.drop_column('service_configurations', 'encryption_key_id')
@@ -0,0 +1,45 @@
+"""Index configured-service listings for keyset pagination
+
+Guarded with existence checks because pods running create_all may have
+created these objects before migrations were adopted.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'idx_service_configurations_service_id_id': ['service_id', 'id'],
+    'idx_service_configurations_status_id': ['status', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode():
+        existing_indexes = set()
+    else:
+        inspector = sa.inspect(op.get_bind())
+        existing_indexes = {index['name'] for index in inspector.get_indexes('service_configurations')}
+
+    for name, columns in INDEXES.items():
+        if name not in existing_indexes:
+            op.create_index(name, 'service_configurations', columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in INDEXES:
+        op.drop_index(name, table_name='service_configurations')
@@ -0,0 +1,57 @@
+"""Hourly connection test rollups and tested_at index for pruning
+
+Guarded with existence checks because pods running create_all may have
+created these objects before migrations were adopted.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode():
+        existing_tables, existing_indexes = set(), set()
+    else:
+        inspector = sa.inspect(op.get_bind())
+        existing_tables = set(inspector.get_table_names())
+        existing_indexes = {index['name'] for index in inspector.get_indexes('connection_tests')}
+
+    if 'idx_connection_tests_tested_at' not in existing_indexes:
+        op.create_index('idx_connection_tests_tested_at', 'connection_tests', ['tested_at'])
+
+    if 'connection_test_rollups' not in existing_tables:
+        op.create_table(
+            'connection_test_rollups',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('service_id', sa.String(length=255), nullable=False),
+            sa.Column('hour', sa.TIMESTAMP(), nullable=False),
+            sa.Column('test_count', sa.Integer(), nullable=False),
+            sa.Column('success_count', sa.Integer(), nullable=False),
+            sa.Column('p50_duration_ms', sa.Integer(), nullable=True),
+            sa.Column('p95_duration_ms', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('service_id', 'hour', name='uq_connection_test_rollups_service_hour'),
+        )
+        op.create_index('idx_connection_test_rollups_hour', 'connection_test_rollups', ['hour'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_connection_test_rollups_hour', table_name='connection_test_rollups')
+    op.drop_table('connection_test_rollups')
+    op.drop_index('idx_connection_tests_tested_at', table_name='connection_tests')
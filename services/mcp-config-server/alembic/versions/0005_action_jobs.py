@@ -0,0 +1,76 @@
+"""Persistent queue of connector action jobs
+
+Guarded with existence checks because pods running create_all may have
+created these objects before migrations were adopted.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode():
+        existing_tables = set()
+    else:
+        existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'action_jobs' not in existing_tables:
+        op.create_table(
+            'action_jobs',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('idempotency_key', sa.String(length=255), nullable=True),
+            sa.Column('configuration_id', sa.Integer(), nullable=False),
+            sa.Column('service_id', sa.String(length=255), nullable=False),
+            sa.Column('action', sa.String(length=255), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('total_items', sa.Integer(), nullable=False),
+            sa.Column('processed_items', sa.Integer(), nullable=False),
+            sa.Column('succeeded_items', sa.Integer(), nullable=False),
+            sa.Column('items', sa.LargeBinary(), nullable=False),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('locked_by', sa.String(length=255), nullable=True),
+            sa.Column('heartbeat_at', sa.TIMESTAMP(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+            sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+            sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+            sa.ForeignKeyConstraint(['configuration_id'], ['service_configurations.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('idempotency_key'),
+        )
+        op.create_index('idx_action_jobs_status_id', 'action_jobs', ['status', 'id'])
+
+    if 'action_job_results' not in existing_tables:
+        op.create_table(
+            'action_job_results',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('chunk_index', sa.Integer(), nullable=False),
+            sa.Column('first_index', sa.Integer(), nullable=False),
+            sa.Column('item_count', sa.Integer(), nullable=False),
+            sa.Column('results', sa.LargeBinary(), nullable=False),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['job_id'], ['action_jobs.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('job_id', 'chunk_index', name='uq_action_job_results_job_chunk'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('action_job_results')
+    op.drop_index('idx_action_jobs_status_id', table_name='action_jobs')
+    op.drop_table('action_jobs')
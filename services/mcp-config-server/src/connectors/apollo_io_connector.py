@@ -2,50 +2,19 @@
 Apollo.io Lead Generation Connector
 """
 
-import httpx
 from typing import Dict, Any, List
-from .base_connector import BaseConnector
+from .declarative import DeclarativeConnector
 
 
-class ApolloIOConnector(BaseConnector):
+class ApolloIOConnector(DeclarativeConnector):
     """Connector for Apollo.io lead generation API"""
     
-    def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
-        """Test Apollo.io API connection"""
-        is_valid, error = self.validate_credentials(credentials, ["api_key"])
-        if not is_valid:
-            return {
-                "status": "failed",
-                "message": error,
-                "error": error
-            }
-        
-        try:
-            with httpx.Client() as client:
-                response = client.get(
-                    "https://api.apollo.io/v1/auth/health",
-                    headers={"X-Api-Key": credentials["api_key"]},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                
-                return {
-                    "status": "success",
-                    "message": "Apollo.io connection successful",
-                    "data": response.json()
-                }
-        except httpx.HTTPStatusError as e:
-            return {
-                "status": "failed",
-                "message": f"Apollo.io API error: {e.response.status_code}",
-                "error": e.response.text
-            }
-        except Exception as e:
-            return {
-                "status": "failed",
-                "message": f"Connection test failed: {str(e)}",
-                "error": str(e)
-            }
+    definition_id = "apollo_io"
+    
+    # people/bulk_match accepts up to 10 people per request
+    bulk_chunk_sizes = {"enrich_contacts": 10}
+    
+    cache_ttls = {"enrich_contacts": 14 * 24 * 3600}
     
     def get_capabilities(self) -> List[str]:
         """Get Apollo.io capabilities"""
@@ -57,17 +26,47 @@ class ApolloIOConnector(BaseConnector):
             "sequence_outreach"
         ]
     
-    def execute_action(
+    async def execute_action(
         self,
         action: str,
         params: Dict[str, Any],
         credentials: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Execute Apollo.io action"""
-        return {
-            "status": "not_implemented",
-            "message": f"Action {action} not yet implemented",
-            "action": action,
-            "params": params
-        }
-
+        if action == "enrich_contacts":
+            try:
+                results = await self.execute_bulk(action, [params], credentials)
+                return results[0]
+            except Exception as e:
+                return {"status": "failed", "message": f"Action {action} failed: {str(e)}", "error": str(e)}
+        
+        return await super().execute_action(action, params, credentials)
+    
+    async def execute_bulk(
+        self,
+        action: str,
+        items: List[Dict[str, Any]],
+        credentials: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Enrich up to 10 contacts per people/bulk_match request"""
+        if action != "enrich_contacts":
+            return await super().execute_bulk(action, items, credentials)
+        
+        response = await self.request(
+            "POST",
+            "https://api.apollo.io/v1/people/bulk_match",
+            headers={"X-Api-Key": credentials["api_key"]},
+            json={"details": items},
+            timeout=30.0
+        )
+        if not response.is_success:
+            return [self.response_result(response) for _ in items]
+        
+        # Matches are returned in request order, None where nobody matched
+        matches = response.json().get("matches") or []
+        matches = matches + [None] * (len(items) - len(matches))
+        return [
+            {"status": "success", "data": match} if match
+            else {"status": "failed", "message": "No match found", "error": "No match found"}
+            for match in matches
+        ]
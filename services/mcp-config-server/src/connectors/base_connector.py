@@ -3,8 +3,16 @@ Abstract base class for service connectors
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+import os
+import asyncio
 import logging
+import random
+import httpx
+from .http_pool import get_http_client
+from .rate_limit import TokenBucket, get_rate_limiter
+from .enrichment_cache import get_enrichment_cache
+from .metrics import endpoint_label, get_connector_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -107,3 +115,337 @@ class BaseConnector(ABC):
             "capabilities": self.get_capabilities()
         }
 
+
+class AsyncBaseConnector(BaseConnector):
+    """
+    Base class for connectors with non-blocking I/O.
+    
+    test_connection() and execute_action() are coroutines and make HTTP
+    calls through self.http, the vendor's pooled keep-alive client.
+    Vendor API calls made through request() share a per-vendor token
+    bucket and are retried with backoff on 429/5xx and network errors.
+    """
+    
+    # Vendor limits; override per connector
+    rate_limit_per_second: float = 5.0
+    rate_limit_burst: int = 10
+    max_concurrency: int = 4
+    max_retries: int = 3
+    retry_backoff_seconds: float = 0.5
+    # Upper bound on a vendor's Retry-After, so one response cannot stall a worker
+    max_retry_after_seconds: float = float(os.getenv("CONNECTOR_MAX_RETRY_AFTER", "60"))
+    
+    # Actions with a vendor bulk endpoint -> maximum items per request
+    bulk_chunk_sizes: Dict[str, int] = {}
+    
+    # Cacheable (enrichment) actions -> seconds to keep successful results
+    cache_ttls: Dict[str, int] = {}
+    
+    RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for this vendor"""
+        return get_http_client(self.service_id)
+    
+    @property
+    def rate_limiter(self) -> TokenBucket:
+        """Token bucket shared by all requests to this vendor"""
+        return get_rate_limiter(self.service_id, self.rate_limit_per_second, self.rate_limit_burst)
+    
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Backoff before retry `attempt` (0-based): Retry-After if given (capped), else exponential with jitter."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_retry_after_seconds)
+        return self.retry_backoff_seconds * (2 ** attempt) * (0.5 + random.random())
+    
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Make a rate-limited vendor API call with retries.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to httpx.AsyncClient.request()
+            
+        Returns:
+            Response of the last attempt (non-retryable status codes are
+            returned as-is; callers decide whether to raise_for_status())
+            
+        Raises:
+            httpx.TransportError: If the last attempt fails at the network level
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            try:
+                response = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                self._record_retry(url, kwargs, type(e).__name__)
+                delay = self._retry_delay(attempt)
+                self.logger.warning(f"{method} {url} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            if response.status_code not in self.RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                return response
+            
+            self._record_retry(url, kwargs, str(response.status_code))
+            delay = self._retry_delay(attempt, response)
+            if response.status_code == 429:
+                self.rate_limiter.penalize(delay)
+            self.logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        
+        return response
+    
+    def _record_retry(self, url: str, kwargs: Dict[str, Any], reason: str):
+        get_connector_metrics().record_retry(
+            self.service_id, endpoint_label(httpx.URL(url), kwargs.get("extensions")), reason
+        )
+    
+    def response_result(self, response: httpx.Response) -> Dict[str, Any]:
+        """
+        Convert a vendor API response to an action result.
+        
+        Args:
+            response: Vendor API response
+            
+        Returns:
+            Dictionary with status "success" and data, or status "failed" and error
+        """
+        if response.is_success:
+            return {"status": "success", "data": response.json() if response.content else None}
+        return {
+            "status": "failed",
+            "message": f"{self.service_name} API error: {response.status_code}",
+            "error": response.text
+        }
+    
+    @abstractmethod
+    async def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Test connection to the external service.
+        
+        Args:
+            credentials: Service credentials dictionary
+            
+        Returns:
+            Same shape as BaseConnector.test_connection()
+        """
+        pass
+    
+    @abstractmethod
+    async def execute_action(
+        self,
+        action: str,
+        params: Dict[str, Any],
+        credentials: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute a service-specific action.
+        
+        Args:
+            action: Action name (e.g., "generate_leads", "send_email")
+            params: Action parameters
+            credentials: Service credentials
+            
+        Returns:
+            Dictionary with action result
+        """
+        pass
+    
+    async def execute_bulk(
+        self,
+        action: str,
+        items: List[Dict[str, Any]],
+        credentials: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute an action for one chunk of items.
+        
+        The default makes one execute_action() call per item. Connectors
+        with a bulk endpoint override this for the actions listed in
+        bulk_chunk_sizes and make one request per chunk.
+        
+        Args:
+            action: Action name
+            items: Action parameters, one dictionary per item
+            credentials: Service credentials
+            
+        Returns:
+            One result dictionary per item, in input order
+        """
+        return list(await asyncio.gather(*(
+            self.execute_action(action, item, credentials) for item in items
+        )))
+    
+    async def _run_chunks(
+        self,
+        action: str,
+        items: List[Dict[str, Any]],
+        credentials: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Run execute_bulk() over chunks of items concurrently.
+        
+        Yields:
+            Tuples of (position in items, result) as chunks finish
+        """
+        chunk_size = max(1, self.bulk_chunk_sizes.get(action, 1))
+        chunks = [(start, items[start:start + chunk_size]) for start in range(0, len(items), chunk_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_chunk(start: int, chunk: List[Dict[str, Any]]):
+            async with semaphore:
+                try:
+                    results = await self.execute_bulk(action, chunk, credentials)
+                except Exception as e:
+                    self.logger.error(f"Batch chunk {start}-{start + len(chunk)} of {action} failed: {str(e)}")
+                    results = [
+                        {"status": "failed", "message": f"Action {action} failed: {str(e)}", "error": str(e)}
+                        for _ in chunk
+                    ]
+                return start, results
+        
+        # Keep a bounded number of chunks scheduled so large batches don't create every task up front
+        pending = set()
+        next_chunk = 0
+        try:
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < self.max_concurrency * 2:
+                    pending.add(asyncio.ensure_future(run_chunk(*chunks[next_chunk])))
+                    next_chunk += 1
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    start, results = task.result()
+                    for offset, result in enumerate(results):
+                        yield start + offset, result
+        finally:
+            # Consumer went away (e.g. client disconnected): stop outstanding chunks
+            for task in pending:
+                task.cancel()
+    
+    async def execute_batch(
+        self,
+        action: str,
+        items: List[Dict[str, Any]],
+        credentials: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute an action for many items, streaming results as chunks finish.
+        
+        Items are split into chunks of bulk_chunk_sizes[action] (1 without
+        a bulk endpoint); at most max_concurrency chunks run at once, and
+        every vendor call goes through the shared rate limiter.
+        
+        For actions listed in cache_ttls, results come from the shared
+        enrichment cache when possible; duplicate items and lookups already
+        in flight for another request reach the vendor only once.
+        
+        Args:
+            action: Action name
+            items: Action parameters, one dictionary per item
+            credentials: Service credentials
+            
+        Yields:
+            Dictionaries with:
+                - index: Position of the item in `items`
+                - result: Action result for the item
+                - cached: Whether the result was served without a vendor call
+        """
+        ttl = self.cache_ttls.get(action)
+        if not ttl or os.getenv("ENRICHMENT_CACHE_ENABLED", "true").lower() != "true":
+            async for position, result in self._run_chunks(action, items, credentials):
+                yield {"index": position, "result": result, "cached": False}
+            return
+        
+        cache = get_enrichment_cache()
+        keys = [cache.make_key(self.service_id, action, item) for item in items]
+        
+        # Group identical lookups, serving cache hits straight away
+        misses: Dict[str, List[int]] = {}
+        for index, (key, hit) in enumerate(zip(keys, await cache.get_many(keys))):
+            if hit is not None:
+                yield {"index": index, "result": hit, "cached": True}
+            else:
+                misses.setdefault(key, []).append(index)
+        
+        owned: List[str] = []
+        waiting: Dict[str, asyncio.Future] = {}
+        for key in misses:
+            future, is_owner = cache.claim(key)
+            if is_owner:
+                owned.append(key)
+            else:
+                waiting[key] = future
+        
+        resolved = set()
+        try:
+            work = [items[misses[key][0]] for key in owned]
+            async for position, result in self._run_chunks(action, work, credentials):
+                key = owned[position]
+                await cache.resolve(key, result, ttl)
+                resolved.add(key)
+                for index in misses[key]:
+                    yield {"index": index, "result": result, "cached": False}
+        finally:
+            for key in owned:
+                if key not in resolved:
+                    cache.release(key, RuntimeError(f"Lookup for {action} was abandoned"))
+        
+        # Lookups another request was already making
+        for key, future in waiting.items():
+            try:
+                result = await future
+            except Exception as e:
+                result = {"status": "failed", "message": f"Action {action} failed: {str(e)}", "error": str(e)}
+            for index in misses[key]:
+                yield {"index": index, "result": result, "cached": True}
+    
+    async def execute_cached(
+        self,
+        action: str,
+        params: Dict[str, Any],
+        credentials: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute a single action through the enrichment cache (see execute_batch()).
+        
+        Returns:
+            Action result
+        """
+        async for item in self.execute_batch(action, [params], credentials):
+            return item["result"]
+
+
+async def run_test_connection(connector: BaseConnector, credentials: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Test a connection without blocking the event loop.
+    
+    Async connectors are awaited; synchronous connectors run in a worker thread.
+    """
+    if isinstance(connector, AsyncBaseConnector):
+        return await connector.test_connection(credentials)
+    return await asyncio.to_thread(connector.test_connection, credentials)
+
+
+async def run_action(
+    connector: BaseConnector,
+    action: str,
+    params: Dict[str, Any],
+    credentials: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Execute an action without blocking the event loop.
+    
+    Async connectors are awaited (through the enrichment cache for cacheable
+    actions); synchronous connectors run in a worker thread.
+    """
+    if isinstance(connector, AsyncBaseConnector):
+        return await connector.execute_cached(action, params, credentials)
+    return await asyncio.to_thread(connector.execute_action, action, params, credentials)
@@ -0,0 +1,325 @@
+"""
+Connector driven by the service definition YAML
+
+A service needs no Python module when its definition describes the HTTP
+calls to make:
+
+    test_endpoint:
+      url: https://api.mailgun.net/v3/{domain}
+      method: GET
+      auth_type: basic              # bearer, oauth2, header, query_param, basic, none
+      auth_username: api            # basic auth with a fixed user name and api_key
+      params: {limit: 1}
+      accept_status: [404]          # also counts as a successful test
+      error_messages: {401: Mailgun API authentication failed}
+
+    actions:
+      verify_email:
+        url: https://api.hunter.io/v2/email-verifier
+        params: {email: "{email}"}
+        cache_ttl: 604800           # seconds; enables the enrichment cache
+
+    rate_limit: {per_second: 10, burst: 10, max_concurrency: 10}
+
+Strings in url, params, json and headers are templates: "{name}" is
+filled from the credentials, then the action parameters, so callers
+cannot override a stored credential (e.g. mailgun's {domain}) that is
+sent along with the stored authentication. A value that is
+exactly one placeholder keeps the parameter's type. Templates are
+compiled once per service and registry version.
+"""
+
+import string
+import httpx
+from collections import ChainMap
+from functools import lru_cache
+from typing import Dict, Any, Callable, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple
+from .base_connector import AsyncBaseConnector
+from ..registry.service_registry import get_registry
+
+_FORMATTER = string.Formatter()
+
+# Credential used for authentication when the endpoint does not name one
+DEFAULT_AUTH_CREDENTIALS = {"oauth2": "access_token"}
+
+
+class CompiledEndpoint(NamedTuple):
+    """Request template of a test endpoint or action"""
+    method: str
+    url: Callable[[Mapping[str, Any]], Any]
+    params: Optional[Callable[[Mapping[str, Any]], Any]]
+    json: Optional[Callable[[Mapping[str, Any]], Any]]
+    headers: Optional[Callable[[Mapping[str, Any]], Any]]
+    fields: FrozenSet[str]
+    auth_type: str
+    auth_credential: str
+    auth_header: str
+    auth_param: str
+    auth_username: Optional[str]
+    timeout: float
+    accept_status: FrozenSet[int]
+    error_messages: Dict[int, str]
+
+
+class CompiledService(NamedTuple):
+    """All request templates of a service"""
+    test_endpoint: Optional[CompiledEndpoint]
+    actions: Dict[str, CompiledEndpoint]
+
+
+def compile_template(value: Any) -> Tuple[Callable[[Mapping[str, Any]], Any], FrozenSet[str]]:
+    """
+    Compile a template value (string, list or dict of templates).
+
+    Returns:
+        Tuple of (render function taking the context, referenced field names)
+    """
+    if isinstance(value, dict):
+        compiled = [(key, compile_template(item)) for key, item in value.items()]
+        fields = frozenset().union(*(item_fields for _, (_, item_fields) in compiled))
+        return (lambda context: {key: render(context) for key, (render, _) in compiled}), fields
+
+    if isinstance(value, list):
+        compiled = [compile_template(item) for item in value]
+        fields = frozenset().union(*(item_fields for _, item_fields in compiled))
+        return (lambda context: [render(context) for render, _ in compiled]), fields
+
+    if isinstance(value, str):
+        names = [name for _, name, _, _ in _FORMATTER.parse(value) if name is not None]
+        if not names:
+            return (lambda context: value), frozenset()
+        fields = frozenset(name.split(".")[0].split("[")[0] for name in names)
+        if len(names) == 1 and value == "{" + names[0] + "}" and names[0] in fields:
+            name = names[0]
+            return (lambda context: context[name]), fields
+        return (lambda context: value.format_map(context)), fields
+
+    return (lambda context: value), frozenset()
+
+
+def compile_endpoint(spec: Dict[str, Any]) -> CompiledEndpoint:
+    """
+    Compile a test endpoint or action spec from a service definition.
+
+    Args:
+        spec: Mapping with url and optional method, params, json, headers and auth settings
+
+    Returns:
+        CompiledEndpoint
+    """
+    url, fields = compile_template(spec["url"])
+    optional = {}
+    for part in ("params", "json", "headers"):
+        if spec.get(part) is not None:
+            optional[part], part_fields = compile_template(spec[part])
+            fields |= part_fields
+        else:
+            optional[part] = None
+
+    auth_type = spec.get("auth_type", "none")
+    return CompiledEndpoint(
+        method=spec.get("method", "GET").upper(),
+        url=url,
+        fields=fields,
+        auth_type=auth_type,
+        auth_credential=spec.get("auth_credential", DEFAULT_AUTH_CREDENTIALS.get(auth_type, "api_key")),
+        auth_header=spec.get("auth_header", "X-Api-Key"),
+        auth_param=spec.get("auth_param", "api_key"),
+        auth_username=spec.get("auth_username"),
+        timeout=float(spec.get("timeout", 10.0)),
+        accept_status=frozenset(spec.get("accept_status", [])),
+        error_messages={int(code): message for code, message in (spec.get("error_messages") or {}).items()},
+        **optional
+    )
+
+
+@lru_cache(maxsize=256)
+def compile_service(service_id: str, registry_version: int) -> CompiledService:
+    """
+    Compile the request templates of a service.
+
+    Cached per registry version, so reloaded definitions are recompiled
+    on first use.
+
+    Args:
+        service_id: Service identifier
+        registry_version: Current registry version (cache key)
+
+    Returns:
+        CompiledService
+    """
+    service = get_registry().get_service(service_id) or {}
+    inherited_auth = {
+        key: value for key, value in (service.get("test_endpoint") or {}).items()
+        if key.startswith("auth_")
+    }
+    return CompiledService(
+        test_endpoint=compile_endpoint(service["test_endpoint"]) if service.get("test_endpoint") else None,
+        # Actions authenticate like the test endpoint unless they say otherwise
+        actions={
+            name: compile_endpoint({**inherited_auth, **spec})
+            for name, spec in (service.get("actions") or {}).items()
+        }
+    )
+
+
+class DeclarativeConnector(AsyncBaseConnector):
+    """
+    Connector executing the test endpoint and actions of its service definition.
+
+    Vendors with hand-written actions subclass it to inherit
+    test_connection() and override execute_action() for the rest.
+    """
+
+    # Service definition to follow; None: the one of the connector's service_id
+    definition_id: Optional[str] = None
+
+    def __init__(self, service_id: str, service_name: str):
+        super().__init__(service_id, service_name)
+        self.definition_id = self.definition_id or service_id
+        definition = get_registry().get_service(self.definition_id) or {}
+        self.required_credentials: List[str] = definition.get("required_credentials", [])
+        self.capabilities: List[str] = definition.get("capabilities", [])
+
+        rate_limit = definition.get("rate_limit") or {}
+        if "per_second" in rate_limit:
+            self.rate_limit_per_second = float(rate_limit["per_second"])
+        if "burst" in rate_limit:
+            self.rate_limit_burst = int(rate_limit["burst"])
+        if "max_concurrency" in rate_limit:
+            self.max_concurrency = int(rate_limit["max_concurrency"])
+
+        action_ttls = {
+            name: spec["cache_ttl"]
+            for name, spec in (definition.get("actions") or {}).items() if spec.get("cache_ttl")
+        }
+        if action_ttls:
+            self.cache_ttls = {**self.cache_ttls, **action_ttls}
+
+    @property
+    def compiled(self) -> CompiledService:
+        """Request templates of this service"""
+        return compile_service(self.definition_id, get_registry().version)
+
+    def build_request(
+        self,
+        endpoint: CompiledEndpoint,
+        credentials: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Render an endpoint into httpx request arguments.
+
+        Raises:
+            KeyError: If a template field is in neither credentials nor params
+
+        Returns:
+            Tuple of (url, keyword arguments for httpx.AsyncClient.request())
+        """
+        # Credentials first: per-call params must not redirect stored credentials
+        context = ChainMap(credentials, params or {})
+        missing = sorted(field for field in endpoint.fields if field not in context)
+        if missing:
+            raise KeyError(", ".join(missing))
+
+        headers = dict(endpoint.headers(context)) if endpoint.headers else {}
+        query = dict(endpoint.params(context)) if endpoint.params else {}
+        kwargs: Dict[str, Any] = {"timeout": endpoint.timeout}
+
+        if endpoint.auth_type in ("bearer", "oauth2"):
+            headers["Authorization"] = f"Bearer {credentials[endpoint.auth_credential]}"
+        elif endpoint.auth_type == "header":
+            headers[endpoint.auth_header] = credentials[endpoint.auth_credential]
+        elif endpoint.auth_type == "query_param":
+            query[endpoint.auth_param] = credentials[endpoint.auth_credential]
+        elif endpoint.auth_type == "basic":
+            if endpoint.auth_username:
+                kwargs["auth"] = (endpoint.auth_username, credentials[endpoint.auth_credential])
+            else:
+                kwargs["auth"] = (credentials["username"], credentials["password"])
+
+        if headers:
+            kwargs["headers"] = headers
+        if query:
+            kwargs["params"] = query
+        if endpoint.json:
+            kwargs["json"] = endpoint.json(context)
+        return endpoint.url(context), kwargs
+
+    async def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the test endpoint of the service definition"""
+        is_valid, error = self.validate_credentials(credentials, self.required_credentials)
+        if not is_valid:
+            return {
+                "status": "failed",
+                "message": error,
+                "error": error
+            }
+
+        endpoint = self.compiled.test_endpoint
+        if not endpoint:
+            return {
+                "status": "failed",
+                "message": f"{self.service_name} has no test endpoint",
+                "error": "No test_endpoint in service definition"
+            }
+
+        try:
+            url, kwargs = self.build_request(endpoint, credentials)
+            response = await self.request(
+                endpoint.method, url, extensions={"endpoint": "test_connection"}, **kwargs
+            )
+            if response.status_code not in endpoint.accept_status:
+                response.raise_for_status()
+
+            return {
+                "status": "success",
+                "message": f"{self.service_name} connection successful",
+                "data": response.json() if response.is_success and response.content else None
+            }
+        except httpx.HTTPStatusError as e:
+            return {
+                "status": "failed",
+                "message": endpoint.error_messages.get(
+                    e.response.status_code, f"{self.service_name} API error: {e.response.status_code}"
+                ),
+                "error": e.response.text
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "message": f"Connection test failed: {str(e)}",
+                "error": str(e)
+            }
+
+    def get_capabilities(self) -> List[str]:
+        """Capabilities listed in the service definition"""
+        return list(self.capabilities)
+
+    async def execute_action(
+        self,
+        action: str,
+        params: Dict[str, Any],
+        credentials: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Call the action endpoint of the service definition"""
+        endpoint = self.compiled.actions.get(action)
+        if not endpoint:
+            return {
+                "status": "not_implemented",
+                "message": f"Action {action} not yet implemented",
+                "action": action,
+                "params": params
+            }
+
+        try:
+            url, kwargs = self.build_request(endpoint, credentials, params)
+        except KeyError as e:
+            error = f"Missing parameter: {e.args[0]}"
+            return {"status": "failed", "message": error, "error": error}
+
+        try:
+            response = await self.request(endpoint.method, url, extensions={"endpoint": action}, **kwargs)
+            return self.response_result(response)
+        except Exception as e:
+            return {"status": "failed", "message": f"Action {action} failed: {str(e)}", "error": str(e)}
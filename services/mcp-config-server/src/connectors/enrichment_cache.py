@@ -0,0 +1,194 @@
+"""
+Shared cache of vendor enrichment results
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+import redis
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "enrich"
+
+# Parameters identifying a person or company; compared case-insensitively
+IDENTIFIER_FIELDS = frozenset({"email", "domain", "company_domain", "website", "linkedin_url"})
+_URL_PREFIX = re.compile(r"^(https?://)?(www\.)?")
+
+
+def normalize_params(params: Dict[str, Any]) -> str:
+    """
+    Canonical form of action parameters, so equivalent lookups share a key.
+
+    Identifier fields are trimmed and lowercased, and domains/URLs lose
+    their scheme, "www." prefix and trailing slash
+    ("https://www.Example.com/" and "example.com" are the same lookup).
+
+    Args:
+        params: Action parameters
+
+    Returns:
+        Canonical JSON string
+    """
+    normalized = {}
+    for key, value in params.items():
+        if key in IDENTIFIER_FIELDS and isinstance(value, str):
+            value = value.strip().lower()
+            if key != "email":
+                value = _URL_PREFIX.sub("", value).rstrip("/")
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class EnrichmentCache:
+    """
+    Cache of successful vendor action results keyed by
+    (service, action, normalized params).
+
+    Results live in Redis when available (shared by all replicas),
+    otherwise in a bounded in-process LRU. Concurrent lookups of the same
+    key are deduplicated: one caller fetches from the vendor while the
+    others await its result.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Capacity of the in-process fallback
+        """
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.redis_client = None
+
+        redis_url = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+        try:
+            redis.from_url(redis_url, socket_connect_timeout=2).ping()
+            self.redis_client = aioredis.from_url(redis_url, decode_responses=True)
+            logger.info("Redis enrichment cache enabled")
+        except Exception as e:
+            logger.warning(f"Redis not available, using in-process enrichment cache: {str(e)}")
+
+    def make_key(self, service_id: str, action: str, params: Dict[str, Any]) -> str:
+        """Build the cache key of a lookup"""
+        digest = hashlib.sha256(normalize_params(params).encode()).hexdigest()
+        return f"{KEY_PREFIX}:{service_id}:{action}:{digest}"
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up cached results.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached result or None for each key
+        """
+        if self.redis_client:
+            try:
+                values = await self.redis_client.mget(keys)
+                return [json.loads(value) if value else None for value in values]
+            except Exception as e:
+                logger.error(f"Error reading from enrichment cache: {str(e)}")
+                return [None] * len(keys)
+
+        now = time.monotonic()
+        results: List[Optional[Dict[str, Any]]] = []
+        for key in keys:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                # Callers may modify their result; keep the cached one intact
+                results.append(copy.deepcopy(entry[1]))
+            else:
+                results.append(None)
+        return results
+
+    async def set(self, key: str, result: Dict[str, Any], ttl: int):
+        """
+        Cache a result.
+
+        Args:
+            key: Cache key
+            result: Action result
+            ttl: Seconds to keep the result
+        """
+        if self.redis_client:
+            try:
+                await self.redis_client.setex(key, ttl, json.dumps(result, default=str))
+            except Exception as e:
+                logger.error(f"Error writing to enrichment cache: {str(e)}")
+            return
+
+        self._memory[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def claim(self, key: str) -> Tuple[asyncio.Future, bool]:
+        """
+        Register interest in a lookup that missed the cache.
+
+        Returns:
+            Tuple of (future resolved with the result, whether the caller
+            owns the lookup and must call resolve()/release())
+        """
+        future = self._in_flight.get(key)
+        if future is not None and not future.done():
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        return future, True
+
+    async def resolve(self, key: str, result: Dict[str, Any], ttl: int):
+        """
+        Publish the result of an owned lookup; successful results are cached.
+
+        Args:
+            key: Cache key
+            result: Action result
+            ttl: Seconds to keep the result
+        """
+        if result.get("status") == "success":
+            await self.set(key, result, ttl)
+        future = self._in_flight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def release(self, key: str, error: Exception):
+        """Abandon an owned lookup, failing callers waiting on it."""
+        future = self._in_flight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+            # Waiters may be gone too; don't log "exception never retrieved"
+            future.exception()
+
+
+# Global enrichment cache instance
+_enrichment_cache: Optional[EnrichmentCache] = None
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """
+    Get or create global enrichment cache instance.
+
+    Creating it probes Redis synchronously, so processes create it at
+    startup in a thread rather than on the event loop.
+
+    Returns:
+        EnrichmentCache instance
+    """
+    global _enrichment_cache
+    if _enrichment_cache is None:
+        _enrichment_cache = EnrichmentCache(max_entries=int(os.getenv("ENRICHMENT_CACHE_SIZE", "10000")))
+    return _enrichment_cache
@@ -0,0 +1,72 @@
+"""
+Pooled async HTTP clients shared by connectors
+"""
+
+import os
+import asyncio
+import logging
+import importlib.util
+from typing import Dict, Tuple
+import httpx
+from .metrics import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("CONNECTOR_TIMEOUT", "10.0"))
+MAX_CONNECTIONS = int(os.getenv("CONNECTOR_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CONNECTOR_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("CONNECTOR_KEEPALIVE_EXPIRY", "30.0"))
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_ENABLED = (
+    os.getenv("CONNECTOR_HTTP2", "true").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+
+# service_id -> (event loop, client); clients are bound to the loop they were created on
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def get_http_client(service_id: str) -> httpx.AsyncClient:
+    """
+    Get the pooled client for a vendor.
+
+    Each vendor gets its own connection pool, so a slow vendor can only
+    exhaust its own connections. Connections are kept alive between calls,
+    and requests are recorded in the connector metrics.
+
+    Args:
+        service_id: Service identifier
+
+    Returns:
+        httpx.AsyncClient for the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(service_id)
+    if entry and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+    )
+    client = httpx.AsyncClient(
+        transport=InstrumentedTransport(service_id, transport),
+        timeout=DEFAULT_TIMEOUT
+    )
+    _clients[service_id] = (loop, client)
+    logger.debug(f"Created HTTP client pool for {service_id} (http2={HTTP2_ENABLED})")
+    return client
+
+
+async def close_http_clients():
+    """Close all pooled clients created on the running event loop."""
+    loop = asyncio.get_running_loop()
+    for service_id, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            await client.aclose()
+            del _clients[service_id]
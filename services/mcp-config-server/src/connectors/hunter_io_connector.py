@@ -2,50 +2,22 @@
 Hunter.io Email Verification Connector
 """
 
-import httpx
-from typing import Dict, Any, List
-from .base_connector import BaseConnector
+from typing import List
+from .declarative import DeclarativeConnector
 
 
-class HunterIOConnector(BaseConnector):
+class HunterIOConnector(DeclarativeConnector):
     """Connector for Hunter.io email verification API"""
     
-    def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
-        """Test Hunter.io API connection"""
-        is_valid, error = self.validate_credentials(credentials, ["api_key"])
-        if not is_valid:
-            return {
-                "status": "failed",
-                "message": error,
-                "error": error
-            }
-        
-        try:
-            with httpx.Client() as client:
-                response = client.get(
-                    "https://api.hunter.io/v2/account",
-                    params={"api_key": credentials["api_key"]},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                
-                return {
-                    "status": "success",
-                    "message": "Hunter.io connection successful",
-                    "data": response.json()
-                }
-        except httpx.HTTPStatusError as e:
-            return {
-                "status": "failed",
-                "message": f"Hunter.io API error: {e.response.status_code}",
-                "error": e.response.text
-            }
-        except Exception as e:
-            return {
-                "status": "failed",
-                "message": f"Connection test failed: {str(e)}",
-                "error": str(e)
-            }
+    definition_id = "hunter_io"
+    
+    # Email verifier allows 10 requests/second
+    rate_limit_per_second = 10.0
+    rate_limit_burst = 10
+    max_concurrency = 10
+    
+    # Verification results stay valid for a week
+    cache_ttls = {"verify_email": 7 * 24 * 3600}
     
     def get_capabilities(self) -> List[str]:
         """Get Hunter.io capabilities"""
@@ -55,18 +27,3 @@ class HunterIOConnector(BaseConnector):
             "enrich_domain",
             "check_deliverability"
         ]
-    
-    def execute_action(
-        self,
-        action: str,
-        params: Dict[str, Any],
-        credentials: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Execute Hunter.io action"""
-        return {
-            "status": "not_implemented",
-            "message": f"Action {action} not yet implemented",
-            "action": action,
-            "params": params
-        }
-
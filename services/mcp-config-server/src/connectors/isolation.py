@@ -0,0 +1,333 @@
+"""
+Process isolation for connector calls
+
+With CONNECTOR_ISOLATION=process, connector calls run in a pool of
+pre-started worker processes instead of the API process. A call that
+exceeds its deadline gets its worker killed and replaced, workers run
+under an address-space limit, and each worker is recycled after a number
+of calls, so a hanging or leaking connector cannot degrade the API.
+"""
+
+import os
+import asyncio
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Dict, Any, List, Optional
+from .base_connector import AsyncBaseConnector, BaseConnector
+from .metrics import get_connector_metrics
+from .rate_limit import apply_penalties, disable_rate_limits, drain_penalties
+
+logger = logging.getLogger(__name__)
+
+# Call kinds understood by workers
+TEST_CONNECTION = "test_connection"
+EXECUTE_ACTION = "execute_action"
+EXECUTE_BULK = "execute_bulk"
+
+
+def isolation_enabled() -> bool:
+    """Whether connector calls run in worker processes"""
+    return os.getenv("CONNECTOR_ISOLATION", "in_process").lower() == "process"
+
+
+def _worker_main(conn: Connection, memory_limit_mb: int, max_calls: int):
+    """
+    Worker process loop: run connector calls received on `conn` until
+    max_calls is reached or the parent closes the pipe.
+    """
+    if memory_limit_mb > 0:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    # Connectors created here run in this process
+    os.environ["CONNECTOR_ISOLATION"] = "in_process"
+    # The API process rate limits calls before dispatching them; per-worker
+    # buckets would multiply the vendor limit by the number of workers
+    disable_rate_limits()
+    from ..plugin_loader import get_plugin_loader
+    from .http_pool import close_http_clients
+
+    # One loop for the worker's lifetime keeps pooled vendor connections alive between calls
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        for _ in range(max_calls):
+            try:
+                kind, service_id, action, payload, credentials = conn.recv()
+            except EOFError:
+                break
+
+            exit_after = False
+            try:
+                connector = get_plugin_loader().get_connector(service_id)
+                if connector is None:
+                    result = {"status": "failed", "message": f"Connector for {service_id} not found"}
+                elif kind == TEST_CONNECTION:
+                    result = loop.run_until_complete(_maybe_await(connector.test_connection(credentials)))
+                elif kind == EXECUTE_BULK and isinstance(connector, AsyncBaseConnector):
+                    result = loop.run_until_complete(connector.execute_bulk(action, payload, credentials))
+                elif kind == EXECUTE_BULK:
+                    result = [connector.execute_action(action, item, credentials) for item in payload]
+                else:
+                    result = loop.run_until_complete(
+                        _maybe_await(connector.execute_action(action, payload, credentials))
+                    )
+            except MemoryError:
+                result, exit_after = {"status": "failed", "message": "Connector exceeded its memory limit"}, True
+            except Exception as e:
+                result = {"status": "failed", "message": f"Connector call failed: {str(e)}", "error": str(e)}
+
+            # Vendor call metrics and 429 penalties travel back with the result,
+            # along with whether this worker is about to exit
+            conn.send((result, get_connector_metrics().drain(), drain_penalties(), exit_after))
+            if exit_after:
+                break
+    finally:
+        try:
+            loop.run_until_complete(close_http_clients())
+        finally:
+            loop.close()
+            conn.close()
+
+
+async def _maybe_await(value):
+    if asyncio.iscoroutine(value):
+        return await value
+    return value
+
+
+class _Worker:
+    """Handle on one worker process"""
+
+    def __init__(self, process: multiprocessing.Process, conn: Connection):
+        self.process = process
+        self.conn = conn
+        self.calls = 0
+
+    def kill(self):
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+
+
+class ConnectorWorkerPool:
+    """
+    Pool of worker processes executing connector calls.
+
+    Workers are started up front (from a forkserver, so they don't inherit
+    the API process's threads and sockets) and handed out one call at a
+    time. The parent waits on the worker's pipe without blocking the event
+    loop.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        timeout: float = 60.0,
+        memory_limit_mb: int = 1024,
+        max_calls: int = 1000
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            size: Number of worker processes
+            timeout: Default per-call deadline in seconds
+            memory_limit_mb: Address-space limit per worker (0: unlimited)
+            max_calls: Calls after which a worker is replaced
+        """
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_calls = max_calls
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.memory_limit_mb, self.max_calls),
+            name="connector-worker",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    async def start(self):
+        """Start the worker processes."""
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        workers = await asyncio.to_thread(lambda: [self._spawn() for _ in range(self.size)])
+        for worker in workers:
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+        logger.info(f"Started {self.size} connector worker processes")
+
+    async def _replace(self, worker: _Worker) -> _Worker:
+        """Kill a worker and start a new one in its place."""
+        self._workers.remove(worker)
+        await asyncio.to_thread(worker.kill)
+        replacement = await asyncio.to_thread(self._spawn)
+        self._workers.append(replacement)
+        return replacement
+
+    async def call(
+        self,
+        kind: str,
+        service_id: str,
+        action: Optional[str],
+        payload: Any,
+        credentials: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run a connector call in a worker.
+
+        Args:
+            kind: TEST_CONNECTION, EXECUTE_ACTION or EXECUTE_BULK
+            service_id: Service identifier
+            action: Action name (None for connection tests)
+            payload: Action parameters, or list of them for EXECUTE_BULK
+            credentials: Service credentials
+            timeout: Deadline in seconds (default: pool timeout)
+
+        Returns:
+            The connector method's return value
+
+        Raises:
+            TimeoutError: If the call exceeded its deadline
+            RuntimeError: If the worker died during the call
+        """
+        await self.start()
+        timeout = timeout or self.timeout
+        worker = await self._idle.get()
+        try:
+            if not worker.process.is_alive():
+                logger.warning(f"Connector worker {worker.process.pid} died while idle; replacing it")
+                worker = await self._replace(worker)
+            worker.conn.send((kind, service_id, action, payload, credentials))
+            if not await asyncio.to_thread(worker.conn.poll, timeout):
+                raise TimeoutError(f"{service_id} {action or kind} exceeded {timeout}s deadline")
+            result, metrics, penalties, exiting = worker.conn.recv()
+            get_connector_metrics().merge(metrics)
+            apply_penalties(penalties)
+            worker.calls += 1
+        except TimeoutError:
+            worker = await self._replace(worker)
+            raise
+        except (EOFError, OSError) as e:
+            worker = await self._replace(worker)
+            raise RuntimeError(f"Connector worker exited during {service_id} {action or kind}") from e
+        except asyncio.CancelledError:
+            # The worker may still be busy with the abandoned call
+            worker = await asyncio.shield(self._replace(worker))
+            raise
+        else:
+            if exiting or worker.calls >= self.max_calls:
+                # The worker exits after its last call (or a MemoryError); start its successor
+                worker = await self._replace(worker)
+        finally:
+            self._idle.put_nowait(worker)
+        return result
+
+    async def shutdown(self):
+        """Stop all workers."""
+        for worker in list(self._workers):
+            await asyncio.to_thread(worker.kill)
+        self._workers.clear()
+        self._idle = None
+
+
+class IsolatedConnector(AsyncBaseConnector):
+    """
+    Proxy running a connector's calls in the worker pool.
+
+    Batching, caching and concurrency limits stay in the API process and
+    use the wrapped connector's settings. Workers do not rate limit:
+    every vendor request a dispatched call makes draws from the API
+    process's rate limiter first, and 429 penalties incurred in a worker
+    are applied to that limiter.
+    """
+
+    def __init__(self, inner: BaseConnector, pool: ConnectorWorkerPool):
+        super().__init__(inner.service_id, inner.service_name)
+        self.inner = inner
+        self.pool = pool
+        for attribute in (
+            "rate_limit_per_second", "rate_limit_burst", "max_concurrency",
+            "bulk_chunk_sizes", "cache_ttls"
+        ):
+            if hasattr(inner, attribute):
+                setattr(self, attribute, getattr(inner, attribute))
+
+    def get_capabilities(self) -> List[str]:
+        return self.inner.get_capabilities()
+
+    def _failure(self, error: Exception) -> Dict[str, Any]:
+        status = "timeout" if isinstance(error, TimeoutError) else "failed"
+        return {"status": status, "message": str(error), "error": str(error)}
+
+    async def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        await self.rate_limiter.acquire()
+        try:
+            return await self.pool.call(TEST_CONNECTION, self.service_id, None, None, credentials)
+        except (TimeoutError, RuntimeError) as e:
+            return self._failure(e)
+
+    async def execute_action(
+        self,
+        action: str,
+        params: Dict[str, Any],
+        credentials: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        await self.rate_limiter.acquire()
+        try:
+            return await self.pool.call(EXECUTE_ACTION, self.service_id, action, params, credentials)
+        except (TimeoutError, RuntimeError) as e:
+            return self._failure(e)
+
+    async def execute_bulk(
+        self,
+        action: str,
+        items: List[Dict[str, Any]],
+        credentials: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        if len(items) == 1:
+            return [await self.execute_action(action, items[0], credentials)]
+        # One vendor request per chunk with a bulk endpoint, else one per item
+        for _ in range(1 if action in self.bulk_chunk_sizes else len(items)):
+            await self.rate_limiter.acquire()
+        try:
+            return await self.pool.call(EXECUTE_BULK, self.service_id, action, items, credentials)
+        except (TimeoutError, RuntimeError) as e:
+            return [self._failure(e) for _ in items]
+
+
+# Global worker pool instance
+_worker_pool: Optional[ConnectorWorkerPool] = None
+
+
+def get_worker_pool() -> ConnectorWorkerPool:
+    """
+    Get or create the global worker pool from CONNECTOR_WORKER_* environment variables.
+
+    Returns:
+        ConnectorWorkerPool instance (workers start on first use or start())
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = ConnectorWorkerPool(
+            size=int(os.getenv("CONNECTOR_WORKERS", "4")),
+            timeout=float(os.getenv("CONNECTOR_WORKER_TIMEOUT", "60")),
+            memory_limit_mb=int(os.getenv("CONNECTOR_WORKER_MEMORY_MB", "1024")),
+            max_calls=int(os.getenv("CONNECTOR_WORKER_MAX_CALLS", "1000"))
+        )
+    return _worker_pool
@@ -4,13 +4,13 @@ LinkedIn Sales Navigator Connector
 
 import httpx
 from typing import Dict, Any, List
-from .base_connector import BaseConnector
+from .base_connector import AsyncBaseConnector
 
 
-class LinkedInConnector(BaseConnector):
+class LinkedInConnector(AsyncBaseConnector):
     """Connector for LinkedIn Sales Navigator API"""
     
-    def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+    async def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
         """Test LinkedIn API connection"""
         is_valid, error = self.validate_credentials(
             credentials,
@@ -43,19 +43,18 @@ class LinkedInConnector(BaseConnector):
                 "X-Restli-Protocol-Version": "2.0.0"
             }
             
-            with httpx.Client() as client:
-                response = client.get(
-                    "https://api.linkedin.com/v2/me",
-                    headers=headers,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                
-                return {
-                    "status": "success",
-                    "message": "LinkedIn connection successful",
-                    "data": response.json()
-                }
+            response = await self.http.get(
+                "https://api.linkedin.com/v2/me",
+                headers=headers,
+                timeout=10.0
+            )
+            response.raise_for_status()
+            
+            return {
+                "status": "success",
+                "message": "LinkedIn connection successful",
+                "data": response.json()
+            }
         except httpx.HTTPStatusError as e:
             return {
                 "status": "failed",
@@ -79,7 +78,7 @@ class LinkedInConnector(BaseConnector):
             "get_company_info"
         ]
     
-    def execute_action(
+    async def execute_action(
         self,
         action: str,
         params: Dict[str, Any],
@@ -0,0 +1,296 @@
+"""
+Instrumentation of outbound vendor API calls
+
+Every pooled vendor client sends its requests through an
+InstrumentedTransport, which records per vendor and endpoint:
+
+- mcp_connector_requests_total: requests by method and status code (or
+  exception name for network errors)
+- mcp_connector_request_duration_seconds: latency histogram, up to the
+  end of the response body
+- mcp_connector_request_bytes_total / mcp_connector_response_bytes_total
+- mcp_connector_retries_total: retries made by AsyncBaseConnector.request()
+
+GET /metrics serves them in the Prometheus text format. When the
+opentelemetry package is installed, each request is also traced as a
+client span.
+"""
+
+import re
+import time
+import threading
+from collections import defaultdict
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import httpx
+
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer(__name__)
+except ImportError:
+    trace = None
+    _tracer = None
+
+# Latency histogram buckets in seconds
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_VERSION_SEGMENT = re.compile(r"^v\d{1,2}(\.\d+)?$")
+
+
+def endpoint_label(url: httpx.URL, extensions: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Low-cardinality name of the endpoint a request goes to.
+
+    Connectors may name it with an "endpoint" request extension (e.g. the
+    action); otherwise it is host and path with identifier-like segments
+    (emails, domains, numeric or long ids) replaced by {id}.
+    """
+    if extensions and extensions.get("endpoint"):
+        return extensions["endpoint"]
+    segments = [
+        "{id}" if _is_identifier(segment) else segment
+        for segment in url.path.split("/")
+    ]
+    return url.host + "/".join(segments)
+
+
+def _is_identifier(segment: str) -> bool:
+    if _VERSION_SEGMENT.match(segment):
+        return False
+    return (
+        "@" in segment or "." in segment or len(segment) >= 24
+        or sum(character.isdigit() for character in segment) >= 3
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class ConnectorMetrics:
+    """
+    In-process counters and latency histograms of vendor calls.
+
+    Connector worker processes drain() their metrics after every call and
+    the API process merge()s them, so /metrics covers isolated calls too.
+    """
+
+    REQUEST_LABELS = ("service", "endpoint", "method", "status")
+    ENDPOINT_LABELS = ("service", "endpoint")
+    RETRY_LABELS = ("service", "endpoint", "reason")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._requests: Dict[Tuple[str, ...], int] = defaultdict(int)
+        # (service, endpoint) -> per-bucket counts, then sum and count
+        self._durations: Dict[Tuple[str, ...], List[float]] = {}
+        self._bytes_sent: Dict[Tuple[str, ...], int] = defaultdict(int)
+        self._bytes_received: Dict[Tuple[str, ...], int] = defaultdict(int)
+        self._retries: Dict[Tuple[str, ...], int] = defaultdict(int)
+
+    def _observe(self, key: Tuple[str, ...], seconds: float):
+        histogram = self._durations.get(key)
+        if histogram is None:
+            histogram = self._durations[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+    def record_request(
+        self,
+        service_id: str,
+        endpoint: str,
+        method: str,
+        status: str,
+        seconds: float,
+        bytes_sent: int,
+        bytes_received: int
+    ):
+        """Record one completed (or failed) HTTP request."""
+        key = (service_id, endpoint)
+        with self._lock:
+            self._requests[(service_id, endpoint, method, status)] += 1
+            self._observe(key, seconds)
+            self._bytes_sent[key] += bytes_sent
+            self._bytes_received[key] += bytes_received
+
+    def record_retry(self, service_id: str, endpoint: str, reason: str):
+        """Record a retried request; reason is the status code or exception name."""
+        with self._lock:
+            self._retries[(service_id, endpoint, reason)] += 1
+
+    def drain(self) -> Dict[str, Any]:
+        """Return all recorded values and start from zero."""
+        with self._lock:
+            snapshot = {
+                "requests": dict(self._requests),
+                "durations": self._durations,
+                "bytes_sent": dict(self._bytes_sent),
+                "bytes_received": dict(self._bytes_received),
+                "retries": dict(self._retries)
+            }
+            self._reset()
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Add values drained from another process."""
+        with self._lock:
+            for name in ("requests", "bytes_sent", "bytes_received", "retries"):
+                target = getattr(self, f"_{name}")
+                for key, value in snapshot[name].items():
+                    target[key] += value
+            for key, values in snapshot["durations"].items():
+                histogram = self._durations.get(key)
+                if histogram is None:
+                    self._durations[key] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        histogram[i] += value
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append("# HELP mcp_connector_requests_total Vendor API requests")
+            lines.append("# TYPE mcp_connector_requests_total counter")
+            for key, value in sorted(self._requests.items()):
+                lines.append(f"mcp_connector_requests_total{{{_labels(self.REQUEST_LABELS, key)}}} {value}")
+
+            lines.append("# HELP mcp_connector_request_duration_seconds Vendor API request latency")
+            lines.append("# TYPE mcp_connector_request_duration_seconds histogram")
+            for key, histogram in sorted(self._durations.items()):
+                labels = _labels(self.ENDPOINT_LABELS, key)
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f'mcp_connector_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'mcp_connector_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+                lines.append(f"mcp_connector_request_duration_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"mcp_connector_request_duration_seconds_count{{{labels}}} {histogram[-1]}")
+
+            for name, values, description in (
+                ("mcp_connector_request_bytes_total", self._bytes_sent, "Request body bytes sent to vendors"),
+                ("mcp_connector_response_bytes_total", self._bytes_received, "Response body bytes received from vendors")
+            ):
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(values.items()):
+                    lines.append(f"{name}{{{_labels(self.ENDPOINT_LABELS, key)}}} {value}")
+
+            lines.append("# HELP mcp_connector_retries_total Retried vendor API requests")
+            lines.append("# TYPE mcp_connector_retries_total counter")
+            for key, value in sorted(self._retries.items()):
+                lines.append(f"mcp_connector_retries_total{{{_labels(self.RETRY_LABELS, key)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Response body stream reporting its size and end time when closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[int], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._received = 0
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._received += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close(self._received)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper recording metrics (and spans) for one vendor's requests"""
+
+    def __init__(self, service_id: str, transport: httpx.AsyncBaseTransport, metrics: Optional[ConnectorMetrics] = None):
+        """
+        Initialize transport.
+
+        Args:
+            service_id: Vendor the requests are attributed to
+            transport: Transport sending the requests
+            metrics: Where to record (default: the global ConnectorMetrics)
+        """
+        self.service_id = service_id
+        self._transport = transport
+        self._metrics = metrics or get_connector_metrics()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = endpoint_label(request.url, request.extensions)
+        bytes_sent = int(request.headers.get("Content-Length", 0))
+        span = _tracer.start_span(
+            f"{request.method} {endpoint}",
+            kind=trace.SpanKind.CLIENT,
+            attributes={
+                "http.method": request.method,
+                "http.url": str(request.url.copy_with(query=None)),
+                "mcp.service": self.service_id
+            }
+        ) if _tracer else None
+        started = time.perf_counter()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            self._metrics.record_request(
+                self.service_id, endpoint, request.method, type(e).__name__,
+                time.perf_counter() - started, bytes_sent, 0
+            )
+            if span:
+                span.record_exception(e)
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+                span.end()
+            raise
+
+        def finished(bytes_received: int):
+            self._metrics.record_request(
+                self.service_id, endpoint, request.method, str(response.status_code),
+                time.perf_counter() - started, bytes_sent, bytes_received
+            )
+            if span:
+                span.set_attribute("http.status_code", response.status_code)
+                if response.status_code >= 500:
+                    span.set_status(trace.Status(trace.StatusCode.ERROR))
+                span.end()
+
+        if isinstance(response.stream, httpx.ByteStream):
+            # Body already in memory (nothing left to stream)
+            finished(len(response.content))
+        else:
+            response.stream = _CountingStream(response.stream, finished)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# Global metrics instance
+_connector_metrics: Optional[ConnectorMetrics] = None
+
+
+def get_connector_metrics() -> ConnectorMetrics:
+    """
+    Get or create the global connector metrics.
+
+    Returns:
+        ConnectorMetrics instance
+    """
+    global _connector_metrics
+    if _connector_metrics is None:
+        _connector_metrics = ConnectorMetrics()
+    return _connector_metrics
@@ -0,0 +1,136 @@
+"""
+Per-vendor rate limiting for connector requests
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Callers reserve a token and sleep until it becomes available, so
+    waiting callers are served in arrival order without a lock.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (requests allowed back to back)
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # End of the latest penalty not yet reported by drain_penalties()
+        self._penalized_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        self._refill()
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+    def penalize(self, delay: float):
+        """
+        Stop issuing tokens for `delay` seconds (e.g. after a 429 with Retry-After).
+
+        Args:
+            delay: Seconds to pause
+        """
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - delay * self.rate
+        self._penalized_until = max(self._penalized_until, self._updated + delay)
+
+
+class UnlimitedBucket(TokenBucket):
+    """
+    Bucket that never waits, for processes whose vendor calls are already
+    rate limited by the process dispatching them. Penalties are only
+    recorded, for drain_penalties().
+    """
+
+    def __init__(self):
+        super().__init__(rate=1.0, burst=1)
+
+    async def acquire(self):
+        """Return immediately."""
+
+    def penalize(self, delay: float):
+        self._penalized_until = max(self._penalized_until, time.monotonic() + delay)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_enforced = True
+
+
+def disable_rate_limits():
+    """Hand out UnlimitedBucket from get_rate_limiter() in this process."""
+    global _enforced
+    _enforced = False
+    _buckets.clear()
+
+
+def get_rate_limiter(service_id: str, rate: float, burst: int) -> TokenBucket:
+    """
+    Get the shared token bucket of a vendor.
+
+    All connector instances and batches for a vendor draw from the same
+    bucket, so concurrent jobs together stay under the vendor's limit.
+
+    Args:
+        service_id: Service identifier
+        rate: Requests per second (used when the bucket is created)
+        burst: Bucket capacity (used when the bucket is created)
+
+    Returns:
+        TokenBucket instance
+    """
+    bucket: Optional[TokenBucket] = _buckets.get(service_id)
+    if bucket is None:
+        bucket = TokenBucket(rate, burst) if _enforced else UnlimitedBucket()
+        _buckets[service_id] = bucket
+    return bucket
+
+
+def drain_penalties() -> Dict[str, float]:
+    """
+    Return and clear the penalties applied since the last call.
+
+    Connector worker processes send these back with each result so the
+    API process's buckets also back off after a vendor's 429.
+
+    Returns:
+        Dict of service_id -> seconds of penalty still remaining
+    """
+    now = time.monotonic()
+    penalties = {}
+    for service_id, bucket in _buckets.items():
+        if bucket._penalized_until > now:
+            penalties[service_id] = bucket._penalized_until - now
+        bucket._penalized_until = 0.0
+    return penalties
+
+
+def apply_penalties(penalties: Dict[str, float]):
+    """
+    Penalize this process's buckets with penalties drained in another process.
+
+    Args:
+        penalties: Dict of service_id -> seconds to pause, from drain_penalties()
+    """
+    for service_id, delay in penalties.items():
+        bucket = _buckets.get(service_id)
+        if bucket is not None:
+            bucket.penalize(delay)
@@ -2,58 +2,14 @@
 ZoomInfo Lead Generation Connector
 """
 
-import httpx
-from typing import Dict, Any, List
-from .base_connector import BaseConnector
+from typing import List
+from .declarative import DeclarativeConnector
 
 
-class ZoomInfoConnector(BaseConnector):
+class ZoomInfoConnector(DeclarativeConnector):
     """Connector for ZoomInfo lead generation API"""
     
-    def test_connection(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
-        """Test ZoomInfo API connection"""
-        is_valid, error = self.validate_credentials(
-            credentials,
-            ["username", "password"]
-        )
-        if not is_valid:
-            return {
-                "status": "failed",
-                "message": error,
-                "error": error
-            }
-        
-        try:
-            # ZoomInfo uses basic auth
-            auth = (credentials["username"], credentials["password"])
-            
-            with httpx.Client() as client:
-                # Test with a simple endpoint
-                response = client.get(
-                    "https://api.zoominfo.com/search/contact",
-                    auth=auth,
-                    params={"limit": 1},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                
-                return {
-                    "status": "success",
-                    "message": "ZoomInfo connection successful",
-                    "data": response.json()
-                }
-        except httpx.HTTPStatusError as e:
-            return {
-                "status": "failed",
-                "message": f"ZoomInfo API error: {e.response.status_code}",
-                "error": e.response.text
-            }
-        except Exception as e:
-            return {
-                "status": "failed",
-                "message": f"Connection test failed: {str(e)}",
-                "error": str(e)
-            }
+    definition_id = "zoominfo"
     
     def get_capabilities(self) -> List[str]:
         """Get ZoomInfo capabilities"""
@@ -64,18 +20,3 @@ class ZoomInfoConnector(BaseConnector):
             "find_decision_makers",
             "get_company_intelligence"
         ]
-    
-    def execute_action(
-        self,
-        action: str,
-        params: Dict[str, Any],
-        credentials: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Execute ZoomInfo action"""
-        return {
-            "status": "not_implemented",
-            "message": f"Action {action} not yet implemented",
-            "action": action,
-            "params": params
-        }
-
@@ -4,6 +4,8 @@ Database connection management
 
 import os
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import logging
@@ -33,6 +35,49 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the synchronous URL schemes
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Async driver URL for the same database as a synchronous URL.
+    
+    Args:
+        url: Database URL (e.g. postgresql://...)
+        
+    Returns:
+        URL using asyncpg (PostgreSQL) or aiosqlite (SQLite)
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# Request handlers use the async engine so queries don't block the event
+# loop; background workers, the retention job and migrations use the sync one
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    # aiosqlite does not pool connections
+    **({} if make_url(ASYNC_DATABASE_URL).get_backend_name() == "sqlite" else {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": 3600,
+    }),
+    pool_pre_ping=True,
+    echo=os.getenv("SQL_DEBUG", "false").lower() == "true"
+)
+
+# Objects stay usable after commit without another round trip
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -54,11 +99,36 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency for FastAPI to get an async database session.
+    
+    Yields:
+        AsyncSession
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def close_async_engine():
+    """Close pooled async connections (on shutdown)."""
+    await async_engine.dispose()
+
+
 def init_db():
     """
-    Initialize database - create tables if they don't exist.
+    Initialize database according to DB_SCHEMA_MODE.
+    
+    - ``create_all`` (default): create tables if they don't exist
+    - ``migrations``: only verify the schema version; DDL is applied by the
+      one-shot migration job (``python -m src.database.migrations upgrade``)
     """
     try:
+        if os.getenv("DB_SCHEMA_MODE", "create_all").lower() == "migrations":
+            from .migrations import check_schema_version
+            check_schema_version()
+            return
+        
         # Import models to register them
         from .models import ServiceRegistry, ServiceConfiguration, ServiceConnector, ConnectionTest
         
@@ -68,4 +138,3 @@ def init_db():
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
         raise
-
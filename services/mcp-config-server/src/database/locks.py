@@ -0,0 +1,14 @@
+"""
+PostgreSQL advisory lock IDs
+
+Advisory locks are keyed by a bare integer per database server, so IDs
+must be unique across every service that may share a PostgreSQL
+instance. All IDs in use are listed in
+docs/architecture/postgres-advisory-locks.md; allocate new ones there.
+"""
+
+# Serializes concurrent migration jobs
+MIGRATION_LOCK_ID = 815_001
+
+# Lets only one replica run a connection health round at a time
+HEALTH_CHECK_LOCK_ID = 815_003
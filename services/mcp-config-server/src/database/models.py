@@ -2,7 +2,7 @@
 SQLAlchemy models for MCP Configuration Server
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey, JSON, LargeBinary
+from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey, JSON, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .connection import Base
@@ -39,6 +39,7 @@ class ServiceConfiguration(Base):
     service_id = Column(String(255), ForeignKey("service_registry.id", ondelete="CASCADE"), nullable=False)
     config_name = Column(String(255), nullable=False)
     encrypted_credentials = Column(LargeBinary, nullable=False)
+    encryption_key_id = Column(String(64))  # Master key version; NULL = written before envelope encryption
     settings = Column(JSON)
     status = Column(String(50), default="pending")  # pending, active, failed, disabled
     last_tested_at = Column(TIMESTAMP)
@@ -51,6 +52,10 @@ class ServiceConfiguration(Base):
     connection_tests = relationship("ConnectionTest", back_populates="configuration", cascade="all, delete-orphan")
     
     __table_args__ = (
+        Index("idx_service_configurations_encryption_key_id", "encryption_key_id"),
+        # Keyset pagination of filtered listings (WHERE service_id/status = ? AND id > ? ORDER BY id)
+        Index("idx_service_configurations_service_id_id", "service_id", "id"),
+        Index("idx_service_configurations_status_id", "status", "id"),
         {"schema": None},  # Use default schema
     )
 
@@ -88,4 +93,72 @@ class ConnectionTest(Base):
     
     # Relationships
     configuration = relationship("ServiceConfiguration", back_populates="connection_tests")
+    
+    __table_args__ = (
+        Index("idx_connection_tests_tested_at", "tested_at"),
+    )
+
+
+class ConnectionTestRollup(Base):
+    """Hourly connection test statistics per service"""
+    
+    __tablename__ = "connection_test_rollups"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    service_id = Column(String(255), nullable=False)  # No FK: history outlives removed services
+    hour = Column(TIMESTAMP, nullable=False)  # Start of the hour (UTC)
+    test_count = Column(Integer, nullable=False)
+    success_count = Column(Integer, nullable=False)
+    p50_duration_ms = Column(Integer)
+    p95_duration_ms = Column(Integer)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("service_id", "hour", name="uq_connection_test_rollups_service_hour"),
+        Index("idx_connection_test_rollups_hour", "hour"),
+    )
 
+
+class ActionJob(Base):
+    """Queued batch of connector actions"""
+    
+    __tablename__ = "action_jobs"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(255), unique=True)  # Resubmitting with the same key returns this job
+    configuration_id = Column(Integer, ForeignKey("service_configurations.id", ondelete="CASCADE"), nullable=False)
+    service_id = Column(String(255), nullable=False)
+    action = Column(String(255), nullable=False)
+    status = Column(String(50), nullable=False, default="queued")  # queued, running, succeeded, failed, cancelled
+    total_items = Column(Integer, nullable=False)
+    processed_items = Column(Integer, nullable=False, default=0)
+    succeeded_items = Column(Integer, nullable=False, default=0)
+    items = Column(LargeBinary, nullable=False)  # zlib-compressed JSON list of action parameters
+    error_message = Column(Text)
+    locked_by = Column(String(255))  # Worker running the job
+    heartbeat_at = Column(TIMESTAMP)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+    
+    __table_args__ = (
+        Index("idx_action_jobs_status_id", "status", "id"),
+    )
+
+
+class ActionJobResult(Base):
+    """Results of one chunk of a job"""
+    
+    __tablename__ = "action_job_results"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, ForeignKey("action_jobs.id", ondelete="CASCADE"), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    first_index = Column(Integer, nullable=False)  # Position of the chunk's first item in the job
+    item_count = Column(Integer, nullable=False)
+    results = Column(LargeBinary, nullable=False)  # zlib-compressed JSON list of results, in item order
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("job_id", "chunk_index", name="uq_action_job_results_job_chunk"),
+    )
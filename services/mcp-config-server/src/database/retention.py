@@ -0,0 +1,240 @@
+"""
+Connection test history retention and hourly rollups
+
+Raw ConnectionTest rows are aggregated into ConnectionTestRollup rows (test
+count, success count, p50/p95 duration per service and hour) and then
+deleted once older than CONNECTION_TEST_RETENTION_DAYS. Run
+``python -m src.database.retention`` from a cron job, or let each pod run
+it every CONNECTION_TEST_RETENTION_INTERVAL seconds. Both steps are
+idempotent, so overlapping runs on several replicas are harmless.
+"""
+
+import os
+import sys
+import math
+import time
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .connection import SessionLocal
+from .models import ConnectionTest, ConnectionTestRollup, ServiceConfiguration
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.getenv("CONNECTION_TEST_RETENTION_DAYS", "30"))
+ROLLUP_RETENTION_DAYS = int(os.getenv("CONNECTION_TEST_ROLLUP_RETENTION_DAYS", "365"))
+BATCH_SIZE = int(os.getenv("CONNECTION_TEST_PRUNE_BATCH_SIZE", "1000"))
+PAUSE_SECONDS = float(os.getenv("CONNECTION_TEST_PRUNE_PAUSE", "0.1"))
+# An hour is rolled up this long after it ends, so tests stamped late in the
+# hour whose transaction commits after it ended are still counted
+ROLLUP_GRACE_SECONDS = float(os.getenv("CONNECTION_TEST_ROLLUP_GRACE", "900"))
+
+HOUR = timedelta(hours=1)
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> Optional[int]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+
+def rollup_connection_tests(
+    session_factory: Callable[[], Session] = SessionLocal,
+    now: Optional[datetime] = None,
+    grace_seconds: float = ROLLUP_GRACE_SECONDS
+) -> int:
+    """
+    Aggregate every completed hour of test history not rolled up yet.
+
+    Hours are processed oldest first, one committed transaction per hour,
+    skipping hours without tests. Only one hour of (service, status,
+    duration) tuples is held in memory at a time. Rolled-up hours are
+    never revisited, so an hour is only rolled up once it ended at least
+    grace_seconds ago.
+
+    Args:
+        session_factory: Creates database sessions
+        now: Current time (UTC); the current, incomplete hour is never rolled up
+        grace_seconds: Time after an hour ends before it is rolled up
+
+    Returns:
+        Number of rollup rows written
+    """
+    end = _floor_hour((now or datetime.utcnow()) - timedelta(seconds=grace_seconds))
+    with session_factory() as db:
+        last_hour = db.execute(select(func.max(ConnectionTestRollup.hour))).scalar()
+    start = last_hour + HOUR if last_hour else None
+    written = 0
+
+    while True:
+        with session_factory() as db:
+            first_query = select(func.min(ConnectionTest.tested_at)).where(ConnectionTest.tested_at < end)
+            if start:
+                first_query = first_query.where(ConnectionTest.tested_at >= start)
+            first = db.execute(first_query).scalar()
+            if first is None:
+                break
+
+            hour = _floor_hour(first)
+            rows = db.execute(
+                select(ServiceConfiguration.service_id, ConnectionTest.test_status, ConnectionTest.test_duration_ms)
+                .join(ServiceConfiguration, ServiceConfiguration.id == ConnectionTest.configuration_id)
+                .where(ConnectionTest.tested_at >= hour, ConnectionTest.tested_at < hour + HOUR)
+            ).all()
+
+            counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+            durations: Dict[str, List[int]] = defaultdict(list)
+            for service_id, test_status, duration_ms in rows:
+                counts[service_id][0] += 1
+                if test_status == "success":
+                    counts[service_id][1] += 1
+                if duration_ms is not None:
+                    durations[service_id].append(duration_ms)
+
+            rollups = []
+            for service_id, (test_count, success_count) in counts.items():
+                values = sorted(durations[service_id])
+                rollups.append({
+                    "service_id": service_id,
+                    "hour": hour,
+                    "test_count": test_count,
+                    "success_count": success_count,
+                    "p50_duration_ms": _percentile(values, 0.5),
+                    "p95_duration_ms": _percentile(values, 0.95)
+                })
+
+            if rollups:
+                try:
+                    db.execute(insert(ConnectionTestRollup), rollups)
+                    db.commit()
+                    written += len(rollups)
+                except IntegrityError:
+                    # Another replica rolled this hour up first
+                    db.rollback()
+
+        start = hour + HOUR
+
+    if written:
+        logger.info(f"Wrote {written} connection test rollups (up to {end.isoformat()})")
+    return written
+
+
+def prune_connection_tests(
+    session_factory: Callable[[], Session] = SessionLocal,
+    retention_days: int = RETENTION_DAYS,
+    rollup_retention_days: int = ROLLUP_RETENTION_DAYS,
+    batch_size: int = BATCH_SIZE,
+    pause_seconds: float = PAUSE_SECONDS,
+    stop_event: Optional[threading.Event] = None,
+    now: Optional[datetime] = None
+) -> int:
+    """
+    Delete test history older than the retention period.
+
+    Rows are deleted by primary key in small committed batches, pausing
+    between batches, so no long-running transaction holds locks or bloats
+    the WAL. Rollups older than their own retention period are dropped too.
+
+    Args:
+        session_factory: Creates database sessions
+        retention_days: Days of raw history to keep
+        rollup_retention_days: Days of hourly rollups to keep
+        batch_size: Rows per batch
+        pause_seconds: Sleep between batches
+        stop_event: Set to stop after the current batch
+        now: Current time (UTC)
+
+    Returns:
+        Number of connection test rows deleted
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=retention_days)
+    deleted = 0
+
+    while not (stop_event and stop_event.is_set()):
+        with session_factory() as db:
+            ids = db.execute(
+                select(ConnectionTest.id)
+                .where(ConnectionTest.tested_at < cutoff)
+                .order_by(ConnectionTest.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.execute(delete(ConnectionTest).where(ConnectionTest.id.in_(ids)))
+            db.commit()
+        deleted += len(ids)
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    with session_factory() as db:
+        db.execute(
+            delete(ConnectionTestRollup)
+            .where(ConnectionTestRollup.hour < now - timedelta(days=rollup_retention_days))
+        )
+        db.commit()
+
+    if deleted:
+        logger.info(f"Pruned {deleted} connection tests older than {cutoff.isoformat()}")
+    return deleted
+
+
+def run_retention(
+    session_factory: Callable[[], Session] = SessionLocal,
+    stop_event: Optional[threading.Event] = None
+) -> Dict[str, int]:
+    """
+    Roll up, then prune, so no history is deleted before it is aggregated.
+
+    Returns:
+        Counts of rollups written and connection tests deleted
+    """
+    return {
+        "rollups": rollup_connection_tests(session_factory),
+        "deleted": prune_connection_tests(session_factory, stop_event=stop_event)
+    }
+
+
+def start_background_retention(interval_seconds: float) -> threading.Event:
+    """
+    Run run_retention() every `interval_seconds` in a daemon thread.
+
+    Returns:
+        Event that stops the thread when set
+    """
+    stop_event = threading.Event()
+
+    def run():
+        while not stop_event.is_set():
+            try:
+                run_retention(stop_event=stop_event)
+            except Exception as e:
+                logger.error(f"Connection test retention failed: {str(e)}")
+            stop_event.wait(interval_seconds)
+
+    threading.Thread(target=run, name="connection-test-retention", daemon=True).start()
+    return stop_event
+
+
+def main() -> int:
+    """Entry point for a one-shot retention job"""
+    logging.basicConfig(level=logging.INFO)
+    counts = run_retention()
+    logger.info(f"Connection test retention finished: {counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
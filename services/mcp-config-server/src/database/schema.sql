@@ -21,6 +21,7 @@ CREATE TABLE IF NOT EXISTS service_configurations (
     service_id VARCHAR(255) NOT NULL REFERENCES service_registry(id) ON DELETE CASCADE,
     config_name VARCHAR(255) NOT NULL,
     encrypted_credentials BYTEA NOT NULL,
+    encryption_key_id VARCHAR(64), -- master key version; NULL = written before envelope encryption
     settings JSONB,
     status VARCHAR(50) DEFAULT 'pending', -- pending, active, failed, disabled
     last_tested_at TIMESTAMP,
@@ -53,11 +54,60 @@ CREATE TABLE IF NOT EXISTS connection_tests (
     tested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Connection Test Rollups: Hourly test statistics per service (raw history is pruned)
+CREATE TABLE IF NOT EXISTS connection_test_rollups (
+    id SERIAL PRIMARY KEY,
+    service_id VARCHAR(255) NOT NULL,
+    hour TIMESTAMP NOT NULL,
+    test_count INTEGER NOT NULL,
+    success_count INTEGER NOT NULL,
+    p50_duration_ms INTEGER,
+    p95_duration_ms INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_connection_test_rollups_service_hour UNIQUE(service_id, hour)
+);
+
+-- Action Jobs: Queued batches of connector actions
+CREATE TABLE IF NOT EXISTS action_jobs (
+    id SERIAL PRIMARY KEY,
+    idempotency_key VARCHAR(255) UNIQUE,
+    configuration_id INTEGER NOT NULL REFERENCES service_configurations(id) ON DELETE CASCADE,
+    service_id VARCHAR(255) NOT NULL,
+    action VARCHAR(255) NOT NULL,
+    status VARCHAR(50) NOT NULL DEFAULT 'queued', -- queued, running, succeeded, failed, cancelled
+    total_items INTEGER NOT NULL,
+    processed_items INTEGER NOT NULL DEFAULT 0,
+    succeeded_items INTEGER NOT NULL DEFAULT 0,
+    items BYTEA NOT NULL, -- zlib-compressed JSON list of action parameters
+    error_message TEXT,
+    locked_by VARCHAR(255),
+    heartbeat_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Action Job Results: Compressed results, one row per chunk of items
+CREATE TABLE IF NOT EXISTS action_job_results (
+    id SERIAL PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES action_jobs(id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    first_index INTEGER NOT NULL,
+    item_count INTEGER NOT NULL,
+    results BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_action_job_results_job_chunk UNIQUE(job_id, chunk_index)
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_service_registry_category ON service_registry(category);
 CREATE INDEX IF NOT EXISTS idx_service_registry_active ON service_registry(is_active);
 CREATE INDEX IF NOT EXISTS idx_service_configurations_service_id ON service_configurations(service_id);
 CREATE INDEX IF NOT EXISTS idx_service_configurations_status ON service_configurations(status);
+CREATE INDEX IF NOT EXISTS idx_service_configurations_encryption_key_id ON service_configurations(encryption_key_id);
+CREATE INDEX IF NOT EXISTS idx_service_configurations_service_id_id ON service_configurations(service_id, id);
+CREATE INDEX IF NOT EXISTS idx_service_configurations_status_id ON service_configurations(status, id);
 CREATE INDEX IF NOT EXISTS idx_connection_tests_configuration_id ON connection_tests(configuration_id);
 CREATE INDEX IF NOT EXISTS idx_connection_tests_tested_at ON connection_tests(tested_at);
-
+CREATE INDEX IF NOT EXISTS idx_connection_test_rollups_hour ON connection_test_rollups(hour);
+CREATE INDEX IF NOT EXISTS idx_action_jobs_status_id ON action_jobs(status, id);
@@ -0,0 +1,124 @@
+"""
+Short-lived cache of decrypted service credentials
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+def _zeroize(buffer: bytearray):
+    """Overwrite a plaintext buffer in place."""
+    buffer[:] = b"\x00" * len(buffer)
+
+
+class CredentialCache:
+    """
+    Bounded, TTL-limited cache of decrypted credentials.
+
+    Entries are keyed by (configuration id, ciphertext hash), so updated
+    credentials never hit a stale entry. Plaintext is held in bytearrays
+    that are overwritten when an entry expires or is evicted; a timer
+    sweeps expired entries even if they are never read again. This is
+    best-effort: dictionaries handed to callers are ordinary Python
+    objects and cannot be wiped.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 256):
+        """
+        Initialize cache.
+
+        Args:
+            ttl_seconds: Seconds to keep decrypted credentials
+            max_entries: Maximum number of cached credential sets
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, bytearray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweep: Optional[threading.Timer] = None
+
+    @staticmethod
+    def make_key(config_id: Hashable, ciphertext: bytes) -> Tuple[Hashable, str]:
+        """Build the cache key of an encrypted credential blob"""
+        return config_id, hashlib.sha256(ciphertext).hexdigest()
+
+    def get(self, key: Tuple[Hashable, str]) -> Optional[bytes]:
+        """
+        Get cached plaintext.
+
+        Returns:
+            Plaintext bytes, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, plaintext = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                _zeroize(plaintext)
+                return None
+            self._entries.move_to_end(key)
+            return bytes(plaintext)
+
+    def set(self, key: Tuple[Hashable, str], plaintext: bytes):
+        """
+        Cache plaintext.
+
+        Args:
+            key: Key from make_key()
+            plaintext: Decrypted credential bytes
+        """
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                _zeroize(previous[1])
+            self._purge_expired()
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, bytearray(plaintext))
+            while len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                _zeroize(evicted)
+            self._schedule_sweep()
+
+    def _purge_expired(self):
+        """Drop and wipe expired entries (caller holds the lock)."""
+        now = time.monotonic()
+        # Reads reorder entries, so expiry order is not insertion order; the cache is small
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            _zeroize(self._entries.pop(key)[1])
+
+    def _schedule_sweep(self):
+        """Start a timer for the earliest expiry unless one is pending (caller holds the lock)."""
+        if self._sweep is not None or not self._entries:
+            return
+        delay = min(expires_at for expires_at, _ in self._entries.values()) - time.monotonic()
+        self._sweep = threading.Timer(max(delay, 0) + 0.01, self._run_sweep)
+        self._sweep.daemon = True
+        self._sweep.start()
+
+    def _run_sweep(self):
+        with self._lock:
+            self._sweep = None
+            self._purge_expired()
+            self._schedule_sweep()
+
+    def invalidate(self, config_id: Hashable):
+        """Drop every cached entry of a configuration."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == config_id]:
+                _zeroize(self._entries.pop(key)[1])
+
+    def clear(self):
+        """Drop and wipe all entries."""
+        with self._lock:
+            for _, plaintext in self._entries.values():
+                _zeroize(plaintext)
+            self._entries.clear()
+            if self._sweep is not None:
+                self._sweep.cancel()
+                self._sweep = None
@@ -5,18 +5,63 @@ Credential encryption and decryption using Fernet
 import os
 import json
 import logging
-from typing import Dict, Any, Optional
-from cryptography.fernet import Fernet
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+from cryptography.fernet import Fernet, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
 import base64
+from .credential_cache import CredentialCache
 
 logger = logging.getLogger(__name__)
 
+PBKDF2_ITERATIONS = 100000
+
+# Threads encrypting/decrypting batches; the OpenSSL calls run outside the GIL
+CRYPTO_WORKERS = int(os.getenv("CREDENTIAL_CRYPTO_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+# Envelope format: env1:<master key id>:<data key wrapped by master key>:<credentials encrypted with data key>
+# (Fernet tokens are urlsafe base64, so ":" never occurs inside them)
+ENVELOPE_PREFIX = b"env1"
+
+
+def derive_fernet_key(password: bytes, salt: bytes) -> bytes:
+    """Derive a Fernet key with PBKDF2-HMAC-SHA256 (uncached)."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=PBKDF2_ITERATIONS,
+        backend=default_backend()
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password))
+
+
+@lru_cache(maxsize=8)
+def _pbkdf2_fernet_key(password: bytes, salt: bytes) -> bytes:
+    """
+    Derive the Fernet key of a master key passphrase.
+    
+    Cached per process: the derivation is deliberately slow and every
+    CredentialManager built from the same key and salt needs the same result.
+    """
+    return derive_fernet_key(password, salt)
+
 
 class CredentialManager:
-    """Manages encryption and decryption of service credentials"""
+    """
+    Manages encryption and decryption of service credentials.
+    
+    Credentials are envelope-encrypted: each value gets its own random data
+    key, and only that data key is encrypted with the versioned master key
+    (ENCRYPTION_KEY, identified by ENCRYPTION_KEY_ID). Rotating the master
+    key therefore only re-wraps data keys, and values encrypted under
+    retired master keys (ENCRYPTION_PREVIOUS_KEYS) remain readable until
+    they are re-encrypted. Values written before envelope encryption (plain
+    Fernet tokens) are still decrypted with any known master key.
+    """
     
     def __init__(self, encryption_key: Optional[str] = None):
         """
@@ -40,6 +85,17 @@ class CredentialManager:
         except Exception as e:
             logger.error(f"Failed to initialize Fernet cipher: {str(e)}")
             raise ValueError("Invalid encryption key format")
+        
+        self.primary_key_id = os.getenv("ENCRYPTION_KEY_ID", "v1")
+        self.master_keys: Dict[str, Fernet] = {self.primary_key_id: self.cipher}
+        for key_id, key in self._parse_previous_keys(os.getenv("ENCRYPTION_PREVIOUS_KEYS", "")):
+            self.master_keys.setdefault(key_id, key)
+        self._legacy_cipher = MultiFernet(list(self.master_keys.values()))
+        
+        self.credential_cache = CredentialCache(
+            ttl_seconds=float(os.getenv("CREDENTIAL_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("CREDENTIAL_CACHE_SIZE", "256"))
+        )
     
     def _get_or_create_key(self) -> bytes:
         """
@@ -94,15 +150,101 @@ class CredentialManager:
                 logger.warning("ENCRYPTION_SALT not set - using default (not recommended)")
             salt = b'mcp_config_server_salt_v1'  # Default for development only
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-            backend=default_backend()
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password))
-        return key
+        return _pbkdf2_fernet_key(password, salt)
+    
+    def _parse_previous_keys(self, value: str) -> List[Tuple[str, Fernet]]:
+        """
+        Parse retired master keys.
+        
+        Args:
+            value: Comma-separated "<key id>:<key>" pairs
+            
+        Returns:
+            List of (key id, Fernet) tuples
+        """
+        keys = []
+        for entry in filter(None, (part.strip() for part in value.split(","))):
+            key_id, separator, key = entry.partition(":")
+            if not separator or not key:
+                raise ValueError("ENCRYPTION_PREVIOUS_KEYS entries must look like '<key id>:<key>'")
+            key_bytes = key.encode()
+            if len(key_bytes) != 44:
+                key_bytes = self._derive_key(key_bytes)
+            keys.append((key_id, Fernet(key_bytes)))
+        return keys
+    
+    def _encrypt_envelope(self, plaintext: bytes) -> bytes:
+        """Encrypt plaintext with a fresh data key wrapped by the primary master key."""
+        data_key = Fernet.generate_key()
+        return b":".join([
+            ENVELOPE_PREFIX,
+            self.primary_key_id.encode(),
+            self.cipher.encrypt(data_key),
+            Fernet(data_key).encrypt(plaintext)
+        ])
+    
+    def _parse_envelope(self, encrypted_data: bytes) -> Optional[Tuple[str, bytes, bytes]]:
+        """
+        Split an envelope into (master key id, wrapped data key, payload).
+        
+        Returns:
+            Tuple, or None for values written before envelope encryption
+        """
+        if not encrypted_data.startswith(ENVELOPE_PREFIX + b":"):
+            return None
+        parts = encrypted_data.split(b":", 3)
+        if len(parts) != 4:
+            raise ValueError("Malformed encrypted credentials envelope")
+        return parts[1].decode(), parts[2], parts[3]
+    
+    def _unwrap_data_key(self, key_id: str, wrapped_key: bytes) -> bytes:
+        """Decrypt a data key with the master key it was wrapped with."""
+        master = self.master_keys.get(key_id)
+        if master is None:
+            raise ValueError(f"Unknown master key version '{key_id}'")
+        return master.decrypt(wrapped_key)
+    
+    def _decrypt_bytes(self, encrypted_data: bytes) -> bytes:
+        """Decrypt an envelope or a legacy Fernet token to plaintext bytes."""
+        envelope = self._parse_envelope(encrypted_data)
+        if envelope is None:
+            return self._legacy_cipher.decrypt(encrypted_data)
+        key_id, wrapped_key, payload = envelope
+        return Fernet(self._unwrap_data_key(key_id, wrapped_key)).decrypt(payload)
+    
+    def get_key_id(self, encrypted_data: bytes) -> Optional[str]:
+        """
+        Get the master key version encrypted data is wrapped with.
+        
+        Returns:
+            Key ID, or None for values written before envelope encryption
+        """
+        envelope = self._parse_envelope(encrypted_data)
+        return envelope[0] if envelope else None
+    
+    def rewrap(self, encrypted_data: bytes) -> bytes:
+        """
+        Re-encrypt data under the primary master key.
+        
+        Envelopes only get their data key re-wrapped (the payload is
+        untouched); legacy values are converted to envelopes.
+        
+        Args:
+            encrypted_data: Encrypted credentials bytes
+            
+        Returns:
+            Encrypted bytes wrapped by the primary master key (unchanged if
+            already wrapped by it)
+        """
+        envelope = self._parse_envelope(encrypted_data)
+        if envelope is None:
+            return self._encrypt_envelope(self._legacy_cipher.decrypt(encrypted_data))
+        
+        key_id, wrapped_key, payload = envelope
+        if key_id == self.primary_key_id:
+            return encrypted_data
+        data_key = self._unwrap_data_key(key_id, wrapped_key)
+        return b":".join([ENVELOPE_PREFIX, self.primary_key_id.encode(), self.cipher.encrypt(data_key), payload])
     
     def encrypt_credentials(self, credentials: Dict[str, Any]) -> bytes:
         """
@@ -120,7 +262,7 @@ class CredentialManager:
             credentials_bytes = credentials_json.encode('utf-8')
             
             # Encrypt
-            encrypted = self.cipher.encrypt(credentials_bytes)
+            encrypted = self._encrypt_envelope(credentials_bytes)
             
             return encrypted
         except Exception as e:
@@ -139,7 +281,7 @@ class CredentialManager:
         """
         try:
             # Decrypt
-            decrypted_bytes = self.cipher.decrypt(encrypted_data)
+            decrypted_bytes = self._decrypt_bytes(encrypted_data)
             
             # Convert back to dictionary
             credentials_json = decrypted_bytes.decode('utf-8')
@@ -150,6 +292,54 @@ class CredentialManager:
             logger.error(f"Error decrypting credentials: {str(e)}")
             raise ValueError(f"Failed to decrypt credentials: {str(e)}")
     
+    def decrypt_configuration_credentials(self, config_id: Hashable, encrypted_data: bytes) -> Dict[str, Any]:
+        """
+        Decrypt the credentials of a stored configuration, using the
+        short-lived decrypted-credential cache.
+        
+        Args:
+            config_id: Configuration identifier
+            encrypted_data: Encrypted credentials bytes
+            
+        Returns:
+            Decrypted credentials dictionary (a fresh copy on every call)
+        """
+        key = CredentialCache.make_key(config_id, encrypted_data)
+        plaintext = self.credential_cache.get(key)
+        if plaintext is None:
+            try:
+                plaintext = self._decrypt_bytes(encrypted_data)
+            except Exception as e:
+                logger.error(f"Error decrypting credentials: {str(e)}")
+                raise ValueError(f"Failed to decrypt credentials: {str(e)}")
+            self.credential_cache.set(key, plaintext)
+        
+        return json.loads(plaintext.decode('utf-8'))
+    
+    def encrypt_many(self, credentials_list: List[Dict[str, Any]]) -> List[bytes]:
+        """
+        Encrypt many credentials dictionaries on the crypto thread pool.
+        
+        Args:
+            credentials_list: Credentials dictionaries
+            
+        Returns:
+            Encrypted bytes, in input order
+        """
+        return list(_get_crypto_pool().map(self.encrypt_credentials, credentials_list))
+    
+    def decrypt_many(self, encrypted_list: List[bytes]) -> List[Dict[str, Any]]:
+        """
+        Decrypt many encrypted credentials on the crypto thread pool.
+        
+        Args:
+            encrypted_list: Encrypted credentials bytes
+            
+        Returns:
+            Credentials dictionaries, in input order
+        """
+        return list(_get_crypto_pool().map(self.decrypt_credentials, encrypted_list))
+    
     def encrypt_string(self, plaintext: str) -> str:
         """
         Encrypt a string and return base64-encoded result.
@@ -180,6 +370,14 @@ class CredentialManager:
 
 # Global instance
 _credential_manager: Optional[CredentialManager] = None
+_crypto_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_crypto_pool() -> ThreadPoolExecutor:
+    global _crypto_pool
+    if _crypto_pool is None:
+        _crypto_pool = ThreadPoolExecutor(max_workers=CRYPTO_WORKERS, thread_name_prefix="credential-crypto")
+    return _crypto_pool
 
 
 def get_credential_manager() -> CredentialManager:
@@ -0,0 +1,141 @@
+"""
+Background re-encryption of stored credentials after a master key rotation
+
+Rotation procedure:
+    1. Deploy with the new key as ENCRYPTION_KEY / ENCRYPTION_KEY_ID and the
+       old one in ENCRYPTION_PREVIOUS_KEYS (both stay readable).
+    2. Run ``python -m src.encryption.reencryption`` (or set
+       CREDENTIAL_REENCRYPTION_ON_STARTUP=true) until it reports no rows left.
+    3. Remove the old key from ENCRYPTION_PREVIOUS_KEYS.
+
+Only the per-row data keys are re-wrapped, in small committed batches, so
+the job can be stopped and restarted at any point without downtime.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from ..database.connection import SessionLocal
+from ..database.models import ServiceConfiguration
+from .credential_manager import CredentialManager, get_credential_manager
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv("CREDENTIAL_REENCRYPTION_BATCH_SIZE", "100"))
+PAUSE_SECONDS = float(os.getenv("CREDENTIAL_REENCRYPTION_PAUSE", "0.5"))
+
+
+def reencrypt_credentials(
+    session_factory: Callable[[], Session] = SessionLocal,
+    credential_manager: Optional[CredentialManager] = None,
+    batch_size: int = BATCH_SIZE,
+    pause_seconds: float = PAUSE_SECONDS,
+    stop_event: Optional[threading.Event] = None
+) -> Dict[str, int]:
+    """
+    Re-wrap every configuration not yet under the primary master key.
+
+    Rows are processed in primary-key order, one committed batch at a
+    time, pausing between batches to limit database load. Each row is
+    updated only if its ciphertext is unchanged since it was read, so
+    concurrent credential updates are never overwritten.
+
+    Args:
+        session_factory: Creates database sessions
+        credential_manager: Credential manager holding the master keys
+        batch_size: Rows per batch
+        pause_seconds: Sleep between batches
+        stop_event: Set to stop after the current batch
+
+    Returns:
+        Counts of reencrypted, skipped (changed concurrently) and failed rows
+    """
+    credential_manager = credential_manager or get_credential_manager()
+    primary_key_id = credential_manager.primary_key_id
+    counts = {"reencrypted": 0, "skipped": 0, "failed": 0}
+    last_id = 0
+
+    while not (stop_event and stop_event.is_set()):
+        with session_factory() as db:
+            rows = db.execute(
+                select(ServiceConfiguration.id, ServiceConfiguration.encrypted_credentials)
+                .where(
+                    ServiceConfiguration.id > last_id,
+                    or_(
+                        ServiceConfiguration.encryption_key_id.is_(None),
+                        ServiceConfiguration.encryption_key_id != primary_key_id
+                    )
+                )
+                .order_by(ServiceConfiguration.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            for config_id, encrypted in rows:
+                last_id = config_id
+                try:
+                    rewrapped = credential_manager.rewrap(encrypted)
+                except Exception as e:
+                    counts["failed"] += 1
+                    logger.error(f"Cannot re-encrypt credentials of configuration {config_id}: {str(e)}")
+                    continue
+
+                result = db.execute(
+                    update(ServiceConfiguration)
+                    .where(
+                        ServiceConfiguration.id == config_id,
+                        ServiceConfiguration.encrypted_credentials == encrypted
+                    )
+                    .values(
+                        encrypted_credentials=rewrapped,
+                        encryption_key_id=primary_key_id,
+                        updated_at=ServiceConfiguration.updated_at
+                    )
+                )
+                counts["reencrypted" if result.rowcount else "skipped"] += 1
+
+            db.commit()
+
+        logger.info(f"Re-encryption progress: {counts} (last configuration id {last_id})")
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    logger.info(f"Re-encryption to master key {primary_key_id} finished: {counts}")
+    return counts
+
+
+def start_background_reencryption() -> threading.Event:
+    """
+    Run reencrypt_credentials() in a daemon thread.
+
+    Returns:
+        Event that stops the job after its current batch when set
+    """
+    stop_event = threading.Event()
+
+    def run():
+        try:
+            reencrypt_credentials(stop_event=stop_event)
+        except Exception as e:
+            logger.error(f"Background re-encryption failed: {str(e)}")
+
+    threading.Thread(target=run, name="credential-reencryption", daemon=True).start()
+    return stop_event
+
+
+def main() -> int:
+    """Entry point for a one-shot re-encryption job"""
+    logging.basicConfig(level=logging.INFO)
+    counts = reencrypt_credentials()
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
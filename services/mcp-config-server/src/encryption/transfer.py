@@ -0,0 +1,93 @@
+"""
+Encryption of configuration exports
+
+Exports move configurations between deployments with different master
+keys, so credentials are re-encrypted under a key derived from a
+passphrase shared out of band. The export is newline-delimited JSON: a
+header line carrying the key derivation salt, then one line per
+configuration with its credentials as a Fernet token.
+"""
+
+import os
+import json
+import base64
+import binascii
+from typing import Dict, Any, Optional
+from cryptography.fernet import Fernet, InvalidToken
+from .credential_manager import PBKDF2_ITERATIONS, derive_fernet_key
+
+EXPORT_FORMAT = "mcp-configurations"
+EXPORT_VERSION = 1
+
+# Passphrases shorter than this are rejected
+MIN_PASSPHRASE_LENGTH = 16
+
+
+class TransferCipher:
+    """Encrypts and decrypts credentials in configuration exports"""
+
+    def __init__(self, passphrase: str, salt: Optional[bytes] = None):
+        """
+        Initialize cipher.
+
+        Args:
+            passphrase: Secret shared between the exporting and importing deployment
+            salt: Key derivation salt (a fresh one for exports; the header's for imports)
+
+        Raises:
+            ValueError: If the passphrase is too short
+        """
+        if len(passphrase) < MIN_PASSPHRASE_LENGTH:
+            raise ValueError(f"Transfer passphrase must be at least {MIN_PASSPHRASE_LENGTH} characters")
+        self.salt = salt or os.urandom(16)
+        # Not cached: every export has a fresh salt, and transfer passphrases
+        # should not outlive the request in memory
+        self._fernet = Fernet(derive_fernet_key(passphrase.encode("utf-8"), self.salt))
+
+    @classmethod
+    def from_header(cls, passphrase: str, header: Dict[str, Any]) -> "TransferCipher":
+        """
+        Create the cipher for an export from its header line.
+
+        Raises:
+            ValueError: If the header is not a supported export header
+        """
+        if not isinstance(header, dict):
+            raise ValueError("Not a supported configuration export")
+        if header.get("format") != EXPORT_FORMAT or header.get("version") != EXPORT_VERSION:
+            raise ValueError("Not a supported configuration export")
+        if header.get("iterations") != PBKDF2_ITERATIONS:
+            raise ValueError(f"Unsupported key derivation iterations: {header.get('iterations')}")
+        try:
+            salt = base64.b64decode(header["salt"], validate=True)
+        except (KeyError, TypeError, binascii.Error):
+            raise ValueError("Export header has no valid key derivation salt")
+        if not salt:
+            raise ValueError("Export header has no valid key derivation salt")
+        return cls(passphrase, salt)
+
+    def header(self) -> Dict[str, Any]:
+        """Header line of an export encrypted with this cipher"""
+        return {
+            "format": EXPORT_FORMAT,
+            "version": EXPORT_VERSION,
+            "kdf": "pbkdf2-sha256",
+            "iterations": PBKDF2_ITERATIONS,
+            "salt": base64.b64encode(self.salt).decode("ascii")
+        }
+
+    def encrypt(self, credentials: Dict[str, Any]) -> str:
+        """Encrypt credentials to a Fernet token"""
+        return self._fernet.encrypt(json.dumps(credentials).encode("utf-8")).decode("ascii")
+
+    def decrypt(self, token: str) -> Dict[str, Any]:
+        """
+        Decrypt a Fernet token from an export.
+
+        Raises:
+            ValueError: If the token was not encrypted with this passphrase
+        """
+        try:
+            return json.loads(self._fernet.decrypt(token.encode("ascii")))
+        except InvalidToken:
+            raise ValueError("Credentials cannot be decrypted with this transfer passphrase")
@@ -0,0 +1,325 @@
+"""
+Background connection-health checks for configured services
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from sqlalchemy import Connection, insert, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from .database.connection import SessionLocal
+from .database.locks import HEALTH_CHECK_LOCK_ID
+from .database.models import ServiceConfiguration, ConnectionTest
+from .encryption.credential_manager import get_credential_manager
+from .plugin_loader import get_plugin_loader
+from .connectors.base_connector import run_test_connection
+
+logger = logging.getLogger(__name__)
+
+# Configurations the scheduler tests (disabled ones are left alone). Pending
+# ones are included so bulk-created rows whose background test never ran
+# (test_connections=false, or lost to a restart) still get a status
+CHECKED_STATUSES = ("active", "failed", "pending")
+
+# A configuration is due again after this fraction of the interval, which
+# absorbs clock skew between replicas without testing anything twice per interval
+DUE_AFTER_FRACTION = 0.9
+
+
+class HealthScheduler:
+    """
+    Periodically tests every configured service connection.
+
+    Each round loads the configurations to check that no replica tested
+    within the interval, tests them concurrently (start times spread over
+    `jitter` seconds, at most `vendor_concurrency` tests per vendor) and
+    writes all results back in two bulk statements. The API serves the
+    stored status instead of calling vendors.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        jitter: float = 30.0,
+        concurrency: int = 20,
+        vendor_concurrency: int = 2,
+        timeout: float = 15.0,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            interval: Seconds between rounds
+            jitter: Spread test start times over up to this many seconds
+            concurrency: Maximum tests running at once
+            vendor_concurrency: Maximum tests running at once per vendor
+            timeout: Seconds before a single test counts as failed
+            session_factory: Creates database sessions
+        """
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.vendor_concurrency = vendor_concurrency
+        self.timeout = timeout
+        self.session_factory = session_factory
+        self.last_round: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start running rounds on the current event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Connection health checks every {self.interval}s")
+
+    async def stop(self):
+        """Cancel the scheduler task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Connection health round failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """
+        Test all checked configurations once.
+
+        Configurations tested less than DUE_AFTER_FRACTION of the interval
+        ago (by any replica) are skipped, so replicas with independent
+        timers do not repeat each other's tests.
+
+        Returns:
+            Number of configurations tested (0 if another replica holds the round lock)
+        """
+        lock_conn = await asyncio.to_thread(self._acquire_round_lock)
+        if lock_conn is None:
+            logger.debug("Connection health round already running on another replica")
+            return 0
+
+        try:
+            started = time.monotonic()
+            due_before = datetime.utcnow() - timedelta(seconds=self.interval * DUE_AFTER_FRACTION)
+            configs = await asyncio.to_thread(self._load_configurations, None, due_before)
+            outcomes = await self._test_and_store(configs, self.jitter)
+
+            succeeded = sum(1 for _, result, _ in outcomes if result.get("status") == "success")
+            self.last_round = {
+                "finished_at": datetime.utcnow().isoformat(),
+                "duration_ms": int((time.monotonic() - started) * 1000),
+                "tested": len(outcomes),
+                "succeeded": succeeded,
+                "failed": len(outcomes) - succeeded
+            }
+            logger.info(f"Connection health round finished: {self.last_round}")
+            return len(outcomes)
+        finally:
+            await asyncio.to_thread(self._release_round_lock, lock_conn)
+
+    async def test_configurations(self, config_ids: List[int]) -> int:
+        """
+        Test specific configurations now, whatever their status.
+
+        Used for configurations created in bulk, whose tests are deferred
+        until after they are saved. The same concurrency limits apply,
+        without start-time jitter.
+
+        Args:
+            config_ids: Configurations to test
+
+        Returns:
+            Number of configurations tested
+        """
+        configs = await asyncio.to_thread(self._load_configurations, config_ids)
+        outcomes = await self._test_and_store(configs, 0)
+        logger.info(f"Tested {len(outcomes)} of {len(config_ids)} new configurations")
+        return len(outcomes)
+
+    async def _test_and_store(
+        self,
+        configs: List[Tuple[int, str, bytes]],
+        jitter: float
+    ) -> List[Tuple[int, Dict[str, Any], int]]:
+        """Test configurations concurrently and store the results."""
+        overall = asyncio.Semaphore(self.concurrency)
+        per_vendor: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.vendor_concurrency))
+        outcomes = await asyncio.gather(*(
+            self._check(config_id, service_id, encrypted, overall, per_vendor[service_id], jitter)
+            for config_id, service_id, encrypted in configs
+        ))
+        outcomes = [outcome for outcome in outcomes if outcome]
+
+        if outcomes:
+            await asyncio.to_thread(self._store_results, outcomes)
+        return outcomes
+
+    async def _check(
+        self,
+        config_id: int,
+        service_id: str,
+        encrypted: bytes,
+        overall: asyncio.Semaphore,
+        vendor: asyncio.Semaphore,
+        jitter: float
+    ) -> Optional[Tuple[int, Dict[str, Any], int]]:
+        """
+        Test one configuration.
+
+        Returns:
+            Tuple of (configuration id, test result, duration in ms), or
+            None if no connector is available for the service
+        """
+        if jitter:
+            await asyncio.sleep(random.uniform(0, jitter))
+
+        connector = get_plugin_loader().get_connector(service_id)
+        if not connector:
+            return None
+
+        async with vendor, overall:
+            started = time.monotonic()
+            try:
+                credentials = get_credential_manager().decrypt_configuration_credentials(config_id, encrypted)
+                result = await asyncio.wait_for(run_test_connection(connector, credentials), self.timeout)
+            except asyncio.TimeoutError:
+                result = {"status": "timeout", "message": f"Connection test timed out after {self.timeout}s"}
+            except Exception as e:
+                result = {"status": "failed", "message": f"Connection test failed: {str(e)}", "error": str(e)}
+            return config_id, result, int((time.monotonic() - started) * 1000)
+
+    def _acquire_round_lock(self) -> Optional[Connection]:
+        """
+        Take the round lock on a dedicated autocommit connection, so no
+        transaction stays open during the round.
+
+        Returns:
+            The connection holding the lock, or None if another replica holds it
+        """
+        with self.session_factory() as db:
+            bind = db.get_bind()
+        conn = bind.connect().execution_options(isolation_level="AUTOCOMMIT")
+        if conn.dialect.name == "postgresql":
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": HEALTH_CHECK_LOCK_ID}
+            ).scalar()
+            if not acquired:
+                conn.close()
+                return None
+        return conn
+
+    def _release_round_lock(self, conn: Connection):
+        try:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": HEALTH_CHECK_LOCK_ID})
+        finally:
+            conn.close()
+
+    def _load_configurations(
+        self,
+        config_ids: Optional[List[int]] = None,
+        due_before: Optional[datetime] = None
+    ) -> List[Tuple[int, str, bytes]]:
+        query = select(
+            ServiceConfiguration.id,
+            ServiceConfiguration.service_id,
+            ServiceConfiguration.encrypted_credentials
+        )
+        if config_ids is None:
+            query = query.where(ServiceConfiguration.status.in_(CHECKED_STATUSES))
+            if due_before is not None:
+                query = query.where(or_(
+                    ServiceConfiguration.last_tested_at.is_(None),
+                    ServiceConfiguration.last_tested_at < due_before
+                ))
+        else:
+            query = query.where(ServiceConfiguration.id.in_(config_ids))
+        with self.session_factory() as db:
+            rows = db.execute(query).all()
+        return [tuple(row) for row in rows]
+
+    def _store_results(self, outcomes: List[Tuple[int, Dict[str, Any], int]]):
+        """
+        Write test results with one bulk UPDATE and one bulk INSERT.
+
+        Results of configurations deleted while they were being tested are
+        dropped; the rest are locked first so they cannot disappear before
+        the commit.
+        """
+        tested_at = datetime.utcnow()
+        with self.session_factory() as db:
+            existing = set(db.scalars(
+                select(ServiceConfiguration.id)
+                .where(ServiceConfiguration.id.in_([config_id for config_id, _, _ in outcomes]))
+                .with_for_update()
+            ))
+            outcomes = [outcome for outcome in outcomes if outcome[0] in existing]
+            if not outcomes:
+                return
+            db.execute(
+                update(ServiceConfiguration),
+                [
+                    {
+                        "id": config_id,
+                        "status": "active" if result.get("status") == "success" else "failed",
+                        "last_tested_at": tested_at,
+                        "last_test_result": result
+                    }
+                    for config_id, result, _ in outcomes
+                ]
+            )
+            db.execute(
+                insert(ConnectionTest),
+                [
+                    {
+                        "configuration_id": config_id,
+                        "test_status": result.get("status", "unknown"),
+                        "test_result": result,
+                        "error_message": result.get("error"),
+                        "test_duration_ms": duration_ms,
+                        "tested_at": tested_at
+                    }
+                    for config_id, result, duration_ms in outcomes
+                ]
+            )
+            db.commit()
+
+
+# Global scheduler instance
+_health_scheduler: Optional[HealthScheduler] = None
+
+
+def get_health_scheduler() -> Optional[HealthScheduler]:
+    """
+    Get or create the global scheduler from HEALTH_CHECK_* environment variables.
+
+    Returns:
+        HealthScheduler instance, or None if HEALTH_CHECK_INTERVAL is 0 (the default)
+    """
+    global _health_scheduler
+    if _health_scheduler is None:
+        interval = float(os.getenv("HEALTH_CHECK_INTERVAL", "0"))
+        if interval <= 0:
+            return None
+        _health_scheduler = HealthScheduler(
+            interval=interval,
+            jitter=float(os.getenv("HEALTH_CHECK_JITTER", "30")),
+            concurrency=int(os.getenv("HEALTH_CHECK_CONCURRENCY", "20")),
+            vendor_concurrency=int(os.getenv("HEALTH_CHECK_VENDOR_CONCURRENCY", "2")),
+            timeout=float(os.getenv("HEALTH_CHECK_TIMEOUT", "15"))
+        )
+    return _health_scheduler
@@ -0,0 +1,504 @@
+"""
+Persistent queue for long-running connector action batches
+
+A submitted job stores its items (compressed) in action_jobs and is run by
+a JobWorker: in the API process, or in dedicated worker processes started
+with ``python -m src.jobs``. Workers claim queued jobs with a conditional
+update, so any number of them can share the table, and run the items in
+chunks of JOB_CHUNK_SIZE. Each chunk's results are stored as one
+compressed row together with the job's progress counters in the same
+transaction; a job whose worker stops heartbeating is requeued and resumed
+after its last stored chunk.
+"""
+
+import os
+import sys
+import json
+import zlib
+import uuid
+import socket
+import signal
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .database.connection import SessionLocal
+from .database.models import ActionJob, ActionJobResult, ServiceConfiguration
+from .encryption.credential_manager import get_credential_manager
+from .plugin_loader import get_plugin_loader
+from .connectors.base_connector import AsyncBaseConnector
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Columns needed to report on a job (everything but the items blob)
+JOB_SUMMARY_COLUMNS = (
+    ActionJob.id,
+    ActionJob.service_id,
+    ActionJob.action,
+    ActionJob.status,
+    ActionJob.total_items,
+    ActionJob.processed_items,
+    ActionJob.succeeded_items,
+    ActionJob.error_message,
+    ActionJob.created_at,
+    ActionJob.started_at,
+    ActionJob.finished_at
+)
+
+
+def pack(value: Any) -> bytes:
+    """Serialize a value as compressed compact JSON"""
+    return zlib.compress(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def unpack(data: bytes) -> Any:
+    """Inverse of pack()"""
+    return json.loads(zlib.decompress(data))
+
+
+def job_summary(row) -> Dict[str, Any]:
+    """
+    Describe a job.
+
+    Args:
+        row: ActionJob, or row selected with JOB_SUMMARY_COLUMNS
+
+    Returns:
+        Dictionary with status, progress counters and timestamps
+    """
+    return {
+        "job_id": row.id,
+        "service_id": row.service_id,
+        "action": row.action,
+        "status": row.status,
+        "total_items": row.total_items,
+        "processed_items": row.processed_items,
+        "succeeded_items": row.succeeded_items,
+        "failed_items": row.processed_items - row.succeeded_items,
+        "progress": round(row.processed_items / row.total_items, 4) if row.total_items else 1.0,
+        "error_message": row.error_message,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "started_at": row.started_at.isoformat() if row.started_at else None,
+        "finished_at": row.finished_at.isoformat() if row.finished_at else None
+    }
+
+
+def get_job_summary(db: Session, job_id: int) -> Optional[Dict[str, Any]]:
+    """Summary of a job, or None if it does not exist"""
+    row = db.execute(select(*JOB_SUMMARY_COLUMNS).where(ActionJob.id == job_id)).first()
+    return job_summary(row) if row else None
+
+
+def submit_job(
+    db: Session,
+    config: ServiceConfiguration,
+    action: str,
+    items: List[Dict[str, Any]],
+    idempotency_key: Optional[str] = None
+) -> Tuple[ActionJob, bool]:
+    """
+    Queue a job, or return the job already submitted with the same idempotency key.
+
+    Args:
+        db: Database session
+        config: Configuration whose credentials the job uses
+        action: Action name
+        items: Action parameters, one dictionary per item
+        idempotency_key: Client-chosen key making retried submissions safe
+
+    Returns:
+        Tuple of (job, whether it was created by this call)
+    """
+    if idempotency_key:
+        existing = db.query(ActionJob).filter(ActionJob.idempotency_key == idempotency_key).first()
+        if existing:
+            return existing, False
+
+    job = ActionJob(
+        idempotency_key=idempotency_key,
+        configuration_id=config.id,
+        service_id=config.service_id,
+        action=action,
+        status="queued",
+        total_items=len(items),
+        processed_items=0,
+        succeeded_items=0,
+        items=pack(items)
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key won
+        db.rollback()
+        if not idempotency_key:
+            raise
+        return db.query(ActionJob).filter(ActionJob.idempotency_key == idempotency_key).one(), False
+    db.refresh(job)
+    return job, True
+
+
+def read_job_results(db: Session, job_id: int, offset: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Read stored results of a job, in item order.
+
+    Only the chunks overlapping [offset, offset + limit) are decompressed.
+
+    Args:
+        db: Database session
+        job_id: Job identifier
+        offset: Index of the first item to return
+        limit: Maximum number of items
+
+    Returns:
+        List of {"index", "result"} dictionaries
+    """
+    chunks = db.execute(
+        select(ActionJobResult.first_index, ActionJobResult.results)
+        .where(
+            ActionJobResult.job_id == job_id,
+            ActionJobResult.first_index < offset + limit,
+            ActionJobResult.first_index + ActionJobResult.item_count > offset
+        )
+        .order_by(ActionJobResult.first_index)
+    ).all()
+
+    items = []
+    for first_index, data in chunks:
+        for position, result in enumerate(unpack(data)):
+            index = first_index + position
+            if offset <= index < offset + limit:
+                items.append({"index": index, "result": result})
+    return items
+
+
+def cancel_job(db: Session, job_id: int) -> bool:
+    """
+    Cancel a queued or running job; a running job stops after its current chunk.
+
+    Returns:
+        Whether the job was cancelled (False if it had already finished)
+    """
+    cancelled = db.execute(
+        update(ActionJob)
+        .where(ActionJob.id == job_id, ActionJob.status.in_(("queued", "running")))
+        .values(status="cancelled", finished_at=datetime.utcnow(), locked_by=None)
+    )
+    db.commit()
+    return cancelled.rowcount > 0
+
+
+class JobWorker:
+    """
+    Claims queued jobs and runs them through the connectors' execute_batch().
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        poll_interval: float = 2.0,
+        chunk_size: int = 500,
+        stale_after: float = 300.0,
+        session_factory: Callable[[], Session] = SessionLocal,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            concurrency: Jobs run at the same time
+            poll_interval: Seconds between checks for queued jobs when idle
+            chunk_size: Items per stored result chunk (and progress update)
+            stale_after: Seconds without heartbeat after which a running job is requeued
+            session_factory: Creates database sessions
+            worker_id: Name recorded on claimed jobs (default: host name and a random suffix)
+        """
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.chunk_size = chunk_size
+        self.stale_after = stale_after
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start `concurrency` job loops on the current event loop."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        logger.info(f"Job worker {self.worker_id} started with {self.concurrency} slots")
+
+    async def stop(self):
+        """Cancel the job loops; jobs in progress are handed back to the queue."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _run(self):
+        while True:
+            try:
+                job_id = await asyncio.to_thread(self.claim_next)
+            except Exception as e:
+                logger.error(f"Error claiming job: {str(e)}")
+                job_id = None
+            if job_id is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self.run_job(job_id)
+
+    def claim_next(self) -> Optional[int]:
+        """
+        Claim the oldest queued job.
+
+        Jobs whose worker stopped heartbeating are requeued first. The claim
+        is an UPDATE conditional on the job still being queued, so when
+        workers race for a job exactly one of them gets it.
+
+        Returns:
+            Claimed job id, or None if the queue is empty
+        """
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            requeued = db.execute(
+                update(ActionJob)
+                .where(
+                    ActionJob.status == "running",
+                    ActionJob.heartbeat_at < now - timedelta(seconds=self.stale_after)
+                )
+                .values(status="queued", locked_by=None)
+            )
+            db.commit()
+            if requeued.rowcount:
+                logger.warning(f"Requeued {requeued.rowcount} jobs from unresponsive workers")
+
+            candidates = db.execute(
+                select(ActionJob.id)
+                .where(ActionJob.status == "queued")
+                .order_by(ActionJob.id)
+                .limit(self.concurrency + 1)
+            ).scalars().all()
+            for job_id in candidates:
+                claimed = db.execute(
+                    update(ActionJob)
+                    .where(ActionJob.id == job_id, ActionJob.status == "queued")
+                    .values(
+                        status="running",
+                        locked_by=self.worker_id,
+                        heartbeat_at=now,
+                        started_at=func.coalesce(ActionJob.started_at, now)
+                    )
+                )
+                db.commit()
+                if claimed.rowcount:
+                    return job_id
+        return None
+
+    def _load_job(self, job_id: int) -> Dict[str, Any]:
+        with self.session_factory() as db:
+            job = db.get(ActionJob, job_id)
+            config = db.get(ServiceConfiguration, job.configuration_id)
+            stored_chunks, stored_items = db.execute(
+                select(func.count(), func.coalesce(func.sum(ActionJobResult.item_count), 0))
+                .where(ActionJobResult.job_id == job_id)
+            ).one()
+            return {
+                "service_id": job.service_id,
+                "action": job.action,
+                "items": unpack(job.items),
+                "credentials": get_credential_manager().decrypt_configuration_credentials(
+                    config.id, config.encrypted_credentials
+                ),
+                "next_chunk": stored_chunks,
+                "next_index": stored_items
+            }
+
+    def _store_chunk(
+        self,
+        job_id: int,
+        chunk_index: int,
+        first_index: int,
+        results: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Store a chunk's results and advance the job's progress in one transaction.
+
+        Returns:
+            False if the job is no longer ours to run (cancelled or requeued)
+        """
+        succeeded = sum(1 for result in results if result.get("status") == "success")
+        with self.session_factory() as db:
+            owned = db.execute(
+                update(ActionJob)
+                .where(
+                    ActionJob.id == job_id,
+                    ActionJob.status == "running",
+                    ActionJob.locked_by == self.worker_id
+                )
+                .values(
+                    processed_items=ActionJob.processed_items + len(results),
+                    succeeded_items=ActionJob.succeeded_items + succeeded,
+                    heartbeat_at=datetime.utcnow()
+                )
+            )
+            if not owned.rowcount:
+                db.rollback()
+                return False
+            db.add(ActionJobResult(
+                job_id=job_id,
+                chunk_index=chunk_index,
+                first_index=first_index,
+                item_count=len(results),
+                results=pack(results)
+            ))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return False
+        return True
+
+    def _set_status(self, job_id: int, status: str, error_message: Optional[str] = None):
+        values = {"status": status, "locked_by": None}
+        if status in FINAL_STATUSES:
+            values.update(finished_at=datetime.utcnow(), error_message=error_message)
+        with self.session_factory() as db:
+            db.execute(
+                update(ActionJob)
+                .where(ActionJob.id == job_id, ActionJob.status == "running", ActionJob.locked_by == self.worker_id)
+                .values(**values)
+            )
+            db.commit()
+
+    def _heartbeat(self, job_id: int):
+        with self.session_factory() as db:
+            db.execute(
+                update(ActionJob)
+                .where(ActionJob.id == job_id, ActionJob.locked_by == self.worker_id)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            db.commit()
+
+    async def _keep_alive(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.stale_after / 3)
+            try:
+                await asyncio.to_thread(self._heartbeat, job_id)
+            except Exception as e:
+                logger.error(f"Error recording heartbeat of job {job_id}: {str(e)}")
+
+    async def run_job(self, job_id: int):
+        """
+        Run a claimed job from its first chunk without stored results.
+
+        Args:
+            job_id: Job claimed by this worker
+        """
+        heartbeat = asyncio.create_task(self._keep_alive(job_id))
+        try:
+            job = await asyncio.to_thread(self._load_job, job_id)
+            connector = get_plugin_loader().get_connector(job["service_id"])
+            if not isinstance(connector, AsyncBaseConnector):
+                await asyncio.to_thread(
+                    self._set_status, job_id, "failed",
+                    f"Connector for {job['service_id']} does not support batch execution"
+                )
+                return
+
+            items = job["items"]
+            chunk_index = job["next_chunk"]
+            for first_index in range(job["next_index"], len(items), self.chunk_size):
+                chunk = items[first_index:first_index + self.chunk_size]
+                results: List[Optional[Dict[str, Any]]] = [None] * len(chunk)
+                async for item in connector.execute_batch(job["action"], chunk, job["credentials"]):
+                    results[item["index"]] = item["result"]
+
+                stored = await asyncio.to_thread(
+                    self._store_chunk, job_id, chunk_index, first_index, results
+                )
+                if not stored:
+                    logger.info(f"Job {job_id} was cancelled or taken over; stopping")
+                    return
+                chunk_index += 1
+
+            await asyncio.to_thread(self._set_status, job_id, "succeeded")
+            logger.info(f"Job {job_id} finished ({len(items)} items)")
+        except asyncio.CancelledError:
+            # Shutting down: let another worker resume after the last stored chunk
+            await asyncio.to_thread(self._set_status, job_id, "queued")
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            await asyncio.to_thread(self._set_status, job_id, "failed", str(e))
+        finally:
+            heartbeat.cancel()
+
+
+# Global job worker instance
+_job_worker: Optional[JobWorker] = None
+
+
+def get_job_worker() -> Optional[JobWorker]:
+    """
+    Get or create the global job worker from JOB_* environment variables.
+
+    Returns:
+        JobWorker instance, or None if JOB_WORKER_CONCURRENCY is 0
+    """
+    global _job_worker
+    if _job_worker is None:
+        concurrency = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+        if concurrency <= 0:
+            return None
+        _job_worker = JobWorker(
+            concurrency=concurrency,
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "2")),
+            chunk_size=int(os.getenv("JOB_CHUNK_SIZE", "500")),
+            stale_after=float(os.getenv("JOB_STALE_AFTER", "300"))
+        )
+    return _job_worker
+
+
+async def _serve(worker: JobWorker):
+    from .connectors.enrichment_cache import get_enrichment_cache
+    from .connectors.http_pool import close_http_clients
+    from .connectors.isolation import get_worker_pool, isolation_enabled
+
+    # Probe Redis for the enrichment cache off the event loop, not on the first job
+    await asyncio.to_thread(get_enrichment_cache)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    worker.start()
+    await stop.wait()
+    await worker.stop()
+    if isolation_enabled():
+        await get_worker_pool().shutdown()
+    await close_http_clients()
+
+
+def main() -> int:
+    """Entry point for a dedicated job worker process"""
+    logging.basicConfig(level=logging.INFO)
+    worker = get_job_worker()
+    if worker is None:
+        logger.error("JOB_WORKER_CONCURRENCY must be at least 1 for a worker process")
+        return 1
+    asyncio.run(_serve(worker))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,16 +5,37 @@ Dynamic plugin loader for service connectors
 import importlib
 import inspect
 import logging
+import threading
 from pathlib import Path
-from typing import Dict, Type, Optional, Any, List
+from typing import Dict, Type, Optional, List, NamedTuple
 from .connectors.base_connector import BaseConnector
+from .connectors.isolation import IsolatedConnector, get_worker_pool, isolation_enabled
 
 logger = logging.getLogger(__name__)
 
+CONNECTORS_PACKAGE = "src.connectors"
+
+
+class ConnectorSpec(NamedTuple):
+    """Where to import a connector class from"""
+    module: str
+    class_name: Optional[str] = None  # None: the BaseConnector subclass defined in the module
+
+
+DECLARATIVE_CONNECTOR = ConnectorSpec(f"{CONNECTORS_PACKAGE}.declarative", "DeclarativeConnector")
+
 
 class PluginLoader:
     """
-    Dynamically discovers and loads connector classes from the connectors directory.
+    Lazily loads connector classes.
+    
+    A manifest of service_id -> module/class is built at startup from the
+    `connector_class` field of the service definitions and the file names
+    in the connectors directory, without importing anything. A connector
+    module is imported the first time its connector is requested. When the
+    registry swaps in new definitions (e.g. a hot reload), the manifest and
+    connector instances are rebuilt on the next request, since connectors
+    read their settings from the definitions when created.
     """
     
     def __init__(self, connectors_path: Optional[Path] = None):
@@ -32,83 +53,98 @@ class PluginLoader:
             current_dir = Path(__file__).parent
             self.connectors_path = current_dir / "connectors"
         
+        self._manifest: Dict[str, ConnectorSpec] = {}
         self._connector_classes: Dict[str, Type[BaseConnector]] = {}
         self._loaded_connectors: Dict[str, BaseConnector] = {}
-        self._discover_connectors()
+        self._registry_version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._build_manifest()
     
-    def _discover_connectors(self):
-        """Discover all connector classes in the connectors directory."""
+    def _build_manifest(self):
+        """Map service IDs to connector modules without importing them."""
         if not self.connectors_path.exists():
             logger.warning(f"Connectors path does not exist: {self.connectors_path}")
-            return
+        else:
+            # Convention: connectors/<service_id>_connector.py
+            for connector_file in self.connectors_path.glob("*_connector.py"):
+                if connector_file.name == "base_connector.py":
+                    continue
+                service_id = connector_file.stem[:-len("_connector")]
+                self._manifest[service_id] = ConnectorSpec(f"{CONNECTORS_PACKAGE}.{connector_file.stem}")
         
-        # Get all Python files in connectors directory (excluding __init__.py and base_connector.py)
-        connector_files = [
-            f for f in self.connectors_path.glob("*.py")
-            if f.name not in ["__init__.py", "base_connector.py"]
-        ]
+        # Service definitions name the class explicitly; definitions without
+        # a connector module that describe their endpoints use the declarative connector
+        from .registry.service_registry import get_registry
+        registry = get_registry()
+        self._registry_version = registry.version
+        for service in registry.list_services(active_only=False):
+            connector_class = service.get("connector_class")
+            if connector_class:
+                self._manifest[service["id"]] = self._parse_connector_class(service["id"], connector_class)
+            elif service["id"] not in self._manifest and service.get("test_endpoint"):
+                self._manifest[service["id"]] = DECLARATIVE_CONNECTOR
         
-        for connector_file in connector_files:
-            try:
-                self._load_connector_from_file(connector_file)
-            except Exception as e:
-                logger.error(f"Error loading connector from {connector_file}: {str(e)}")
+        logger.info(f"Connector manifest built with {len(self._manifest)} connectors")
     
-    def _load_connector_from_file(self, connector_file: Path):
+    def _parse_connector_class(self, service_id: str, connector_class: str) -> ConnectorSpec:
         """
-        Load connector class from a Python file.
+        Parse a `connector_class` value from a service definition.
         
         Args:
-            connector_file: Path to connector Python file
-        """
-        # Get module name (e.g., "connectors.linkedin_connector")
-        module_name = f"src.connectors.{connector_file.stem}"
-        
-        try:
-            # Import the module
-            module = importlib.import_module(module_name)
+            service_id: Service identifier
+            connector_class: "module.path:ClassName", "module.path.ClassName"
+                           or a bare class name, which is looked up in
+                           src/connectors/<service_id>_connector.py
             
-            # Find all classes that inherit from BaseConnector
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                if (issubclass(obj, BaseConnector) and 
-                    obj != BaseConnector and 
-                    obj.__module__ == module_name):
-                    
-                    # Get service_id from class (should be set as class attribute or in __init__)
-                    # For now, derive from class name (e.g., LinkedInConnector -> linkedin)
-                    service_id = self._derive_service_id(name)
-                    
-                    self._connector_classes[service_id] = obj
-                    logger.info(f"Loaded connector class: {name} (service_id: {service_id})")
-        except ImportError as e:
-            logger.error(f"Failed to import module {module_name}: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error processing connector file {connector_file}: {str(e)}")
+        Returns:
+            ConnectorSpec
+        """
+        if ":" in connector_class:
+            module, class_name = connector_class.split(":", 1)
+        elif "." in connector_class:
+            module, class_name = connector_class.rsplit(".", 1)
+        else:
+            module, class_name = f"{CONNECTORS_PACKAGE}.{service_id}_connector", connector_class
+        return ConnectorSpec(module, class_name)
     
-    def _derive_service_id(self, class_name: str) -> str:
+    def _import_connector_class(self, service_id: str, spec: ConnectorSpec) -> Optional[Type[BaseConnector]]:
         """
-        Derive service_id from connector class name.
+        Import the module of a connector and find its class.
         
         Args:
-            class_name: Connector class name (e.g., "LinkedInConnector")
+            service_id: Service identifier
+            spec: Module and class to load
             
         Returns:
-            Service ID (e.g., "linkedin")
+            Connector class or None if it cannot be loaded
         """
-        # Remove "Connector" suffix if present
-        if class_name.endswith("Connector"):
-            class_name = class_name[:-9]
+        try:
+            module = importlib.import_module(spec.module)
+        except ImportError as e:
+            logger.error(f"Failed to import module {spec.module}: {str(e)}")
+            return None
         
-        # Convert PascalCase to snake_case
-        import re
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', class_name)
-        service_id = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+        if spec.class_name:
+            connector_class = getattr(module, spec.class_name, None)
+        else:
+            connector_class = next(
+                (
+                    obj for _, obj in inspect.getmembers(module, inspect.isclass)
+                    if issubclass(obj, BaseConnector) and obj is not BaseConnector and obj.__module__ == spec.module
+                ),
+                None
+            )
+        
+        if not (inspect.isclass(connector_class) and issubclass(connector_class, BaseConnector)):
+            logger.error(f"No connector class {spec.class_name or ''} found in {spec.module} for {service_id}")
+            return None
         
-        return service_id
+        logger.info(f"Loaded connector class: {connector_class.__name__} (service_id: {service_id})")
+        return connector_class
     
     def get_connector_class(self, service_id: str) -> Optional[Type[BaseConnector]]:
         """
-        Get connector class for a service.
+        Get connector class for a service, importing its module on first use.
         
         Args:
             service_id: Service identifier
@@ -116,7 +152,21 @@ class PluginLoader:
         Returns:
             Connector class or None if not found
         """
-        return self._connector_classes.get(service_id)
+        connector_class = self._connector_classes.get(service_id)
+        if connector_class:
+            return connector_class
+        
+        spec = self._manifest.get(service_id)
+        if not spec:
+            return None
+        
+        with self._lock:
+            connector_class = self._connector_classes.get(service_id)
+            if not connector_class:
+                connector_class = self._import_connector_class(service_id, spec)
+                if connector_class:
+                    self._connector_classes[service_id] = connector_class
+        return connector_class
     
     def create_connector(self, service_id: str, service_name: str) -> Optional[BaseConnector]:
         """
@@ -133,8 +183,12 @@ class PluginLoader:
         if connector_class:
             try:
                 connector = connector_class(service_id, service_name)
-                self._loaded_connectors[service_id] = connector
-                return connector
+                if isolation_enabled():
+                    # Calls run in worker processes; this instance only supplies settings
+                    connector = IsolatedConnector(connector, get_worker_pool())
+                with self._lock:
+                    # Concurrent first requests share one instance (and its rate limiter settings)
+                    return self._loaded_connectors.setdefault(service_id, connector)
             except Exception as e:
                 logger.error(f"Error creating connector for {service_id}: {str(e)}")
                 return None
@@ -150,14 +204,18 @@ class PluginLoader:
         Returns:
             Connector instance or None
         """
+        from .registry.service_registry import get_registry
+        registry = get_registry()
+        if registry.version != self._registry_version:
+            self._rebuild(registry.version)
+        
         # Check if already loaded
-        if service_id in self._loaded_connectors:
-            return self._loaded_connectors[service_id]
+        connector = self._loaded_connectors.get(service_id)
+        if connector:
+            return connector
         
         # Try to create new instance
         # We need service_name from registry
-        from .registry.service_registry import get_registry
-        registry = get_registry()
         service_def = registry.get_service(service_id)
         service_name = service_def.get("name", service_id) if service_def else service_id
         
@@ -165,7 +223,16 @@ class PluginLoader:
     
     def list_available_connectors(self) -> List[str]:
         """
-        List all available connector service IDs.
+        List all available connector service IDs (without importing them).
+        
+        Returns:
+            List of service IDs
+        """
+        return list(self._manifest.keys())
+    
+    def list_imported_connectors(self) -> List[str]:
+        """
+        List service IDs whose connector module has been imported.
         
         Returns:
             List of service IDs
@@ -173,11 +240,25 @@ class PluginLoader:
         return list(self._connector_classes.keys())
     
     def reload(self):
-        """Reload all connectors from disk."""
-        self._connector_classes.clear()
-        self._loaded_connectors.clear()
-        self._discover_connectors()
+        """Rebuild the connector manifest and drop loaded connectors."""
+        self._rebuild()
         logger.info("Plugin loader reloaded")
+    
+    def _rebuild(self, registry_version: Optional[int] = None):
+        """
+        Rebuild the manifest and drop loaded connectors.
+        
+        Args:
+            registry_version: Registry version to catch up with; skipped if
+                another thread already rebuilt for it
+        """
+        with self._lock:
+            if registry_version is not None and self._registry_version == registry_version:
+                return
+            self._manifest.clear()
+            self._connector_classes.clear()
+            self._loaded_connectors.clear()
+            self._build_manifest()
 
 
 # Global plugin loader instance
@@ -0,0 +1,356 @@
+"""
+Service popularity from live usage
+"""
+
+import os
+import logging
+import secrets
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Callable, List, Optional, Tuple
+import redis
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database.connection import SessionLocal
+from ..database.models import ServiceRegistry as ServiceRegistryRow
+from .service_registry import ServiceRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+# Popularity points per usage event
+USAGE_WEIGHTS = {"configuration": 10, "action": 1}
+
+PENDING_KEY = "popularity:pending"
+# Written by earlier versions, which renamed PENDING_KEY before applying it
+FLUSHING_KEY = "popularity:flushing"
+FLUSH_LOCK_KEY = "popularity:flush-lock"
+
+# Deletes the flush lock only if it still holds this flush's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class PopularityRanking:
+    """
+    Services ordered by popularity score (then name), kept sorted in memory.
+
+    A score change moves one entry (binary search + list insert), so
+    refreshing after a flush touches only services whose score changed and
+    top(k) is a slice of the first k entries.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[int, str, str]] = []  # (-score, lowercase name, service_id)
+        self._by_service: Dict[str, Tuple[int, str, str]] = {}
+        self._lock = threading.Lock()
+
+    def set_score(self, service_id: str, score: int, name: str):
+        """Add a service or move it to its new position."""
+        key = (-score, name.lower(), service_id)
+        with self._lock:
+            previous = self._by_service.get(service_id)
+            if previous == key:
+                return
+            if previous is not None:
+                del self._keys[bisect_left(self._keys, previous)]
+            insort(self._keys, key)
+            self._by_service[service_id] = key
+
+    def remove(self, service_id: str):
+        """Drop a service from the ranking."""
+        with self._lock:
+            previous = self._by_service.pop(service_id, None)
+            if previous is not None:
+                del self._keys[bisect_left(self._keys, previous)]
+
+    def score(self, service_id: str) -> Optional[int]:
+        """Current score of a service, or None if not ranked"""
+        key = self._by_service.get(service_id)
+        return -key[0] if key else None
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """
+        Most popular services.
+
+        Args:
+            k: Number of services
+
+        Returns:
+            List of (service_id, score), most popular first
+        """
+        with self._lock:
+            return [(service_id, -negative_score) for negative_score, _, service_id in self._keys[:k]]
+
+    def service_ids(self) -> List[str]:
+        """All ranked service ids"""
+        return list(self._by_service)
+
+
+class UsageTracker:
+    """
+    Counts service usage and keeps popularity scores up to date.
+
+    Requests only bump an in-process counter. Every `interval` seconds the
+    counters are added to a Redis hash shared by all replicas; whichever
+    replica takes the flush lock drains the hash into
+    service_registry.popularity_score in one transaction. Without Redis
+    each replica flushes its own counters to the database. All Redis and
+    database I/O happens on the flush thread. After a flush
+    the ranking is refreshed from the database scores, falling back to the
+    static score in the service definition.
+    """
+
+    def __init__(
+        self,
+        registry: ServiceRegistry,
+        interval: float = 60.0,
+        redis_client: Optional[redis.Redis] = None,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """
+        Initialize tracker.
+
+        Args:
+            registry: Service registry (names and static scores)
+            interval: Seconds between flushes
+            redis_client: Redis client for cross-replica counters, or None
+            session_factory: Creates database sessions
+        """
+        self.registry = registry
+        self.interval = interval
+        self.redis_client = redis_client
+        self.session_factory = session_factory
+        self.ranking = PopularityRanking()
+        self._pending: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        self._db_scores: Dict[str, int] = {}
+        self._registry_version: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refresh_ranking()
+
+    def record(self, service_id: str, kind: str, count: int = 1):
+        """
+        Count usage of a service.
+
+        Args:
+            service_id: Service identifier
+            kind: "configuration" or "action"
+            count: Number of events (e.g. items in a batch)
+        """
+        self._add_points(service_id, USAGE_WEIGHTS[kind] * count)
+
+    def _add_points(self, service_id: str, points: int):
+        with self._pending_lock:
+            self._pending[service_id] = self._pending.get(service_id, 0) + points
+
+    def _take_pending(self) -> Dict[str, int]:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def flush(self):
+        """Move counted usage into the database and refresh the ranking."""
+        pending = self._take_pending()
+        if self.redis_client:
+            self._flush_redis(pending)
+        elif pending:
+            try:
+                self._apply_deltas(pending)
+            except Exception:
+                # Keep the counts for the next flush
+                self._restore_pending(pending)
+                raise
+        self._load_db_scores()
+        self.refresh_ranking()
+
+    def _restore_pending(self, pending: Dict[str, int]):
+        """Put taken counts back for the next flush."""
+        for service_id, points in pending.items():
+            self._add_points(service_id, points)
+
+    def _flush_redis(self, pending: Dict[str, int]):
+        if pending:
+            pipe = self.redis_client.pipeline()
+            for service_id, points in pending.items():
+                pipe.hincrby(PENDING_KEY, service_id, points)
+            try:
+                pipe.execute()
+            except Exception:
+                # Keep the counts for the next flush (MULTI/EXEC: none were applied)
+                self._restore_pending(pending)
+                raise
+
+        token = secrets.token_hex(16)
+        if not self.redis_client.set(FLUSH_LOCK_KEY, token, nx=True, ex=max(int(self.interval), 30)):
+            return
+        try:
+            # Read and delete the shared counts atomically before applying them, so
+            # a Redis error after the commit cannot apply them a second time
+            pipe = self.redis_client.pipeline()
+            pipe.hgetall(PENDING_KEY)
+            pipe.hgetall(FLUSHING_KEY)
+            pipe.delete(PENDING_KEY, FLUSHING_KEY)
+            counted, leftover, _ = pipe.execute()
+            deltas: Dict[str, int] = {}
+            for counts in (counted, leftover):
+                for service_id, points in counts.items():
+                    deltas[service_id] = deltas.get(service_id, 0) + int(points)
+            if deltas:
+                try:
+                    self._apply_deltas(deltas)
+                except Exception:
+                    # Counts left Redis already; this replica pushes them back next flush
+                    self._restore_pending(deltas)
+                    raise
+        finally:
+            # A flush outlasting the lock's TTL must not release another replica's lock
+            self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+
+    def _apply_deltas(self, deltas: Dict[str, int], retry: bool = True):
+        """
+        Add popularity points in one transaction, creating missing service rows.
+
+        Args:
+            deltas: Points to add by service
+            retry: Retry once as increments if another replica created a row concurrently
+        """
+        with self.session_factory() as db:
+            existing = set(db.execute(
+                select(ServiceRegistryRow.id).where(ServiceRegistryRow.id.in_(deltas))
+            ).scalars())
+
+            increments = [
+                {"service": service_id, "points": points}
+                for service_id, points in deltas.items() if service_id in existing
+            ]
+            if increments:
+                table = ServiceRegistryRow.__table__
+                db.connection().execute(
+                    update(table)
+                    .where(table.c.id == bindparam("service"))
+                    .values(popularity_score=func.coalesce(table.c.popularity_score, 0) + bindparam("points")),
+                    increments
+                )
+
+            new_rows = []
+            for service_id, points in deltas.items():
+                service = self.registry.get_service(service_id)
+                if service_id in existing or not service:
+                    continue
+                new_rows.append({
+                    "id": service_id,
+                    "name": service.get("name", service_id),
+                    "category": service.get("category", ""),
+                    "description": service.get("description"),
+                    "is_active": service.get("is_active", True),
+                    "popularity_score": (service.get("popularity_score") or 0) + points
+                })
+            if new_rows:
+                db.execute(insert(ServiceRegistryRow), new_rows)
+
+            try:
+                db.commit()
+            except IntegrityError as e:
+                db.rollback()
+                if not retry:
+                    logger.error(f"Could not apply popularity points: {str(e)}")
+                    raise
+                # Another replica created a row concurrently; retry once as increments
+                self._apply_deltas(deltas, retry=False)
+
+    def _load_db_scores(self):
+        with self.session_factory() as db:
+            self._db_scores = {
+                service_id: score or 0
+                for service_id, score in db.execute(
+                    select(ServiceRegistryRow.id, ServiceRegistryRow.popularity_score)
+                ).all()
+            }
+
+    def refresh_ranking(self):
+        """
+        Bring the ranking in line with current scores and registry contents.
+
+        Only services whose score changed are repositioned; services added
+        to or removed from the registry are inserted or dropped.
+        """
+        services = {service["id"]: service for service in self.registry.list_services(active_only=False)}
+        for service_id, service in services.items():
+            score = self._db_scores.get(service_id, service.get("popularity_score") or 0)
+            self.ranking.set_score(service_id, score, service.get("name", service_id))
+        if self._registry_version != self.registry.version:
+            for service_id in self.ranking.service_ids():
+                if service_id not in services:
+                    self.ranking.remove(service_id)
+            self._registry_version = self.registry.version
+
+    def start(self):
+        """Start flushing in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="usage-tracker", daemon=True)
+        self._thread.start()
+        logger.info(f"Flushing service usage every {self.interval}s")
+
+    def stop(self):
+        """Flush remaining usage and stop the thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing service usage: {str(e)}")
+
+    def _check_redis(self):
+        """Fall back to per-replica flushes if Redis is unreachable."""
+        try:
+            self.redis_client.ping()
+            logger.info("Redis usage counters enabled")
+        except Exception as e:
+            self.redis_client = None
+            logger.warning(f"Redis not available, flushing service usage per replica: {str(e)}")
+
+    def _run(self):
+        if self.redis_client:
+            self._check_redis()
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing service usage: {str(e)}")
+
+
+# Global usage tracker instance
+_usage_tracker: Optional[UsageTracker] = None
+
+
+def get_usage_tracker() -> UsageTracker:
+    """
+    Get or create the global usage tracker.
+
+    Uses Redis (REDIS_URL) for cross-replica counters when reachable and
+    flushes every POPULARITY_FLUSH_INTERVAL seconds (default 60). Creating
+    the tracker makes no network calls; the flush thread checks Redis.
+
+    Returns:
+        UsageTracker instance
+    """
+    global _usage_tracker
+    if _usage_tracker is None:
+        redis_url = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+        _usage_tracker = UsageTracker(
+            get_registry(),
+            interval=float(os.getenv("POPULARITY_FLUSH_INTERVAL", "60")),
+            redis_client=redis.from_url(redis_url, socket_connect_timeout=2, decode_responses=True)
+        )
+    return _usage_tracker
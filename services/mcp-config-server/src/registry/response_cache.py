@@ -0,0 +1,129 @@
+"""
+Cache of serialized marketplace responses
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fields left out of the "summary" view; agents fetch them per service
+# through get_service_info / get_configuration_guide when configuring
+HEAVY_FIELDS = frozenset({
+    "configuration_steps",
+    "required_credentials",
+    "optional_credentials",
+    "test_endpoint",
+    "connector_class",
+    "definition_path",
+})
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def summarize_services(services: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Project service definitions to the fields needed for browsing.
+
+    Args:
+        services: Full service definitions
+
+    Returns:
+        Service definitions without HEAVY_FIELDS
+    """
+    return [
+        {key: value for key, value in service.items() if key not in HEAVY_FIELDS}
+        for service in services
+    ]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list or weak tags) against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized response bodies keyed by request parameters.
+
+    Entries are only valid for one registry version: the cache empties
+    itself when it sees a newer version, so hot reloads never serve stale
+    definitions.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int, build: Callable[[], bytes]) -> CachedResponse:
+        """
+        Get a cached response, building and caching it on a miss.
+
+        Args:
+            key: Hashable request parameters
+            version: Registry version the response is built from
+            build: Function returning the serialized response body
+
+        Returns:
+            CachedResponse with body bytes and ETag
+        """
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+
+        body = build()
+        cached = CachedResponse(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = cached
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return cached
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global response cache instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get or create global response cache instance.
+
+    Returns:
+        ResponseCache instance
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(max_entries=int(os.getenv("MARKETPLACE_CACHE_SIZE", "512")))
+    return _response_cache
@@ -0,0 +1,209 @@
+"""
+Inverted index for marketplace search
+"""
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Relevance weight of a term depending on the field it appears in
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "capabilities": 2.0,
+    "description": 1.0,
+}
+
+# Score multipliers for prefix / infix (rather than exact) term matches
+PREFIX_MATCH_FACTOR = 0.5
+INFIX_MATCH_FACTOR = 0.25
+
+# Query terms shorter than this only match exactly or as a prefix
+MIN_INFIX_LENGTH = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric terms.
+
+    Args:
+        text: Text to tokenize (e.g. "Hunter.io", "verify_email")
+
+    Returns:
+        List of terms (e.g. ["hunter", "io"], ["verify", "email"])
+    """
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class ServiceSearchIndex:
+    """
+    Precomputed term index, category facets and default ranking over
+    service definitions. Built once per registry load; immutable afterwards.
+    """
+
+    def __init__(self, services: Dict[str, Dict[str, Any]]):
+        """
+        Build the index.
+
+        Args:
+            services: Mapping of service_id to service definition
+        """
+        self._services = services
+        postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        categories: Dict[str, Set[str]] = defaultdict(set)
+        active: Set[str] = set()
+
+        for service_id, service in services.items():
+            fields = [
+                (service.get("name", ""), FIELD_WEIGHTS["name"]),
+                (service_id, FIELD_WEIGHTS["name"]),
+                (service.get("description") or "", FIELD_WEIGHTS["description"]),
+            ]
+            fields.extend((cap, FIELD_WEIGHTS["capabilities"]) for cap in service.get("capabilities", []))
+
+            for text, weight in fields:
+                for term in tokenize(text):
+                    if postings[term].get(service_id, 0) < weight:
+                        postings[term][service_id] = weight
+
+            categories[service.get("category", "")].add(service_id)
+            if service.get("is_active", True):
+                active.add(service_id)
+
+        self._postings = dict(postings)
+        self._terms = sorted(self._postings)
+        self._categories = dict(categories)
+        self._active = active
+
+        # Default order: most popular first, then by name
+        ranked = sorted(
+            services,
+            key=lambda sid: (-(services[sid].get("popularity_score") or 0), services[sid].get("name", sid).lower())
+        )
+        self._rank = {service_id: position for position, service_id in enumerate(ranked)}
+        self._expand = lru_cache(maxsize=1024)(self._expand_term)
+
+    def _expand_term(self, term: str) -> Tuple[Tuple[str, float], ...]:
+        """
+        Find indexed terms matching a query term.
+
+        Exact and prefix matches come from a binary search over the sorted
+        vocabulary; infix matches (e.g. "mail" in "email") scan the
+        vocabulary, never the service definitions.
+
+        Returns:
+            Tuple of (indexed_term, score_factor)
+        """
+        matches = []
+        position = bisect_left(self._terms, term)
+        while position < len(self._terms) and self._terms[position].startswith(term):
+            indexed_term = self._terms[position]
+            matches.append((indexed_term, 1.0 if indexed_term == term else PREFIX_MATCH_FACTOR))
+            position += 1
+
+        if len(term) >= MIN_INFIX_LENGTH:
+            matches.extend(
+                (indexed_term, INFIX_MATCH_FACTOR)
+                for indexed_term in self._terms
+                if term in indexed_term and not indexed_term.startswith(term)
+            )
+        return tuple(matches)
+
+    def match(self, query: str) -> Optional[Dict[str, float]]:
+        """
+        Score services against a free-text query.
+
+        Every query term must match (exactly, as a prefix or as an infix)
+        a term of the service; scores are summed across query terms.
+
+        Args:
+            query: Free-text query
+
+        Returns:
+            Mapping of service_id to relevance score, or None if the query
+            contains no searchable terms
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+
+        scores: Optional[Dict[str, float]] = None
+        for term in terms:
+            term_scores: Dict[str, float] = {}
+            for indexed_term, factor in self._expand(term):
+                for service_id, weight in self._postings[indexed_term].items():
+                    score = weight * factor
+                    if term_scores.get(service_id, 0) < score:
+                        term_scores[service_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {sid: scores[sid] + score for sid, score in term_scores.items() if sid in scores}
+            if not scores:
+                return {}
+
+        return scores
+
+    def categories_matching(self, integration_type: str) -> Set[str]:
+        """Get service IDs whose category contains integration_type"""
+        needle = integration_type.lower()
+        matched: Set[str] = set()
+        for category, service_ids in self._categories.items():
+            if needle in category.lower():
+                matched |= service_ids
+        return matched
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        integration_type: Optional[str] = None,
+        active_only: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Ranked, faceted, paginated search.
+
+        Facet counts cover all results matching the query and filters
+        except the category filter, so clients can switch categories.
+
+        Returns:
+            Dictionary with:
+                - services: Page of service definitions
+                - total: Number of matching services
+                - facets: {"category": {category: count}}
+        """
+        candidates = set(self._active if active_only else self._services)
+
+        if integration_type:
+            candidates &= self.categories_matching(integration_type)
+
+        scores = self.match(query) if query else None
+        if scores is not None:
+            candidates &= scores.keys()
+
+        facet_counts: Dict[str, int] = {}
+        for category_name, service_ids in self._categories.items():
+            count = len(candidates & service_ids)
+            if count:
+                facet_counts[category_name] = count
+
+        if category:
+            candidates &= self._categories.get(category, set())
+
+        if scores is not None:
+            ordered = sorted(candidates, key=lambda sid: (-scores[sid], self._rank[sid]))
+        else:
+            ordered = sorted(candidates, key=self._rank.__getitem__)
+
+        page = ordered[offset:offset + limit] if limit is not None else ordered[offset:]
+        return {
+            "services": [self._services[service_id] for service_id in page],
+            "total": len(ordered),
+            "facets": {"category": facet_counts}
+        }
@@ -3,27 +3,95 @@ Service registry and discovery system
 """
 
 import os
+import json
 import yaml
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, NamedTuple, Tuple
 from pathlib import Path
+from .search_index import ServiceSearchIndex
 
 logger = logging.getLogger(__name__)
 
+# Bump when the snapshot layout or definition post-processing changes
+SNAPSHOT_FORMAT = 2
+# JSON, not pickle: the definitions directory is often a writable volume,
+# and loading a snapshot must never execute code from it
+SNAPSHOT_FILENAME = ".registry_snapshot.json"
+
+# (st_mtime_ns, st_size) of a definition file
+FileStamp = Tuple[int, int]
+
+
+def _encode_value(value: Any) -> Any:
+    """
+    Encode a parsed YAML value as JSON-compatible data that decodes back to
+    an equal value (YAML allows non-string keys and dates; JSON does not).
+    
+    Raises:
+        TypeError: If the value contains a type the snapshot cannot hold
+    """
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value) and not any(key.startswith("__snapshot_") for key in value):
+            return {key: _encode_value(item) for key, item in value.items()}
+        return {"__snapshot_items__": [[_encode_value(key), _encode_value(item)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return [_encode_value(item) for item in value]
+    if isinstance(value, datetime):
+        return {"__snapshot_datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__snapshot_date__": value.isoformat()}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise TypeError(f"Cannot snapshot {type(value).__name__} values")
+
+
+def _decode_value(value: Any) -> Any:
+    """Inverse of _encode_value()"""
+    if isinstance(value, dict):
+        if "__snapshot_items__" in value:
+            return {_decode_value(key): _decode_value(item) for key, item in value["__snapshot_items__"]}
+        if "__snapshot_datetime__" in value:
+            return datetime.fromisoformat(value["__snapshot_datetime__"])
+        if "__snapshot_date__" in value:
+            return date.fromisoformat(value["__snapshot_date__"])
+        return {key: _decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(item) for item in value]
+    return value
+
+
+class _RegistryState(NamedTuple):
+    """Immutable view of the loaded definitions, swapped in as a whole"""
+    version: int
+    files: Dict[str, FileStamp]
+    definitions: Dict[str, Optional[Dict[str, Any]]]
+    services: Dict[str, Dict[str, Any]]
+    index: ServiceSearchIndex
+
 
 class ServiceRegistry:
     """
     Manages service definitions and discovery.
     Loads service definitions from YAML files and provides discovery capabilities.
+
+    Parsed definitions are kept in a snapshot file keyed by each YAML
+    file's mtime and size, so startup only parses files that changed
+    since the snapshot was written.
     """
     
-    def __init__(self, definitions_path: Optional[str] = None):
+    def __init__(self, definitions_path: Optional[str] = None, snapshot_path: Optional[str] = None):
         """
         Initialize service registry.
         
         Args:
             definitions_path: Path to service definitions directory.
                             Defaults to src/registry/service_definitions/
+            snapshot_path: Path to the compiled snapshot. Defaults to
+                          REGISTRY_SNAPSHOT_PATH, else a file inside
+                          definitions_path. Ignored when
+                          REGISTRY_SNAPSHOT_ENABLED is false.
         """
         if definitions_path:
             self.definitions_path = Path(definitions_path)
@@ -32,25 +100,163 @@ class ServiceRegistry:
             current_dir = Path(__file__).parent
             self.definitions_path = current_dir / "service_definitions"
         
-        self._services: Dict[str, Dict[str, Any]] = {}
-        self._load_all_definitions()
+        if os.getenv("REGISTRY_SNAPSHOT_ENABLED", "true").lower() != "true":
+            self.snapshot_path: Optional[Path] = None
+        else:
+            self.snapshot_path = Path(
+                snapshot_path or os.getenv("REGISTRY_SNAPSHOT_PATH") or self.definitions_path / SNAPSHOT_FILENAME
+            )
+        
+        self._lock = threading.Lock()
+        self._state = _RegistryState(0, {}, {}, {}, ServiceSearchIndex({}))
+        self._load_all_definitions(*self._read_snapshot())
+    
+    @property
+    def _services(self) -> Dict[str, Dict[str, Any]]:
+        return self._state.services
+    
+    @property
+    def _index(self) -> ServiceSearchIndex:
+        return self._state.index
+    
+    @property
+    def version(self) -> int:
+        """Counter incremented every time a new set of definitions is swapped in"""
+        return self._state.version
+    
+    def _scan_definitions(self) -> Dict[str, FileStamp]:
+        """Stat every definition file (no parsing)"""
+        files: Dict[str, FileStamp] = {}
+        for yaml_file in sorted(self.definitions_path.glob("*.yaml")):
+            try:
+                stat = yaml_file.stat()
+            except OSError:
+                continue
+            files[yaml_file.name] = (stat.st_mtime_ns, stat.st_size)
+        return files
     
-    def _load_all_definitions(self):
-        """Load all service definitions from YAML files."""
+    def _load_all_definitions(
+        self,
+        cached_files: Optional[Dict[str, FileStamp]] = None,
+        cached_definitions: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+    ) -> bool:
+        """
+        Load all service definitions from YAML files and swap them in.
+        
+        Files whose stamp matches cached_files reuse the cached definition
+        instead of being parsed again. Readers keep seeing the previous
+        definitions until the new state is complete.
+        
+        Args:
+            cached_files: File stamps the cached definitions were parsed from
+            cached_definitions: Mapping of file name to parsed definition
+                              (None for files that failed validation)
+            
+        Returns:
+            True if a new state was swapped in
+        """
         if not self.definitions_path.exists():
             logger.warning(f"Service definitions path does not exist: {self.definitions_path}")
+            return False
+        
+        cached_files = cached_files or {}
+        cached_definitions = cached_definitions or {}
+        
+        with self._lock:
+            files = self._scan_definitions()
+            definitions: Dict[str, Optional[Dict[str, Any]]] = {}
+            parsed = 0
+            
+            for file_name, stamp in files.items():
+                if cached_files.get(file_name) == stamp and file_name in cached_definitions:
+                    definitions[file_name] = cached_definitions[file_name]
+                    continue
+                
+                parsed += 1
+                yaml_file = self.definitions_path / file_name
+                try:
+                    service_def = self._load_definition(yaml_file)
+                    definitions[file_name] = service_def if service_def and service_def.get("id") else None
+                    if definitions[file_name]:
+                        logger.info(f"Loaded service definition: {service_def['id']}")
+                except Exception as e:
+                    definitions[file_name] = None
+                    logger.error(f"Error loading service definition from {yaml_file}: {str(e)}")
+            
+            services: Dict[str, Dict[str, Any]] = {}
+            for service_def in definitions.values():
+                if service_def:
+                    services[service_def["id"]] = service_def
+            
+            self._state = _RegistryState(
+                version=self._state.version + 1,
+                files=files,
+                definitions=definitions,
+                services=services,
+                index=ServiceSearchIndex(services)
+            )
+            
+            if parsed or files != cached_files:
+                self._write_snapshot(files, definitions)
+        
+        logger.info(f"Service registry loaded {len(services)} services ({parsed} definition files parsed)")
+        return True
+    
+    def _read_snapshot(self) -> Tuple[Dict[str, FileStamp], Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        Read the compiled snapshot.
+        
+        Returns:
+            Tuple of (file stamps, definitions by file name); both empty if
+            there is no usable snapshot
+        """
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return {}, {}
+        
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if (
+                not isinstance(snapshot, dict)
+                or snapshot.get("format") != SNAPSHOT_FORMAT
+                or snapshot.get("definitions_path") != str(self.definitions_path)
+            ):
+                return {}, {}
+            files = {name: (stamp[0], stamp[1]) for name, stamp in snapshot["files"].items()}
+            definitions = {name: _decode_value(definition) for name, definition in snapshot["definitions"].items()}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable registry snapshot {self.snapshot_path}: {str(e)}")
+            return {}, {}
+        
+        return files, definitions
+    
+    def _write_snapshot(self, files: Dict[str, FileStamp], definitions: Dict[str, Optional[Dict[str, Any]]]):
+        """Write the compiled snapshot atomically; failures (e.g. read-only filesystem) are not fatal."""
+        if not self.snapshot_path:
             return
         
-        for yaml_file in self.definitions_path.glob("*.yaml"):
+        try:
+            snapshot = {
+                "format": SNAPSHOT_FORMAT,
+                "definitions_path": str(self.definitions_path),
+                "files": {name: list(stamp) for name, stamp in files.items()},
+                "definitions": {name: _encode_value(definition) for name, definition in definitions.items()}
+            }
+        except TypeError as e:
+            logger.warning(f"Not writing registry snapshot: {str(e)}")
+            return
+        
+        tmp_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.debug(f"Could not write registry snapshot {self.snapshot_path}: {str(e)}")
             try:
-                service_def = self._load_definition(yaml_file)
-                if service_def:
-                    service_id = service_def.get("id")
-                    if service_id:
-                        self._services[service_id] = service_def
-                        logger.info(f"Loaded service definition: {service_id}")
-            except Exception as e:
-                logger.error(f"Error loading service definition from {yaml_file}: {str(e)}")
+                tmp_path.unlink()
+            except OSError:
+                pass
     
     def _load_definition(self, yaml_file: Path) -> Optional[Dict[str, Any]]:
         """
@@ -95,49 +301,74 @@ class ServiceRegistry:
         """
         return self._services.get(service_id)
     
+    def search(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        integration_type: Optional[str] = None,
+        active_only: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Ranked, faceted search over the precomputed index.
+        
+        Args:
+            query: Free-text query matched against name, description and capabilities
+            category: Filter by category
+            integration_type: Filter by categories containing this string
+            active_only: Only return active services
+            limit: Maximum number of services to return
+            offset: Number of services to skip
+            
+        Returns:
+            Dictionary with services (page), total and category facets
+        """
+        return self._index.search(
+            query=query,
+            category=category,
+            integration_type=integration_type,
+            active_only=active_only,
+            limit=limit,
+            offset=offset
+        )
+    
     def list_services(
         self,
         category: Optional[str] = None,
         search_query: Optional[str] = None,
-        active_only: bool = True
+        active_only: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[Dict[str, Any]]:
         """
         List all services with optional filtering.
         
         Args:
             category: Filter by category (e.g., "lead_generation", "email")
-            search_query: Search in name and description
+            search_query: Search in name, description and capabilities
             active_only: Only return active services
+            limit: Maximum number of services to return
+            offset: Number of services to skip
             
         Returns:
-            List of service definitions
+            List of service definitions, most relevant (or popular) first
         """
-        services = list(self._services.values())
-        
-        # Filter by category
-        if category:
-            services = [s for s in services if s.get("category") == category]
-        
-        # Filter by search query
-        if search_query:
-            query_lower = search_query.lower()
-            services = [
-                s for s in services
-                if query_lower in s.get("name", "").lower()
-                or query_lower in s.get("description", "").lower()
-            ]
-        
-        # Filter active services
-        if active_only:
-            services = [s for s in services if s.get("is_active", True)]
-        
-        return services
+        return self.search(
+            query=search_query,
+            category=category,
+            active_only=active_only,
+            limit=limit,
+            offset=offset
+        )["services"]
     
     def search_marketplace(
         self,
         use_case: Optional[str] = None,
         integration_type: Optional[str] = None,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[Dict[str, Any]]:
         """
         Search marketplace for services.
@@ -146,30 +377,19 @@ class ServiceRegistry:
             use_case: Search by use case (e.g., "lead generation", "email marketing")
             integration_type: Search by integration type
             category: Filter by category
+            limit: Maximum number of services to return
+            offset: Number of services to skip
             
         Returns:
-            List of matching service definitions
+            List of matching service definitions, most relevant first
         """
-        services = self.list_services(category=category, active_only=True)
-        
-        # Filter by use case
-        if use_case:
-            use_case_lower = use_case.lower()
-            services = [
-                s for s in services
-                if use_case_lower in s.get("description", "").lower()
-                or use_case_lower in s.get("name", "").lower()
-                or any(use_case_lower in cap.lower() for cap in s.get("capabilities", []))
-            ]
-        
-        # Filter by integration type
-        if integration_type:
-            services = [
-                s for s in services
-                if integration_type.lower() in s.get("category", "").lower()
-            ]
-        
-        return services
+        return self.search(
+            query=use_case,
+            category=category,
+            integration_type=integration_type,
+            limit=limit,
+            offset=offset
+        )["services"]
     
     def get_service_capabilities(self, service_id: str) -> List[str]:
         """
@@ -231,9 +451,21 @@ class ServiceRegistry:
             return service.get("optional_credentials", [])
         return []
     
+    def refresh(self) -> bool:
+        """
+        Re-parse only definition files added, changed or removed since the
+        last load and swap in the result.
+        
+        Returns:
+            True if anything changed
+        """
+        state = self._state
+        if self._scan_definitions() == state.files:
+            return False
+        return self._load_all_definitions(state.files, state.definitions)
+    
     def reload(self):
         """Reload all service definitions from disk."""
-        self._services.clear()
         self._load_all_definitions()
         logger.info("Service registry reloaded")
 
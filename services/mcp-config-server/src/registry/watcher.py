@@ -0,0 +1,71 @@
+"""
+Hot reload of service definitions
+"""
+
+import os
+import logging
+import threading
+from typing import Optional
+from .service_registry import ServiceRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryWatcher:
+    """
+    Polls the service definitions directory and incrementally reloads the
+    registry when YAML files are added, changed or removed.
+
+    Polling only stats the files, so it works the same on local disks,
+    bind mounts and Kubernetes ConfigMap volumes.
+    """
+
+    def __init__(self, registry: ServiceRegistry, interval: float):
+        """
+        Initialize watcher.
+
+        Args:
+            registry: Registry to refresh
+            interval: Seconds between polls
+        """
+        self.registry = registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start polling in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="registry-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.registry.definitions_path} for changes every {self.interval}s")
+
+    def stop(self):
+        """Stop polling and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self.registry.refresh():
+                    logger.info(f"Service registry hot-reloaded (version {self.registry.version})")
+            except Exception as e:
+                logger.error(f"Error refreshing service registry: {str(e)}")
+
+
+def create_watcher(registry: ServiceRegistry) -> Optional[RegistryWatcher]:
+    """
+    Create a watcher from REGISTRY_WATCH_INTERVAL (seconds, 0 disables).
+
+    Returns:
+        RegistryWatcher, or None if hot reload is disabled
+    """
+    interval = float(os.getenv("REGISTRY_WATCH_INTERVAL", "0"))
+    if interval <= 0:
+        return None
+    return RegistryWatcher(registry, interval)
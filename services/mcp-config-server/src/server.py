@@ -2,21 +2,42 @@
 MCP Configuration Server - FastAPI Application
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status, Security
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends, Header, Query, Request, Response, status, Security
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Callable, Hashable, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import json
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from .database.connection import get_db, init_db
-from .database.models import ServiceConfiguration, ConnectionTest
+from .database.connection import close_async_engine, get_async_db, init_db
+from .database.models import ServiceConfiguration, ConnectionTest, ConnectionTestRollup, ActionJob
+from .database.retention import start_background_retention
 from .encryption.credential_manager import get_credential_manager
+from .encryption.reencryption import start_background_reencryption
+from .encryption.transfer import TransferCipher
 from .registry.service_registry import get_registry
+from .registry.watcher import create_watcher
+from .registry.search_index import tokenize
+from .registry.response_cache import get_response_cache, summarize_services, etag_matches
+from .registry.popularity import get_usage_tracker
 from .plugin_loader import get_plugin_loader
+from .connectors.base_connector import AsyncBaseConnector, run_test_connection
+from .connectors.enrichment_cache import get_enrichment_cache
+from .connectors.http_pool import close_http_clients
+from .connectors.isolation import get_worker_pool, isolation_enabled
+from .connectors.metrics import get_connector_metrics
+from .health_scheduler import HealthScheduler, get_health_scheduler
+from .jobs import (
+    FINAL_STATUSES, JOB_SUMMARY_COLUMNS, cancel_job, get_job_summary, get_job_worker,
+    job_summary, read_job_results, submit_job
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -79,18 +100,78 @@ async def verify_api_key(api_key: Optional[str] = Security(api_key_header)):
     
     return True
 
+registry_watcher = None
+reencryption_stop = None
+health_scheduler = None
+retention_stop = None
+usage_tracker = None
+job_worker = None
+
+
 # Initialize on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and services on startup"""
+    global registry_watcher, reencryption_stop, health_scheduler, retention_stop, usage_tracker, job_worker
     try:
         init_db()
+        # Start connector worker processes before serving traffic
+        if isolation_enabled():
+            await get_worker_pool().start()
+        # Probe Redis for the enrichment cache off the event loop, not on the first batch
+        await asyncio.to_thread(get_enrichment_cache)
+        # Load definitions (from the compiled snapshot when current) before serving traffic
+        registry = get_registry()
+        registry_watcher = create_watcher(registry)
+        if registry_watcher:
+            registry_watcher.start()
+        # Re-wrap credentials still under a retired master key, throttled, while serving traffic
+        if os.getenv("CREDENTIAL_REENCRYPTION_ON_STARTUP", "false").lower() == "true":
+            reencryption_stop = start_background_reencryption()
+        # Test configured connections periodically; the API serves the stored results
+        health_scheduler = get_health_scheduler()
+        if health_scheduler:
+            health_scheduler.start()
+        # Roll up and prune connection test history
+        retention_interval = float(os.getenv("CONNECTION_TEST_RETENTION_INTERVAL", "3600"))
+        if retention_interval > 0:
+            retention_stop = start_background_retention(retention_interval)
+        # Fold usage counts into popularity scores and the ranked view
+        usage_tracker = get_usage_tracker()
+        if usage_tracker.interval > 0:
+            usage_tracker.start()
+        # Run queued action jobs here unless dedicated workers do (JOB_WORKER_CONCURRENCY=0)
+        job_worker = get_job_worker()
+        if job_worker:
+            job_worker.start()
         logger.info("MCP Configuration Server started")
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and close pooled connector clients"""
+    if registry_watcher:
+        registry_watcher.stop()
+    if reencryption_stop:
+        reencryption_stop.set()
+    if retention_stop:
+        retention_stop.set()
+    if usage_tracker:
+        # Final flush talks to Redis and the database; keep it off the event loop
+        await asyncio.to_thread(usage_tracker.stop)
+    if health_scheduler:
+        await health_scheduler.stop()
+    if job_worker:
+        await job_worker.stop()
+    if isolation_enabled():
+        await get_worker_pool().shutdown()
+    await close_http_clients()
+    await close_async_engine()
+
+
 # Request/Response Models
 class ServiceConfigurationRequest(BaseModel):
     service_name: str
@@ -99,10 +180,43 @@ class ServiceConfigurationRequest(BaseModel):
     config_name: str = "default"
 
 
+MAX_BULK_CONFIGURATIONS = int(os.getenv("MAX_BULK_CONFIGURATIONS", "1000"))
+CONFIGURATION_BATCH_SIZE = int(os.getenv("CONFIGURATION_BATCH_SIZE", "500"))
+
+
+class BulkConfigurationRequest(BaseModel):
+    configurations: List[ServiceConfigurationRequest] = Field(
+        ..., min_length=1, max_length=MAX_BULK_CONFIGURATIONS
+    )
+    test_connections: bool = True
+
+
 class ServiceUpdateRequest(BaseModel):
     updates: Dict[str, Any]
 
 
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "10000"))
+
+
+class BatchActionRequest(BaseModel):
+    service_name: str
+    action: str
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+    config_id: Optional[int] = None
+
+
+MAX_JOB_ITEMS = int(os.getenv("MAX_JOB_ITEMS", "200000"))
+JOB_STREAM_INTERVAL = float(os.getenv("JOB_STREAM_INTERVAL", "1"))
+
+
+class BatchJobRequest(BaseModel):
+    service_name: str
+    action: str
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_JOB_ITEMS)
+    config_id: Optional[int] = None
+    idempotency_key: Optional[str] = Field(None, max_length=255)
+
+
 class MCPResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
@@ -110,6 +224,46 @@ class MCPResponse(BaseModel):
     next_steps: Optional[List[str]] = None
 
 
+# Marketplace views: "full" definitions or "summary" without configuration details
+VIEW_PATTERN = "^(full|summary)$"
+
+
+def cached_marketplace_response(
+    request: Request,
+    key: Hashable,
+    build: Callable[[], MCPResponse]
+) -> Response:
+    """
+    Serve a marketplace response from the response cache.
+
+    The body is serialized once per registry version and query; clients
+    revalidating with If-None-Match get a 304 without a body.
+
+    Args:
+        request: Incoming request
+        key: Normalized query parameters
+        build: Function building the MCPResponse on a cache miss
+
+    Returns:
+        JSON response with ETag, or 304 Not Modified
+    """
+    cached = get_response_cache().get(
+        key,
+        get_registry().version,
+        lambda: build().model_dump_json().encode()
+    )
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def _query_terms(query: Optional[str]) -> Optional[tuple]:
+    """Normalize a free-text query for use in a cache key"""
+    return tuple(tokenize(query)) if query else None
+
+
 # Health endpoints
 @app.get("/health")
 async def health():
@@ -129,24 +283,48 @@ async def liveness():
     return {"status": "alive"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Vendor API call metrics in the Prometheus text format"""
+    return Response(
+        content=get_connector_metrics().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # MCP Tool Endpoints
 
 @app.get("/mcp/marketplace", response_model=MCPResponse)
 async def get_marketplace(
+    request: Request,
     category: Optional[str] = None,
     search: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    view: str = Query("full", pattern=VIEW_PATTERN),
     _: bool = Depends(verify_api_key)
 ):
     """Get marketplace of available services"""
-    try:
-        registry = get_registry()
-        services = registry.list_services(category=category, search_query=search)
+    def build() -> MCPResponse:
+        result = get_registry().search(query=search, category=category, limit=limit, offset=offset)
+        services = result["services"]
+        if view == "summary":
+            services = summarize_services(services)
         
         return MCPResponse(
             success=True,
-            data={"services": services, "count": len(services)},
-            message=f"Found {len(services)} services"
+            data={
+                "services": services,
+                "count": len(services),
+                "total": result["total"],
+                "facets": result["facets"]
+            },
+            message=f"Found {result['total']} services"
         )
+    
+    try:
+        key = ("marketplace", category, _query_terms(search), limit, offset, view)
+        return cached_marketplace_response(request, key, build)
     except Exception as e:
         logger.error(f"Error getting marketplace: {str(e)}")
         raise HTTPException(
@@ -157,24 +335,58 @@ async def get_marketplace(
 
 @app.get("/mcp/tools/discover_services", response_model=MCPResponse)
 async def discover_services(
+    request: Request,
     category: str = "all",
+    view: str = Query("full", pattern=VIEW_PATTERN),
     _: bool = Depends(verify_api_key)
 ):
     """Discover available services by category"""
-    try:
-        registry = get_registry()
-        services = registry.list_services(category=category if category != "all" else None)
+    def build() -> MCPResponse:
+        services = get_registry().list_services(category=category if category != "all" else None)
+        if view == "summary":
+            services = summarize_services(services)
         
         return MCPResponse(
             success=True,
             data={"services": services},
             message=f"Discovered {len(services)} services"
         )
+    
+    try:
+        return cached_marketplace_response(request, ("discover_services", category, view), build)
     except Exception as e:
         logger.error(f"Error discovering services: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/mcp/tools/get_top_services", response_model=MCPResponse)
+async def get_top_services(
+    limit: int = Query(10, ge=1, le=100),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Most popular services by live usage (configurations and actions executed).
+    
+    Read from the in-memory ranking, which is refreshed after each usage flush.
+    """
+    try:
+        registry = get_registry()
+        services = []
+        for service_id, score in get_usage_tracker().ranking.top(limit):
+            service = registry.get_service(service_id)
+            if service:
+                services.append({**summarize_services([service])[0], "popularity_score": score})
+        
+        return MCPResponse(
+            success=True,
+            data={"services": services, "count": len(services)},
+            message=f"Top {len(services)} services"
+        )
+    except Exception as e:
+        logger.error(f"Error getting top services: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/mcp/tools/get_service_info", response_model=MCPResponse)
 async def get_service_info(
     service_name: str,
@@ -206,7 +418,7 @@ async def get_service_info(
 @app.post("/mcp/tools/configure_service", response_model=MCPResponse)
 async def configure_service(
     request: ServiceConfigurationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_api_key)
 ):
     """Configure a service with credentials"""
@@ -240,16 +452,17 @@ async def configure_service(
                 detail=f"Connector for {request.service_name} not found"
             )
         
-        test_result = connector.test_connection(request.credentials)
+        test_result = await run_test_connection(connector, request.credentials)
         
         # Encrypt credentials
-        encrypted_credentials = credential_manager.encrypt_credentials(request.credentials)
+        encrypted_credentials = await asyncio.to_thread(credential_manager.encrypt_credentials, request.credentials)
         
         # Save configuration
         config = ServiceConfiguration(
             service_id=request.service_name,
             config_name=request.config_name,
             encrypted_credentials=encrypted_credentials,
+            encryption_key_id=credential_manager.primary_key_id,
             settings=request.settings,
             status="active" if test_result.get("status") == "success" else "failed",
             last_tested_at=datetime.utcnow(),
@@ -257,8 +470,8 @@ async def configure_service(
         )
         
         db.add(config)
-        db.commit()
-        db.refresh(config)
+        # Assigns config.id for the test record; both rows commit together
+        await db.flush()
         
         # Save connection test
         if test_result:
@@ -270,7 +483,8 @@ async def configure_service(
                 test_duration_ms=test_result.get("duration_ms", 0)
             )
             db.add(test_record)
-            db.commit()
+        await db.commit()
+        get_usage_tracker().record(request.service_name, "configuration")
         
         return MCPResponse(
             success=True,
@@ -290,38 +504,327 @@ async def configure_service(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def validate_configuration(service_name: str, credentials: Dict[str, Any]) -> Optional[str]:
+    """
+    Check a configuration against its service definition.
+    
+    Returns:
+        Error message, or None if the configuration is valid
+    """
+    registry = get_registry()
+    if not registry.get_service(service_name):
+        return f"Service '{service_name}' not found"
+    missing = [field for field in registry.get_required_credentials(service_name) if field not in credentials]
+    if missing:
+        return f"Missing required credentials: {', '.join(missing)}"
+    return None
+
+
+async def insert_configurations(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert pending configurations with one multi-row INSERT (not committed).
+    
+    Returns:
+        New configuration ids, in row order
+    """
+    return list(await db.scalars(
+        insert(ServiceConfiguration).returning(ServiceConfiguration.id, sort_by_parameter_order=True),
+        rows
+    ))
+
+
+def schedule_connection_tests(background_tasks: BackgroundTasks, config_ids: List[int]):
+    """Test new configurations after the response has been sent."""
+    scheduler = health_scheduler or HealthScheduler(interval=0)
+    background_tasks.add_task(scheduler.test_configurations, config_ids)
+
+
+@app.post("/mcp/tools/configure_services", response_model=MCPResponse)
+async def configure_services(
+    request: BulkConfigurationRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Configure many services at once (e.g. an agency's sub-accounts).
+    
+    Every configuration is validated first; if any is invalid, nothing is
+    saved and the errors of all of them are returned. Credentials are
+    encrypted on the crypto thread pool and all rows are inserted in one
+    transaction as "pending". Connection tests run in the background after
+    the response (test_connections=false skips them); their results appear
+    in get_connection_health.
+    """
+    try:
+        errors = []
+        for index, item in enumerate(request.configurations):
+            error = validate_configuration(item.service_name, item.credentials)
+            if error:
+                errors.append({"index": index, "service_name": item.service_name, "error": error})
+        if errors:
+            raise HTTPException(
+                status_code=400,
+                detail={"message": f"{len(errors)} invalid configurations; nothing was saved", "errors": errors}
+            )
+        
+        credential_manager = get_credential_manager()
+        encrypted = await asyncio.to_thread(
+            credential_manager.encrypt_many, [item.credentials for item in request.configurations]
+        )
+        config_ids = await insert_configurations(db, [
+            {
+                "service_id": item.service_name,
+                "config_name": item.config_name,
+                "encrypted_credentials": encrypted_credentials,
+                "encryption_key_id": credential_manager.primary_key_id,
+                "settings": item.settings,
+                "status": "pending"
+            }
+            for item, encrypted_credentials in zip(request.configurations, encrypted)
+        ])
+        await db.commit()
+        
+        usage_tracker = get_usage_tracker()
+        for item in request.configurations:
+            usage_tracker.record(item.service_name, "configuration")
+        if request.test_connections:
+            schedule_connection_tests(background_tasks, config_ids)
+        
+        return MCPResponse(
+            success=True,
+            data={
+                "configuration_ids": config_ids,
+                "connection_tests": "scheduled" if request.test_connections else "skipped"
+            },
+            message=f"Configured {len(config_ids)} services",
+            next_steps=["Check connection results with get_connection_health"] if request.test_connections else ["Test connections"]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error configuring services: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mcp/tools/export_configurations")
+async def export_configurations(
+    service_name: Optional[str] = None,
+    transfer_key: str = Header(..., alias="X-Transfer-Key"),
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Stream configurations as newline-delimited JSON for another deployment.
+    
+    Credentials are decrypted with this deployment's master key and
+    re-encrypted with a key derived from the X-Transfer-Key passphrase;
+    load the export with import_configurations and the same passphrase.
+    Rows are read and decrypted in batches, so memory use does not grow
+    with the number of configurations.
+    """
+    try:
+        cipher = await asyncio.to_thread(TransferCipher, transfer_key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    query = select(
+        ServiceConfiguration.service_id,
+        ServiceConfiguration.config_name,
+        ServiceConfiguration.settings,
+        ServiceConfiguration.encrypted_credentials
+    ).order_by(ServiceConfiguration.id)
+    if service_name:
+        query = query.where(ServiceConfiguration.service_id == service_name)
+    credential_manager = get_credential_manager()
+    
+    def encode(rows) -> str:
+        credentials = credential_manager.decrypt_many([row.encrypted_credentials for row in rows])
+        return "".join(
+            json.dumps({
+                "service_id": row.service_id,
+                "config_name": row.config_name,
+                "settings": row.settings,
+                "credentials": cipher.encrypt(row_credentials)
+            }) + "\n"
+            for row, row_credentials in zip(rows, credentials)
+        )
+    
+    async def lines():
+        yield json.dumps(cipher.header()) + "\n"
+        result = await db.stream(query.execution_options(yield_per=CONFIGURATION_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield await asyncio.to_thread(encode, rows)
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=configurations.ndjson"}
+    )
+
+
+async def _ndjson_lines(request: Request):
+    """Yield (line number, line) for the non-empty lines of a streamed request body."""
+    buffer = b""
+    number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+def _prepare_import_batch(cipher: TransferCipher, batch: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Decrypt, validate and re-encrypt one batch of export lines.
+    
+    Returns:
+        Configuration rows to insert
+    
+    Raises:
+        ValueError: For the first invalid line, naming its line number
+    """
+    rows = []
+    credentials_list = []
+    for line_number, entry in batch:
+        service_id = entry.get("service_id")
+        try:
+            credentials = cipher.decrypt(entry.get("credentials") or "")
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {str(e)}")
+        error = validate_configuration(service_id, credentials) if service_id else "Missing service_id"
+        if error:
+            raise ValueError(f"Line {line_number}: {error}")
+        credentials_list.append(credentials)
+        rows.append({
+            "service_id": service_id,
+            "config_name": entry.get("config_name") or "default",
+            "settings": entry.get("settings"),
+            "status": "pending"
+        })
+    
+    credential_manager = get_credential_manager()
+    for row, encrypted in zip(rows, credential_manager.encrypt_many(credentials_list)):
+        row["encrypted_credentials"] = encrypted
+        row["encryption_key_id"] = credential_manager.primary_key_id
+    return rows
+
+
+@app.post("/mcp/tools/import_configurations", response_model=MCPResponse)
+async def import_configurations(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    test_connections: bool = True,
+    transfer_key: str = Header(..., alias="X-Transfer-Key"),
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Import the output of export_configurations in one transaction.
+    
+    The body is read as a stream and handled in batches; any invalid line
+    (wrong passphrase, unknown service, missing credentials) aborts the
+    import without saving anything. Imported configurations are
+    re-encrypted with this deployment's master key and tested in the
+    background unless test_connections=false.
+    """
+    try:
+        cipher = None
+        batch = []
+        config_ids = []
+        async for line_number, line in _ndjson_lines(request):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Line {line_number}: not valid JSON")
+            if cipher is None:
+                cipher = await asyncio.to_thread(TransferCipher.from_header, transfer_key, entry)
+                continue
+            batch.append((line_number, entry))
+            if len(batch) >= CONFIGURATION_BATCH_SIZE:
+                config_ids += await insert_configurations(db, await asyncio.to_thread(_prepare_import_batch, cipher, batch))
+                batch = []
+        if cipher is None:
+            raise ValueError("Empty export")
+        if batch:
+            config_ids += await insert_configurations(db, await asyncio.to_thread(_prepare_import_batch, cipher, batch))
+        await db.commit()
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error importing configurations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if config_ids and test_connections:
+        schedule_connection_tests(background_tasks, config_ids)
+    
+    return MCPResponse(
+        success=True,
+        data={
+            "imported": len(config_ids),
+            "configuration_ids": config_ids,
+            "connection_tests": "scheduled" if config_ids and test_connections else "skipped"
+        },
+        message=f"Imported {len(config_ids)} configurations"
+    )
+
+
+async def get_service_configuration(db: AsyncSession, service_name: str, config_id: Optional[int] = None) -> ServiceConfiguration:
+    """
+    Get a configuration by ID, or the active configuration of a service.
+    
+    Raises:
+        HTTPException: 404 if no configuration matches, 400 if config_id
+            belongs to a different service
+    """
+    if config_id:
+        query = select(ServiceConfiguration).where(ServiceConfiguration.id == config_id)
+    else:
+        query = select(ServiceConfiguration).where(
+            ServiceConfiguration.service_id == service_name,
+            ServiceConfiguration.status == "active"
+        )
+    config = (await db.scalars(query.limit(1))).first()
+    
+    if not config:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Configuration for '{service_name}' not found"
+        )
+    if config.service_id != service_name:
+        # Credentials of one service must never be sent to another's connector
+        raise HTTPException(
+            status_code=400,
+            detail=f"Configuration {config_id} belongs to '{config.service_id}', not '{service_name}'"
+        )
+    return config
+
+
 @app.post("/mcp/tools/test_service_connection", response_model=MCPResponse)
 async def test_service_connection(
     service_name: str,
     config_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_api_key)
 ):
     """Test connection to a configured service"""
     try:
-        registry = get_registry()
         credential_manager = get_credential_manager()
         plugin_loader = get_plugin_loader()
         
         # Get configuration
-        if config_id:
-            config = db.query(ServiceConfiguration).filter(
-                ServiceConfiguration.id == config_id
-            ).first()
-        else:
-            config = db.query(ServiceConfiguration).filter(
-                ServiceConfiguration.service_id == service_name,
-                ServiceConfiguration.status == "active"
-            ).first()
-        
-        if not config:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Configuration for '{service_name}' not found"
-            )
+        config = await get_service_configuration(db, service_name, config_id)
         
-        # Decrypt credentials
-        credentials = credential_manager.decrypt_credentials(config.encrypted_credentials)
+        # Decrypt credentials (key derivation and Fernet are CPU-bound)
+        credentials = await asyncio.to_thread(
+            credential_manager.decrypt_configuration_credentials, config.id, config.encrypted_credentials
+        )
         
         # Get connector and test
         connector = plugin_loader.get_connector(service_name)
@@ -332,14 +835,13 @@ async def test_service_connection(
             )
         
         start_time = datetime.utcnow()
-        test_result = connector.test_connection(credentials)
+        test_result = await run_test_connection(connector, credentials)
         duration_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
         
         # Update configuration
         config.last_tested_at = datetime.utcnow()
         config.last_test_result = test_result
         config.status = "active" if test_result.get("status") == "success" else "failed"
-        db.commit()
         
         # Save test record
         test_record = ConnectionTest(
@@ -350,7 +852,7 @@ async def test_service_connection(
             test_duration_ms=duration_ms
         )
         db.add(test_record)
-        db.commit()
+        await db.commit()
         
         return MCPResponse(
             success=test_result.get("status") == "success",
@@ -364,29 +866,425 @@ async def test_service_connection(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/mcp/tools/execute_batch")
+async def execute_batch(
+    request: BatchActionRequest,
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Run a connector action for many items (e.g. verify emails, enrich domains).
+    
+    Streams newline-delimited JSON: one {"index", "result"} line per item as
+    vendor calls complete (not in input order), then a summary line.
+    """
+    try:
+        config = await get_service_configuration(db, request.service_name, request.config_id)
+        credentials = await asyncio.to_thread(
+            get_credential_manager().decrypt_configuration_credentials, config.id, config.encrypted_credentials
+        )
+        
+        connector = get_plugin_loader().get_connector(request.service_name)
+        if not connector:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Connector for {request.service_name} not found"
+            )
+        if not isinstance(connector, AsyncBaseConnector):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Connector for {request.service_name} does not support batch execution"
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting batch execution: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    get_usage_tracker().record(request.service_name, "action", len(request.items))
+    
+    async def stream():
+        succeeded = 0
+        async for item in connector.execute_batch(request.action, request.items, credentials):
+            if item["result"].get("status") == "success":
+                succeeded += 1
+            yield json.dumps(item, default=str) + "\n"
+        yield json.dumps({
+            "done": True,
+            "total": len(request.items),
+            "succeeded": succeeded,
+            "failed": len(request.items) - succeeded
+        }) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/mcp/tools/submit_batch_job", response_model=MCPResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_batch_job(
+    request: BatchJobRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Queue a connector action for many items (e.g. a bulk lead import).
+    
+    The job runs in the background; follow it with get_job or stream_job
+    and page through get_job_results. Retrying with the same
+    Idempotency-Key header (or idempotency_key field) returns the job
+    created by the first attempt instead of queueing it twice.
+    """
+    try:
+        config = await get_service_configuration(db, request.service_name, request.config_id)
+        key = idempotency_key or request.idempotency_key
+        job, created = await db.run_sync(submit_job, config, request.action, request.items, key)
+        if not created and (job.service_id != request.service_name or job.action != request.action):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Idempotency key {key} was used for a different job"
+            )
+        
+        if created:
+            get_usage_tracker().record(request.service_name, "action", len(request.items))
+        
+        return MCPResponse(
+            success=True,
+            data=job_summary(job),
+            message=f"Job {job.id} {'queued' if created else 'already submitted'} ({job.total_items} items)",
+            next_steps=[
+                f"Follow progress with stream_job(job_id={job.id})",
+                f"Read results with get_job_results(job_id={job.id})"
+            ]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mcp/tools/get_job", response_model=MCPResponse)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """Status and progress of a job"""
+    try:
+        summary = await db.run_sync(get_job_summary, job_id)
+        if not summary:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        
+        return MCPResponse(
+            success=True,
+            data=summary,
+            message=f"Job {job_id} {summary['status']}: {summary['processed_items']} of {summary['total_items']} items processed"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mcp/tools/list_jobs", response_model=MCPResponse)
+async def list_jobs(
+    service_name: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    List jobs, newest first.
+    
+    Keyset-paginated: pass the returned next_cursor to get the next page.
+    """
+    try:
+        query = select(*JOB_SUMMARY_COLUMNS)
+        if service_name:
+            query = query.where(ActionJob.service_id == service_name)
+        if status_filter:
+            query = query.where(ActionJob.status == status_filter)
+        if cursor is not None:
+            query = query.where(ActionJob.id < cursor)
+        
+        rows = (await db.execute(query.order_by(ActionJob.id.desc()).limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        jobs = [job_summary(row) for row in rows[:limit]]
+        
+        return MCPResponse(
+            success=True,
+            data={
+                "jobs": jobs,
+                "next_cursor": jobs[-1]["job_id"] if has_more else None
+            },
+            message=f"Found {len(jobs)} jobs"
+        )
+    except Exception as e:
+        logger.error(f"Error listing jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mcp/tools/get_job_results", response_model=MCPResponse)
+async def get_job_results(
+    job_id: int,
+    cursor: int = Query(0, ge=0, description="Index of the first item; next_cursor from the previous page"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Page through the results of a job in item order.
+    
+    Results are available for processed items while the job is still running.
+    """
+    try:
+        summary = await db.run_sync(get_job_summary, job_id)
+        if not summary:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        
+        results = await db.run_sync(read_job_results, job_id, cursor, limit)
+        next_index = results[-1]["index"] + 1 if results else cursor
+        has_more = bool(results) and next_index < summary["processed_items"]
+        
+        return MCPResponse(
+            success=True,
+            data={
+                "job": summary,
+                "results": results,
+                "next_cursor": next_index if has_more else None
+            },
+            message=f"Returned {len(results)} results of job {job_id}"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading job results: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mcp/tools/stream_job")
+async def stream_job(
+    job_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Stream a job's progress as server-sent events.
+    
+    Sends a "progress" event whenever the job's counters or status change
+    and a final "done" event once it has finished.
+    """
+    if not await db.run_sync(get_job_summary, job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    async def events():
+        last = None
+        while not await request.is_disconnected():
+            summary = await db.run_sync(get_job_summary, job_id)
+            # End the read transaction so the next poll sees new progress
+            await db.rollback()
+            if summary is None:
+                yield f"event: error\ndata: {json.dumps({'message': f'Job {job_id} no longer exists'})}\n\n"
+                return
+            if summary != last:
+                yield f"event: progress\ndata: {json.dumps(summary)}\n\n"
+                last = summary
+            else:
+                yield ": keep-alive\n\n"
+            if summary["status"] in FINAL_STATUSES:
+                yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+                return
+            await asyncio.sleep(JOB_STREAM_INTERVAL)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/mcp/tools/cancel_job", response_model=MCPResponse)
+async def cancel_batch_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """Cancel a queued or running job; results stored so far are kept."""
+    try:
+        if not await db.run_sync(get_job_summary, job_id):
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        if not await db.run_sync(cancel_job, job_id):
+            raise HTTPException(status_code=409, detail=f"Job {job_id} has already finished")
+        
+        return MCPResponse(
+            success=True,
+            data=await db.run_sync(get_job_summary, job_id),
+            message=f"Job {job_id} cancelled"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mcp/tools/get_connection_health", response_model=MCPResponse)
+async def get_connection_health(
+    service_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Latest connection status of configured services.
+    
+    Served from the results stored by the background health scheduler (or
+    the last manual test); no vendor is called.
+    """
+    try:
+        query = select(
+            ServiceConfiguration.id,
+            ServiceConfiguration.service_id,
+            ServiceConfiguration.config_name,
+            ServiceConfiguration.status,
+            ServiceConfiguration.last_tested_at,
+            ServiceConfiguration.last_test_result
+        )
+        if service_name:
+            query = query.where(ServiceConfiguration.service_id == service_name)
+        rows = (await db.execute(query.order_by(ServiceConfiguration.id))).all()
+        
+        services = [
+            {
+                "id": row.id,
+                "service_id": row.service_id,
+                "config_name": row.config_name,
+                "status": row.status,
+                "last_tested_at": row.last_tested_at.isoformat() if row.last_tested_at else None,
+                "message": (row.last_test_result or {}).get("message")
+            }
+            for row in rows
+        ]
+        healthy = sum(1 for service in services if service["status"] == "active")
+        
+        return MCPResponse(
+            success=True,
+            data={
+                "services": services,
+                "healthy": healthy,
+                "unhealthy": len(services) - healthy,
+                "last_round": health_scheduler.last_round if health_scheduler else None
+            },
+            message=f"{healthy} of {len(services)} configured services healthy"
+        )
+    except Exception as e:
+        logger.error(f"Error reading connection health: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/mcp/tools/get_connection_test_stats", response_model=MCPResponse)
+async def get_connection_test_stats(
+    service_name: Optional[str] = None,
+    hours: int = Query(24, ge=1, le=24 * 365),
+    db: AsyncSession = Depends(get_async_db),
+    _: bool = Depends(verify_api_key)
+):
+    """
+    Hourly connection test statistics (success rate, p50/p95 duration) per service.
+    
+    Served from the hourly rollups rather than raw test history; the
+    current hour is not included until it has been rolled up.
+    """
+    try:
+        since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours)
+        query = select(ConnectionTestRollup).where(ConnectionTestRollup.hour >= since)
+        if service_name:
+            query = query.where(ConnectionTestRollup.service_id == service_name)
+        rollups = (await db.scalars(
+            query.order_by(ConnectionTestRollup.hour, ConnectionTestRollup.service_id)
+        )).all()
+        
+        stats = [
+            {
+                "service_id": rollup.service_id,
+                "hour": rollup.hour.isoformat(),
+                "test_count": rollup.test_count,
+                "success_rate": round(rollup.success_count / rollup.test_count, 4) if rollup.test_count else None,
+                "p50_duration_ms": rollup.p50_duration_ms,
+                "p95_duration_ms": rollup.p95_duration_ms
+            }
+            for rollup in rollups
+        ]
+        
+        return MCPResponse(
+            success=True,
+            data={"stats": stats, "since": since.isoformat()},
+            message=f"Found {len(stats)} hourly rollups"
+        )
+    except Exception as e:
+        logger.error(f"Error reading connection test stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/mcp/tools/list_configured_services", response_model=MCPResponse)
 async def list_configured_services(
-    db: Session = Depends(get_db),
+    service_name: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_api_key)
 ):
-    """List all configured services"""
+    """
+    List configured services, one page at a time.
+    
+    Pages are ordered by configuration id; pass the returned next_cursor as
+    `cursor` to get the next page. Only the listed columns are read, so
+    credential blobs and test results are never loaded.
+    """
     try:
-        configs = db.query(ServiceConfiguration).all()
+        query = select(
+            ServiceConfiguration.id,
+            ServiceConfiguration.service_id,
+            ServiceConfiguration.config_name,
+            ServiceConfiguration.status,
+            ServiceConfiguration.last_tested_at,
+            ServiceConfiguration.created_at
+        )
+        if service_name:
+            query = query.where(ServiceConfiguration.service_id == service_name)
+        if status_filter:
+            query = query.where(ServiceConfiguration.status == status_filter)
+        if cursor is not None:
+            query = query.where(ServiceConfiguration.id > cursor)
         
-        services = []
-        for config in configs:
-            services.append({
-                "id": config.id,
-                "service_id": config.service_id,
-                "config_name": config.config_name,
-                "status": config.status,
-                "last_tested_at": config.last_tested_at,
-                "created_at": config.created_at.isoformat() if config.created_at else None
-            })
+        # One extra row tells whether another page exists
+        rows = (await db.execute(query.order_by(ServiceConfiguration.id).limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        services = [
+            {
+                "id": row.id,
+                "service_id": row.service_id,
+                "config_name": row.config_name,
+                "status": row.status,
+                "last_tested_at": row.last_tested_at.isoformat() if row.last_tested_at else None,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            }
+            for row in rows
+        ]
         
         return MCPResponse(
             success=True,
-            data={"services": services, "count": len(services)},
+            data={
+                "services": services,
+                "count": len(services),
+                "next_cursor": services[-1]["id"] if has_more else None
+            },
             message=f"Found {len(services)} configured services"
         )
     except Exception as e:
@@ -398,7 +1296,7 @@ async def list_configured_services(
 async def update_service_config(
     service_name: str,
     request: ServiceUpdateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_api_key)
 ):
     """Update service configuration"""
@@ -406,9 +1304,9 @@ async def update_service_config(
         credential_manager = get_credential_manager()
         
         # Get configuration
-        config = db.query(ServiceConfiguration).filter(
-            ServiceConfiguration.service_id == service_name
-        ).first()
+        config = (await db.scalars(
+            select(ServiceConfiguration).where(ServiceConfiguration.service_id == service_name).limit(1)
+        )).first()
         
         if not config:
             raise HTTPException(
@@ -418,15 +1316,16 @@ async def update_service_config(
         
         # Update credentials if provided
         if "credentials" in request.updates:
-            encrypted = credential_manager.encrypt_credentials(request.updates["credentials"])
+            encrypted = await asyncio.to_thread(credential_manager.encrypt_credentials, request.updates["credentials"])
             config.encrypted_credentials = encrypted
+            config.encryption_key_id = credential_manager.primary_key_id
+            credential_manager.credential_cache.invalidate(config.id)
         
         # Update settings if provided
         if "settings" in request.updates:
             config.settings = request.updates["settings"]
         
-        db.commit()
-        db.refresh(config)
+        await db.commit()
         
         return MCPResponse(
             success=True,
@@ -479,30 +1378,54 @@ async def get_configuration_guide(
 
 @app.get("/mcp/tools/search_marketplace", response_model=MCPResponse)
 async def search_marketplace(
+    request: Request,
     use_case: Optional[str] = None,
     integration_type: Optional[str] = None,
     category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    view: str = Query("full", pattern=VIEW_PATTERN),
     _: bool = Depends(verify_api_key)
 ):
     """Search marketplace for services"""
-    try:
-        registry = get_registry()
-        services = registry.search_marketplace(
-            use_case=use_case,
+    def build() -> MCPResponse:
+        result = get_registry().search(
+            query=use_case,
             integration_type=integration_type,
-            category=category
+            category=category,
+            limit=limit,
+            offset=offset
         )
+        services = result["services"]
+        if view == "summary":
+            services = summarize_services(services)
         
         return MCPResponse(
             success=True,
-            data={"services": services, "count": len(services)},
-            message=f"Found {len(services)} matching services"
+            data={
+                "services": services,
+                "count": len(services),
+                "total": result["total"],
+                "facets": result["facets"]
+            },
+            message=f"Found {result['total']} matching services"
         )
+    
+    try:
+        key = (
+            "search_marketplace",
+            _query_terms(use_case),
+            integration_type.lower() if integration_type else None,
+            category,
+            limit,
+            offset,
+            view
+        )
+        return cached_marketplace_response(request, key, build)
     except Exception as e:
         logger.error(f"Error searching marketplace: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
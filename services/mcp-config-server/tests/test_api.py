@@ -105,3 +105,207 @@ def test_api_endpoints_with_authentication(client, monkeypatch):
     assert response.status_code == 200
     assert response.json()["success"] is True
 
+
+
+def test_marketplace_etag_revalidation(client, monkeypatch):
+    """Test that unchanged marketplace responses revalidate with 304"""
+    monkeypatch.setenv("DISABLE_AUTH", "true")
+    monkeypatch.setenv("ENVIRONMENT", "development")
+
+    response = client.get("/mcp/marketplace", params={"search": "email"})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    revalidated = client.get("/mcp/marketplace", params={"search": "EMAIL"}, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    other = client.get("/mcp/marketplace", params={"search": "leads"}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+
+def test_marketplace_summary_view_omits_heavy_fields(client, monkeypatch):
+    """Test that the summary view drops configuration details"""
+    monkeypatch.setenv("DISABLE_AUTH", "true")
+    monkeypatch.setenv("ENVIRONMENT", "development")
+
+    full = client.get("/mcp/tools/search_marketplace").json()["data"]["services"]
+    summary = client.get("/mcp/tools/search_marketplace", params={"view": "summary"}).json()["data"]["services"]
+
+    assert [s["id"] for s in summary] == [s["id"] for s in full]
+    assert all("configuration_steps" not in s and "name" in s for s in summary)
+    assert client.get("/mcp/marketplace", params={"view": "everything"}).status_code == 422
+
+
+def test_list_configured_services_pages_without_loading_credentials(client, tmp_path):
+    """Test keyset pagination and that credential blobs are never selected"""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.database.connection import Base, get_async_db
+    from src.database.models import ServiceConfiguration
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'listing.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        for i in range(5):
+            db.add(ServiceConfiguration(
+                service_id="sendgrid" if i % 2 == 0 else "hunter_io",
+                config_name=f"config-{i}",
+                encrypted_credentials=b"secret",
+                status="active"
+            ))
+        db.commit()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'listing.db'}")
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    statements = []
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, sql, *args: statements.append(sql)
+    )
+
+    async def override_get_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_db
+    try:
+        first = client.get("/mcp/tools/list_configured_services", params={"limit": 2}).json()["data"]
+        second = client.get(
+            "/mcp/tools/list_configured_services", params={"limit": 2, "cursor": first["next_cursor"]}
+        ).json()["data"]
+        filtered = client.get(
+            "/mcp/tools/list_configured_services", params={"service_name": "sendgrid", "status": "active"}
+        ).json()["data"]
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+
+    assert [s["config_name"] for s in first["services"]] == ["config-0", "config-1"]
+    assert [s["config_name"] for s in second["services"]] == ["config-2", "config-3"]
+    assert second["next_cursor"] == second["services"][-1]["id"]
+    assert [s["config_name"] for s in filtered["services"]] == ["config-0", "config-2", "config-4"]
+    assert filtered["next_cursor"] is None
+    assert statements and not any("encrypted_credentials" in sql for sql in statements)
+
+
+def test_bulk_configure_and_transfer_between_deployments(client, tmp_path):
+    """Test all-or-nothing bulk configuration and an encrypted export/import round trip"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.database.connection import Base, get_async_db
+    from src.database.models import ServiceConfiguration
+    from src.encryption.credential_manager import get_credential_manager
+
+    def use_database(name):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        async_session_factory = async_sessionmaker(
+            create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}"), expire_on_commit=False
+        )
+
+        async def override_get_db():
+            async with async_session_factory() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_db
+        return session_factory
+
+    configurations = [
+        {"service_name": "sendgrid", "credentials": {"api_key": f"key-{i}"}, "config_name": f"client-{i}"}
+        for i in range(3)
+    ]
+    transfer_key = {"X-Transfer-Key": "correct horse battery staple"}
+    source = use_database("source.db")
+    try:
+        invalid = client.post("/mcp/tools/configure_services", json={
+            "configurations": configurations + [{"service_name": "mailgun", "credentials": {"api_key": "k"}}],
+            "test_connections": False
+        })
+        created = client.post("/mcp/tools/configure_services", json={
+            "configurations": configurations, "test_connections": False
+        })
+        export = client.get("/mcp/tools/export_configurations", headers=transfer_key)
+
+        target = use_database("target.db")
+        wrong_key = client.post(
+            "/mcp/tools/import_configurations", params={"test_connections": False},
+            content=export.content, headers={"X-Transfer-Key": "not the passphrase used"}
+        )
+        imported = client.post(
+            "/mcp/tools/import_configurations", params={"test_connections": False},
+            content=export.content, headers=transfer_key
+        )
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"]["errors"] == [
+        {"index": 3, "service_name": "mailgun", "error": "Missing required credentials: domain"}
+    ]
+    assert created.status_code == 200
+    assert len(created.json()["data"]["configuration_ids"]) == 3
+
+    lines = export.text.splitlines()
+    assert len(lines) == 4 and "key-0" not in export.text
+    assert wrong_key.status_code == 400 and "Line 2" in wrong_key.json()["detail"]
+    assert imported.json()["data"]["imported"] == 3
+
+    manager = get_credential_manager()
+    with target() as db:
+        configs = db.query(ServiceConfiguration).order_by(ServiceConfiguration.id).all()
+        assert [c.config_name for c in configs] == ["client-0", "client-1", "client-2"]
+        assert all(c.status == "pending" for c in configs)
+        assert manager.decrypt_credentials(configs[2].encrypted_credentials) == {"api_key": "key-2"}
+    with source() as db:
+        assert db.query(ServiceConfiguration).count() == 3
+
+
+def test_configuration_of_another_service_is_rejected(client, tmp_path):
+    """Test that a config_id cannot send one service's credentials to another connector"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.database.connection import Base, get_async_db
+    from src.database.models import ServiceConfiguration
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'mismatch.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        config = ServiceConfiguration(
+            service_id="hunter_io", config_name="hunter", encrypted_credentials=b"secret", status="active"
+        )
+        db.add(config)
+        db.commit()
+        config_id = config.id
+
+    async_session_factory = async_sessionmaker(
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'mismatch.db'}"), expire_on_commit=False
+    )
+
+    async def override_get_db():
+        async with async_session_factory() as db:
+            yield db
+
+    body = {
+        "service_name": "apollo_io",
+        "action": "enrich_contacts",
+        "items": [{"email": "a@example.com"}],
+        "config_id": config_id
+    }
+    app.dependency_overrides[get_async_db] = override_get_db
+    try:
+        batch = client.post("/mcp/tools/execute_batch", json=body)
+        job = client.post("/mcp/tools/submit_batch_job", json=body)
+        test = client.post(
+            "/mcp/tools/test_service_connection", params={"service_name": "apollo_io", "config_id": config_id}
+        )
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+
+    for response in (batch, job, test):
+        assert response.status_code == 400
+        assert "belongs to 'hunter_io'" in response.json()["detail"]
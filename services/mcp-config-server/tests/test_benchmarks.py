@@ -0,0 +1,52 @@
+"""
+Tests for the load test suite
+"""
+
+import asyncio
+import pytest
+from benchmarks import load
+from src.database.connection import get_async_db
+from src.server import app, verify_api_key
+
+
+def test_load_test_runs_every_scenario(tmp_path):
+    """Test a short run of all scenarios against SQLite and the stub vendor"""
+    try:
+        config_ids = load.use_database(f"sqlite:///{tmp_path / 'bench.db'}", seed_rows=60)
+        results = asyncio.run(load.run_load_test(
+            list(load.SCENARIOS), concurrency=2, duration=0.2, warmup=0, vendor_latency=0, config_ids=config_ids
+        ))
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.pop(verify_api_key, None)
+
+    assert list(results) == list(load.SCENARIOS)
+    for result in results.values():
+        assert result["requests"] > 0 and result["errors"] == 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert load.compare_to_baseline(results, results, threshold=0.2) == []
+
+
+def test_load_test_refuses_database_with_configurations(tmp_path):
+    """Test that existing configurations are only deleted with reset"""
+    url = f"sqlite:///{tmp_path / 'existing.db'}"
+    try:
+        load.use_database(url, seed_rows=3)
+        with pytest.raises(ValueError, match="holds 3 configurations"):
+            load.use_database(url, seed_rows=3)
+        assert len(load.use_database(url, seed_rows=2, reset=True)) == 2
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.pop(verify_api_key, None)
+
+
+def test_compare_to_baseline_flags_regressions_beyond_threshold():
+    """Test that only changes in the wrong direction beyond the threshold fail"""
+    baseline = {"list": {"errors": 0, "rps": 100.0, "p95_ms": 10.0, "p99_ms": 20.0}}
+    faster = {"list": {"errors": 0, "rps": 150.0, "p95_ms": 5.0, "p99_ms": 10.0}}
+    slower = {"list": {"errors": 0, "rps": 85.0, "p95_ms": 13.0, "p99_ms": 21.0}}
+    failing = {"search": {"errors": 3, "rps": 1.0, "p95_ms": 1.0, "p99_ms": 1.0}}
+
+    assert load.compare_to_baseline(faster, baseline, threshold=0.2) == []
+    assert load.compare_to_baseline(slower, baseline, threshold=0.2) == ["list: p95_ms 10.0 -> 13.0 (+30%)"]
+    assert load.compare_to_baseline(failing, baseline, threshold=0.2) == ["search: 3 failed requests"]
@@ -2,8 +2,13 @@
 Tests for service connectors
 """
 
+import asyncio
+import base64
+import json
+import httpx
 import pytest
-from src.connectors.base_connector import BaseConnector
+from src.connectors import http_pool
+from src.connectors.base_connector import AsyncBaseConnector, BaseConnector, run_test_connection
 from src.connectors.sendgrid_connector import SendGridConnector
 
 
@@ -55,3 +60,466 @@ def test_get_service_info():
     assert info["service_name"] == "SendGrid"
     assert "capabilities" in info
 
+
+
+def test_plugin_loader_imports_connectors_on_demand():
+    """Test that connector classes are only imported when first requested"""
+    from src.plugin_loader import PluginLoader
+    from src.connectors.linkedin_connector import LinkedInConnector
+
+    loader = PluginLoader()
+    assert {"sendgrid", "linkedin", "zoominfo"}.issubset(loader.list_available_connectors())
+    assert loader.list_imported_connectors() == []
+
+    assert loader.get_connector_class("linkedin") is LinkedInConnector
+    assert loader.list_imported_connectors() == ["linkedin"]
+    assert loader.get_connector_class("nonexistent") is None
+
+
+def test_plugin_loader_rebuilds_connectors_after_registry_reload():
+    """Test that connectors created before a registry reload are replaced with fresh ones"""
+    from src.plugin_loader import PluginLoader
+    from src.registry.service_registry import get_registry
+
+    loader = PluginLoader()
+    connector = loader.get_connector("sendgrid")
+    assert loader.get_connector("sendgrid") is connector
+
+    get_registry().reload()
+
+    assert loader.get_connector("sendgrid") is not connector
+    assert loader._registry_version == get_registry().version
+
+
+def test_async_connector_uses_pooled_client():
+    """Test that async connectors reuse the vendor's pooled client"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"username": "test"})
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        http_pool._clients["sendgrid"] = (loop, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        connector = SendGridConnector("sendgrid", "SendGrid")
+        assert connector.http is http_pool.get_http_client("sendgrid")
+
+        results = await asyncio.gather(*(
+            run_test_connection(connector, {"api_key": "test_key"}) for _ in range(3)
+        ))
+        await http_pool.close_http_clients()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert len(requests) == 3
+    assert requests[0].headers["Authorization"] == "Bearer test_key"
+    assert "sendgrid" not in http_pool._clients
+
+
+def test_run_test_connection_supports_sync_connectors():
+    """Test that synchronous connectors still work through the async helper"""
+    class SyncConnector(BaseConnector):
+        def test_connection(self, credentials):
+            return {"status": "success", "message": "ok"}
+
+        def get_capabilities(self):
+            return []
+
+        def execute_action(self, action, params, credentials):
+            return {}
+
+    result = asyncio.run(run_test_connection(SyncConnector("sync", "Sync"), {}))
+    assert result["status"] == "success"
+
+
+def run_batch(connector, action, items, handler):
+    """Run execute_batch against a mock vendor API"""
+    async def run():
+        loop = asyncio.get_running_loop()
+        http_pool._clients[connector.service_id] = (loop, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        try:
+            return [item async for item in connector.execute_batch(action, items, {"api_key": "test_key"})]
+        finally:
+            await http_pool.close_http_clients()
+
+    return asyncio.run(run())
+
+
+def test_execute_batch_retries_rate_limited_requests():
+    """Test that batch items are all returned and 429s are retried"""
+    from src.connectors.hunter_io_connector import HunterIOConnector
+
+    calls = {}
+
+    def handler(request):
+        email = request.url.params["email"]
+        calls[email] = calls.get(email, 0) + 1
+        if email == "b@example.com" and calls[email] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"data": {"email": email, "status": "valid"}})
+
+    connector = HunterIOConnector("hunter_io_batch_test", "Hunter.io")
+    connector.retry_backoff_seconds = 0
+    items = [{"email": f"{c}@example.com"} for c in "abcde"]
+
+    results = run_batch(connector, "verify_email", items, handler)
+
+    assert sorted(r["index"] for r in results) == [0, 1, 2, 3, 4]
+    assert all(r["result"]["status"] == "success" for r in results)
+    assert results[[r["index"] for r in results].index(1)]["result"]["data"]["data"]["email"] == "b@example.com"
+    assert calls["b@example.com"] == 2
+
+
+def test_instrumented_transport_records_vendor_metrics():
+    """Test per-endpoint request counts, latency, bytes and retries in the /metrics output"""
+    from src.connectors.hunter_io_connector import HunterIOConnector
+    from src.connectors.metrics import ConnectorMetrics, InstrumentedTransport, endpoint_label, get_connector_metrics
+
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"data": {"status": "valid"}})
+
+    metrics = ConnectorMetrics()
+    connector = HunterIOConnector("hunter_io_metrics_test", "Hunter.io")
+    connector.retry_backoff_seconds = 0
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        transport = InstrumentedTransport(connector.service_id, httpx.MockTransport(handler), metrics)
+        http_pool._clients[connector.service_id] = (loop, httpx.AsyncClient(transport=transport))
+        try:
+            return await connector.execute_action("verify_email", {"email": "a@example.com"}, {"api_key": "k"})
+        finally:
+            await http_pool.close_http_clients()
+
+    assert asyncio.run(run())["status"] == "success"
+
+    output = metrics.render()
+    labels = 'service="hunter_io_metrics_test",endpoint="verify_email"'
+    assert f'mcp_connector_requests_total{{{labels},method="GET",status="503"}} 1' in output
+    assert f'mcp_connector_requests_total{{{labels},method="GET",status="200"}} 1' in output
+    assert f"mcp_connector_request_duration_seconds_count{{{labels}}} 2" in output
+    body = httpx.Response(200, json={"data": {"status": "valid"}}).content
+    assert f"mcp_connector_response_bytes_total{{{labels}}} {len(body)}" in output
+    assert f'mcp_connector_retries_total{{{labels},reason="503"}} 1' in get_connector_metrics().render()
+
+    # Without an endpoint name, identifiers in the path are collapsed
+    assert endpoint_label(httpx.URL("https://api.mailgun.net/v3/mg.example.com/events")) == "api.mailgun.net/v3/{id}/events"
+
+
+def test_execute_batch_uses_bulk_endpoint_chunks():
+    """Test that actions with a bulk endpoint send one request per chunk"""
+    from src.connectors.apollo_io_connector import ApolloIOConnector
+
+    chunk_sizes = []
+
+    def handler(request):
+        details = json.loads(request.content)["details"]
+        chunk_sizes.append(len(details))
+        return httpx.Response(200, json={"matches": [{"email": d["email"]} for d in details]})
+
+    connector = ApolloIOConnector("apollo_io_batch_test", "Apollo.io")
+    items = [{"email": f"person{i}@example.com"} for i in range(25)]
+
+    results = run_batch(connector, "enrich_contacts", items, handler)
+
+    assert sorted(chunk_sizes) == [5, 10, 10]
+    assert len(results) == 25
+    by_index = {r["index"]: r["result"] for r in results}
+    assert by_index[17]["data"]["email"] == "person17@example.com"
+
+
+def test_enrichment_cache_deduplicates_lookups(monkeypatch):
+    """Test that repeated and equivalent lookups reach the vendor once"""
+    from src.connectors import base_connector
+    from src.connectors.clearbit_connector import ClearbitConnector
+    from src.connectors.enrichment_cache import EnrichmentCache
+
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:1/0")
+    cache = EnrichmentCache()
+    monkeypatch.setattr(base_connector, "get_enrichment_cache", lambda: cache)
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.params["domain"])
+        return httpx.Response(200, json={"domain": request.url.params["domain"]})
+
+    connector = ClearbitConnector("clearbit_cache_test", "Clearbit")
+    items = [{"domain": "example.com"}, {"domain": "https://www.Example.com/"}, {"domain": "acme.io"}]
+
+    first = run_batch(connector, "enrich_company", items, handler)
+    assert sorted(calls) == ["acme.io", "example.com"]
+    assert len(first) == 3 and all(r["result"]["status"] == "success" for r in first)
+
+    second = run_batch(connector, "enrich_company", items, handler)
+    assert len(calls) == 2
+    assert all(r["cached"] for r in second)
+
+    # Results handed out from the in-process cache are copies
+    second[0]["result"]["data"]["domain"] = "changed.example"
+    third = run_batch(connector, "enrich_company", items[:1], handler)
+    assert third[0]["result"]["data"]["domain"] == "example.com"
+
+
+def test_health_scheduler_tests_configurations_with_vendor_limit(monkeypatch, tmp_path):
+    """Test that a health round tests active, failed and pending configurations and stores results in bulk"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src import health_scheduler as module
+    from src.database.connection import Base
+    from src.database.models import ServiceConfiguration, ConnectionTest
+    from src.encryption.credential_manager import get_credential_manager
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'health.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    manager = get_credential_manager()
+    with session_factory() as db:
+        for i, status in enumerate(["active", "active", "active", "failed", "pending", "disabled"]):
+            db.add(ServiceConfiguration(
+                service_id="sendgrid",
+                config_name=f"config-{i}",
+                encrypted_credentials=manager.encrypt_credentials({"api_key": "bad" if i == 0 else "good"}),
+                status=status
+            ))
+        db.commit()
+
+    running = {"now": 0, "max": 0}
+
+    class FakeConnector(AsyncBaseConnector):
+        async def test_connection(self, credentials):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            if credentials["api_key"] == "bad":
+                return {"status": "failed", "message": "Invalid API key", "error": "401"}
+            return {"status": "success", "message": "ok"}
+
+        def get_capabilities(self):
+            return []
+
+        async def execute_action(self, action, params, credentials):
+            return {}
+
+    class FakeLoader:
+        def get_connector(self, service_id):
+            return FakeConnector(service_id, "Fake")
+
+    monkeypatch.setattr(module, "get_plugin_loader", lambda: FakeLoader())
+    scheduler = module.HealthScheduler(
+        interval=60, jitter=0, vendor_concurrency=2, session_factory=session_factory
+    )
+
+    assert asyncio.run(scheduler.run_once()) == 5
+    assert running["max"] == 2
+    assert scheduler.last_round["succeeded"] == 4 and scheduler.last_round["failed"] == 1
+
+    with session_factory() as db:
+        configs = db.query(ServiceConfiguration).order_by(ServiceConfiguration.id).all()
+        assert [c.status for c in configs] == ["failed", "active", "active", "active", "active", "disabled"]
+        assert configs[0].last_test_result["message"] == "Invalid API key"
+        assert configs[5].last_tested_at is None
+        assert db.query(ConnectionTest).count() == 5
+
+    # Another replica's round within the interval finds nothing due
+    other_replica = module.HealthScheduler(interval=60, jitter=0, session_factory=session_factory)
+    assert asyncio.run(other_replica.run_once()) == 0
+
+    # Results of configurations deleted mid-round are dropped, the rest kept
+    with session_factory() as db:
+        db.query(ServiceConfiguration).filter(ServiceConfiguration.id == configs[1].id).delete()
+        db.commit()
+    scheduler._store_results([
+        (configs[1].id, {"status": "success"}, 5),
+        (configs[2].id, {"status": "failed", "error": "401"}, 5)
+    ])
+    with session_factory() as db:
+        assert db.get(ServiceConfiguration, configs[2].id).status == "failed"
+        assert db.query(ConnectionTest).count() == 6
+
+
+def test_compile_template_keeps_types_of_whole_placeholders():
+    """Test that templates render strings and pass single placeholders through"""
+    from src.connectors.declarative import compile_template
+
+    render, fields = compile_template({"q": "{domain}", "limit": "{limit}", "path": "/v3/{domain}/events", "n": 1})
+
+    assert fields == {"domain", "limit"}
+    assert render({"domain": "example.com", "limit": 5}) == {
+        "q": "example.com", "limit": 5, "path": "/v3/example.com/events", "n": 1
+    }
+
+
+def test_declarative_connector_runs_test_endpoint_from_definition():
+    """Test that the YAML test endpoint is called with templated URL and basic auth"""
+    from src.connectors.declarative import DeclarativeConnector
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"domain": {"name": "mg.example.com"}})
+
+    class MailgunDefinitionConnector(DeclarativeConnector):
+        definition_id = "mailgun"
+
+    async def run():
+        connector = MailgunDefinitionConnector("mailgun_declarative_test", "Mailgun")
+        loop = asyncio.get_running_loop()
+        http_pool._clients[connector.service_id] = (loop, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        try:
+            missing = await connector.test_connection({"api_key": "key-123"})
+            result = await connector.test_connection({"api_key": "key-123", "domain": "mg.example.com"})
+            # Caller params cannot redirect the stored credentials to another domain
+            url, _ = connector.build_request(
+                connector.compiled.test_endpoint,
+                {"api_key": "key-123", "domain": "mg.example.com"},
+                {"domain": "attacker.example"}
+            )
+            return missing, result, url
+        finally:
+            await http_pool.close_http_clients()
+
+    missing, result, url = asyncio.run(run())
+
+    assert missing["status"] == "failed" and "domain" in missing["message"]
+    assert result["status"] == "success"
+    assert str(requests[0].url) == "https://api.mailgun.net/v3/mg.example.com"
+    assert requests[0].headers["Authorization"] == "Basic " + base64.b64encode(b"api:key-123").decode()
+    assert url == "https://api.mailgun.net/v3/mg.example.com"
+
+
+def test_worker_pool_runs_calls_out_of_process_and_recycles_workers():
+    """Test that isolated calls return results, enforce deadlines and recycle workers"""
+    from src.connectors.isolation import ConnectorWorkerPool, TEST_CONNECTION
+
+    async def run():
+        pool = ConnectorWorkerPool(size=1, timeout=30, memory_limit_mb=0, max_calls=1)
+        try:
+            await pool.start()
+            first_pid = pool._workers[0].process.pid
+            result = await pool.call(TEST_CONNECTION, "hunter_io", None, None, {})
+            # max_calls=1: the worker was replaced after its call
+            second_pid = pool._workers[0].process.pid
+
+            with pytest.raises(TimeoutError):
+                await pool.call(TEST_CONNECTION, "hunter_io", None, None, {}, timeout=0.001)
+            third_pid = pool._workers[0].process.pid
+            return result, {first_pid, second_pid, third_pid}
+        finally:
+            await pool.shutdown()
+
+    result, pids = asyncio.run(run())
+
+    assert result["status"] == "failed"
+    assert "api_key" in result["message"]
+    assert len(pids) == 3
+
+
+def test_worker_pool_replaces_dead_workers_before_dispatch():
+    """Test that a worker that died while idle is replaced instead of receiving the call"""
+    from src.connectors.isolation import ConnectorWorkerPool, TEST_CONNECTION
+
+    async def run():
+        pool = ConnectorWorkerPool(size=1, timeout=30, memory_limit_mb=0, max_calls=10)
+        try:
+            await pool.start()
+            dead = pool._workers[0].process
+            dead.kill()
+            dead.join()
+            result = await pool.call(TEST_CONNECTION, "hunter_io", None, None, {})
+            return result, dead.pid, pool._workers[0].process.pid
+        finally:
+            await pool.shutdown()
+
+    result, dead_pid, pid = asyncio.run(run())
+
+    assert result["status"] == "failed" and "api_key" in result["message"]
+    assert pid != dead_pid
+
+
+def test_rate_limit_penalties_are_forwarded_between_processes():
+    """Test that penalties drained in a worker pause the API process's bucket"""
+    from src.connectors import rate_limit
+
+    worker_bucket = rate_limit.get_rate_limiter("penalty_test", rate=10, burst=10)
+    worker_bucket.penalize(2.0)
+    penalties = rate_limit.drain_penalties()
+    assert 1.5 < penalties["penalty_test"] <= 2.0
+    assert "penalty_test" not in rate_limit.drain_penalties()
+
+    # In the API process the same service's bucket is a different object
+    rate_limit._buckets["penalty_test"] = parent_bucket = rate_limit.TokenBucket(rate=10, burst=10)
+    try:
+        rate_limit.apply_penalties(penalties)
+        assert parent_bucket._tokens <= -15
+    finally:
+        rate_limit._buckets.pop("penalty_test", None)
+
+
+def test_retry_after_is_capped():
+    """Test that a vendor's Retry-After cannot exceed the configured maximum"""
+    from src.connectors.hunter_io_connector import HunterIOConnector
+
+    connector = HunterIOConnector("hunter_io_retry_after_test", "Hunter.io")
+    connector.max_retry_after_seconds = 30
+
+    assert connector._retry_delay(0, httpx.Response(429, headers={"Retry-After": "5"})) == 5
+    assert connector._retry_delay(0, httpx.Response(429, headers={"Retry-After": "86400"})) == 30
+
+
+def test_isolated_bulk_calls_draw_one_api_token_per_vendor_request(monkeypatch):
+    """Test that the API process rate limits each vendor request of a dispatched chunk"""
+    from src.connectors import rate_limit
+    from src.connectors.hunter_io_connector import HunterIOConnector
+    from src.connectors.isolation import IsolatedConnector
+
+    class FakePool:
+        async def call(self, kind, service_id, action, payload, credentials, timeout=None):
+            return [{"status": "success"} for _ in payload]
+
+    class CountingBucket(rate_limit.TokenBucket):
+        acquired = 0
+
+        async def acquire(self):
+            CountingBucket.acquired += 1
+
+    connector = IsolatedConnector(HunterIOConnector("hunter_io_isolated_test", "Hunter.io"), FakePool())
+    connector.bulk_chunk_sizes = {"enrich_contacts": 10}
+    monkeypatch.setitem(rate_limit._buckets, connector.service_id, CountingBucket(1, 1))
+
+    asyncio.run(connector.execute_bulk("verify_email", [{"email": "a"}, {"email": "b"}, {"email": "c"}], {}))
+    assert CountingBucket.acquired == 3
+    asyncio.run(connector.execute_bulk("enrich_contacts", [{"email": "a"}, {"email": "b"}], {}))
+    assert CountingBucket.acquired == 4
+
+
+def test_disabled_rate_limits_never_wait_but_record_penalties(monkeypatch):
+    """Test the buckets of worker processes"""
+    import time
+    from src.connectors import rate_limit
+
+    monkeypatch.setattr(rate_limit, "_buckets", {})
+    monkeypatch.setattr(rate_limit, "_enforced", True)
+    rate_limit.disable_rate_limits()
+    bucket = rate_limit.get_rate_limiter("worker_test", rate=1, burst=1)
+
+    async def burst():
+        started = time.monotonic()
+        for _ in range(50):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(burst()) < 0.5
+    bucket.penalize(3)
+    assert 2.5 < rate_limit.drain_penalties()["worker_test"] <= 3
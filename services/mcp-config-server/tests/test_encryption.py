@@ -3,7 +3,6 @@ Tests for credential encryption/decryption
 """
 
 import pytest
-import os
 from src.encryption.credential_manager import CredentialManager
 
 
@@ -90,17 +89,29 @@ def test_development_allows_key_generation(monkeypatch):
 def test_encryption_key_not_logged(monkeypatch, caplog):
     """Test that encryption keys are never logged"""
     import logging
-    logging.basicConfig(level=logging.DEBUG)
-    
+    from cryptography.fernet import Fernet
+    from src.encryption import credential_manager
+
     monkeypatch.setenv("ENVIRONMENT", "development")
     monkeypatch.delenv("ENCRYPTION_KEY", raising=False)
-    
-    manager = CredentialManager()
-    
-    # Check logs - should not contain the actual key
-    log_messages = caplog.text
-    # The key should not appear in logs (it's generated but not logged)
-    # This is a security check
+    generated = []
+
+    class RecordingFernet(Fernet):
+        @classmethod
+        def generate_key(cls):
+            generated.append(Fernet.generate_key())
+            return generated[-1]
+
+    monkeypatch.setattr(credential_manager, "Fernet", RecordingFernet)
+    caplog.set_level(logging.DEBUG)
+
+    CredentialManager()
+
+    # The key was generated and the warning logged, but the key itself was not
+    assert generated
+    assert "Generating new key" in caplog.text
+    for key in generated:
+        assert key.decode() not in caplog.text
 
 
 def test_environment_specific_salt(monkeypatch):
@@ -123,3 +134,168 @@ def test_salt_fallback_to_default(monkeypatch):
     # Should work with default salt in development
     assert manager is not None
 
+
+
+def test_derived_key_is_cached_per_process(monkeypatch):
+    """Test that PBKDF2 runs once for the same key and salt"""
+    from src.encryption import credential_manager as module
+
+    monkeypatch.setenv("ENCRYPTION_KEY", "cached-derivation-key")
+    monkeypatch.setenv("ENCRYPTION_SALT", "cached-derivation-salt")
+    module._pbkdf2_fernet_key.cache_clear()
+
+    first = CredentialManager()
+    second = CredentialManager()
+
+    assert first.key == second.key
+    assert module._pbkdf2_fernet_key.cache_info().misses == 1
+    assert second.decrypt_credentials(first.encrypt_credentials({"api_key": "k"})) == {"api_key": "k"}
+
+
+def test_configuration_credentials_are_cached(monkeypatch):
+    """Test that stored credentials are decrypted once per ciphertext"""
+    manager = CredentialManager()
+    encrypted = manager.encrypt_credentials({"api_key": "test_key_123"})
+
+    decrypt_calls = []
+    original_decrypt = manager.cipher.decrypt
+    monkeypatch.setattr(manager.cipher, "decrypt", lambda data: decrypt_calls.append(1) or original_decrypt(data))
+
+    first = manager.decrypt_configuration_credentials(1, encrypted)
+    first["api_key"] = "mutated"
+    second = manager.decrypt_configuration_credentials(1, encrypted)
+
+    assert second == {"api_key": "test_key_123"}
+    assert len(decrypt_calls) == 1
+
+    # New ciphertext for the same configuration is decrypted again
+    manager.decrypt_configuration_credentials(1, manager.encrypt_credentials({"api_key": "rotated"}))
+    assert len(decrypt_calls) == 2
+
+
+def test_credential_cache_wipes_evicted_entries():
+    """Test that evicted and expired plaintext is overwritten"""
+    from src.encryption.credential_cache import CredentialCache
+
+    cache = CredentialCache(ttl_seconds=300, max_entries=1)
+    first_key = CredentialCache.make_key(1, b"ciphertext-1")
+    cache.set(first_key, b'{"api_key": "secret"}')
+    buffer = cache._entries[first_key][1]
+
+    cache.set(CredentialCache.make_key(2, b"ciphertext-2"), b'{"api_key": "other"}')
+
+    assert cache.get(first_key) is None
+    assert set(buffer) == {0}
+
+
+def test_credential_cache_sweeps_expired_entries_that_are_never_read():
+    """Test that expired plaintext is wiped without another read of its key"""
+    import time
+    from src.encryption.credential_cache import CredentialCache
+
+    cache = CredentialCache(ttl_seconds=0.05, max_entries=10)
+    key = CredentialCache.make_key(1, b"ciphertext-1")
+    cache.set(key, b'{"api_key": "secret"}')
+    buffer = cache._entries[key][1]
+
+    deadline = time.monotonic() + 2
+    while cache._entries and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not cache._entries
+    assert set(buffer) == {0}
+
+
+@pytest.fixture
+def rotated_keys(monkeypatch):
+    """Old and new master key managers, as before and after a rotation"""
+    from cryptography.fernet import Fernet
+
+    old_key, new_key = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+    monkeypatch.setenv("ENCRYPTION_KEY_ID", "v1")
+    monkeypatch.delenv("ENCRYPTION_PREVIOUS_KEYS", raising=False)
+    old_manager = CredentialManager(old_key)
+
+    monkeypatch.setenv("ENCRYPTION_KEY_ID", "v2")
+    monkeypatch.setenv("ENCRYPTION_PREVIOUS_KEYS", f"v1:{old_key}")
+    new_manager = CredentialManager(new_key)
+    return old_manager, new_manager
+
+
+def test_rotated_manager_reads_old_and_legacy_values(rotated_keys):
+    """Test that values under retired master keys remain readable"""
+    old_manager, new_manager = rotated_keys
+    credentials = {"api_key": "test_key_123"}
+
+    envelope = old_manager.encrypt_credentials(credentials)
+    legacy_token = old_manager.cipher.encrypt(b'{"api_key": "test_key_123"}')
+
+    assert old_manager.get_key_id(envelope) == "v1"
+    assert new_manager.decrypt_credentials(envelope) == credentials
+    assert new_manager.decrypt_credentials(legacy_token) == credentials
+    assert new_manager.get_key_id(new_manager.encrypt_credentials(credentials)) == "v2"
+
+
+def test_rewrap_keeps_payload_and_switches_master_key(rotated_keys):
+    """Test that rotation re-wraps only the data key"""
+    old_manager, new_manager = rotated_keys
+    envelope = old_manager.encrypt_credentials({"api_key": "test_key_123"})
+
+    rewrapped = new_manager.rewrap(envelope)
+
+    assert new_manager.get_key_id(rewrapped) == "v2"
+    assert rewrapped.rsplit(b":", 1)[1] == envelope.rsplit(b":", 1)[1]
+    assert new_manager.decrypt_credentials(rewrapped) == {"api_key": "test_key_123"}
+    assert new_manager.rewrap(rewrapped) == rewrapped
+
+
+def test_reencryption_job_migrates_rows_in_batches(rotated_keys, tmp_path):
+    """Test that the background job moves every row to the new master key"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.database.connection import Base
+    from src.database.models import ServiceConfiguration
+    from src.encryption.reencryption import reencrypt_credentials
+
+    old_manager, new_manager = rotated_keys
+    engine = create_engine(f"sqlite:///{tmp_path / 'reencryption.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    with session_factory() as db:
+        for i in range(5):
+            db.add(ServiceConfiguration(
+                service_id="sendgrid",
+                config_name=f"config-{i}",
+                encrypted_credentials=old_manager.encrypt_credentials({"api_key": f"key-{i}"}),
+                encryption_key_id="v1"
+            ))
+        db.commit()
+
+    counts = reencrypt_credentials(session_factory, new_manager, batch_size=2, pause_seconds=0)
+
+    assert counts == {"reencrypted": 5, "skipped": 0, "failed": 0}
+    with session_factory() as db:
+        configs = db.query(ServiceConfiguration).order_by(ServiceConfiguration.id).all()
+        assert {c.encryption_key_id for c in configs} == {"v2"}
+        assert new_manager.decrypt_credentials(configs[3].encrypted_credentials) == {"api_key": "key-3"}
+
+    # Nothing left to do on a second run
+    assert reencrypt_credentials(session_factory, new_manager, pause_seconds=0)["reencrypted"] == 0
+
+
+def test_transfer_header_errors_are_value_errors():
+    """Test that malformed export headers are rejected as invalid input"""
+    from src.encryption.transfer import TransferCipher
+
+    passphrase = "a-long-transfer-passphrase"
+    header = TransferCipher(passphrase).header()
+    assert TransferCipher.from_header(passphrase, header).header()["salt"] == header["salt"]
+
+    for bad in (["not", "a", "header"], {**header, "salt": None}, {**header, "salt": "***"}):
+        with pytest.raises(ValueError):
+            TransferCipher.from_header(passphrase, bad)
+    without_salt = dict(header)
+    del without_salt["salt"]
+    with pytest.raises(ValueError):
+        TransferCipher.from_header(passphrase, without_salt)
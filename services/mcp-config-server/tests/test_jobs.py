@@ -0,0 +1,112 @@
+"""
+Tests for the persistent action job queue
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src import jobs as module
+from src.connectors.base_connector import AsyncBaseConnector
+from src.database.connection import Base
+from src.database.models import ActionJob, ActionJobResult, ServiceConfiguration
+from src.encryption.credential_manager import get_credential_manager
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Create a SQLite database with one configuration"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(ServiceConfiguration(
+            service_id="hunter_io",
+            config_name="default",
+            encrypted_credentials=get_credential_manager().encrypt_credentials({"api_key": "key"})
+        ))
+        db.commit()
+    return factory
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Route connector calls to a fake connector; returns the emails it was called with"""
+    seen = []
+
+    class FakeConnector(AsyncBaseConnector):
+        async def test_connection(self, credentials):
+            return {"status": "success"}
+
+        def get_capabilities(self):
+            return []
+
+        async def execute_action(self, action, params, credentials):
+            seen.append(params["email"])
+            status = "failed" if params["email"].startswith("bad") else "success"
+            return {"status": status, "data": {"email": params["email"], "key": credentials["api_key"]}}
+
+    class FakeLoader:
+        def get_connector(self, service_id):
+            return FakeConnector(service_id, "Fake")
+
+    monkeypatch.setattr(module, "get_plugin_loader", lambda: FakeLoader())
+    return seen
+
+
+def submit(session_factory, emails, key=None):
+    with session_factory() as db:
+        config = db.query(ServiceConfiguration).one()
+        job, created = module.submit_job(db, config, "verify_email", [{"email": e} for e in emails], key)
+        return job.id, created
+
+
+def test_job_runs_in_chunks_and_stores_results_in_order(session_factory, calls):
+    """Test idempotent submission, chunked execution and paginated results"""
+    emails = ["a@x.com", "bad@x.com", "c@x.com", "d@x.com", "e@x.com"]
+    job_id, created = submit(session_factory, emails, key="import-1")
+    assert created
+    assert submit(session_factory, emails, key="import-1") == (job_id, False)
+
+    worker = module.JobWorker(chunk_size=2, session_factory=session_factory, worker_id="w1")
+    assert worker.claim_next() == job_id
+    assert worker.claim_next() is None
+    asyncio.run(worker.run_job(job_id))
+
+    with session_factory() as db:
+        summary = module.get_job_summary(db, job_id)
+        assert summary["status"] == "succeeded"
+        assert (summary["processed_items"], summary["succeeded_items"], summary["failed_items"]) == (5, 4, 1)
+        assert db.query(ActionJobResult).filter(ActionJobResult.job_id == job_id).count() == 3
+
+        page = module.read_job_results(db, job_id, offset=1, limit=3)
+        assert [item["index"] for item in page] == [1, 2, 3]
+        assert [item["result"]["data"]["email"] for item in page] == emails[1:4]
+        assert page[0]["result"]["status"] == "failed"
+        assert page[1]["result"]["data"]["key"] == "key"
+    assert sorted(calls) == sorted(emails)
+
+
+def test_stale_job_resumes_after_last_stored_chunk(session_factory, calls):
+    """Test that a job abandoned by its worker is requeued and not rerun from the start"""
+    job_id, _ = submit(session_factory, ["a@x.com", "b@x.com", "c@x.com"])
+
+    crashed = module.JobWorker(chunk_size=2, session_factory=session_factory, worker_id="crashed")
+    assert crashed.claim_next() == job_id
+    assert crashed._store_chunk(job_id, 0, 0, [{"status": "success"}, {"status": "success"}])
+    with session_factory() as db:
+        db.query(ActionJob).update({"heartbeat_at": datetime.utcnow() - timedelta(minutes=10)})
+        db.commit()
+
+    worker = module.JobWorker(chunk_size=2, stale_after=300, session_factory=session_factory, worker_id="w2")
+    assert worker.claim_next() == job_id
+    asyncio.run(worker.run_job(job_id))
+
+    assert calls == ["c@x.com"]
+    # The crashed worker no longer owns the job
+    assert not crashed._store_chunk(job_id, 1, 2, [{"status": "success"}])
+    with session_factory() as db:
+        summary = module.get_job_summary(db, job_id)
+        assert summary["status"] == "succeeded" and summary["processed_items"] == 3
+        assert module.cancel_job(db, job_id) is False
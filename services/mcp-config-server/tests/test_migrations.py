@@ -0,0 +1,64 @@
+"""
+Tests for schema migrations and startup version check
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from src.database.connection import Base
+from src.database import models  # noqa: F401
+from src.database.migrations import (
+    get_head_revision,
+    get_current_revision,
+    check_schema_version,
+    run_migrations
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Empty SQLite database"""
+    return create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+
+
+def test_unmigrated_database_fails_version_check(engine):
+    """Test that startup check rejects a database without migrations"""
+    assert get_current_revision(engine) is None
+
+    with pytest.raises(RuntimeError) as exc_info:
+        check_schema_version(engine)
+
+    assert "migration" in str(exc_info.value).lower()
+
+
+def test_upgrade_creates_model_tables(engine):
+    """Test that migrations create every table the models define"""
+    revision = run_migrations(engine)
+
+    assert revision == get_head_revision()
+    check_schema_version(engine)
+
+    tables = set(inspect(engine).get_table_names())
+    assert set(Base.metadata.tables).issubset(tables)
+
+
+def test_existing_create_all_schema_is_adopted(engine):
+    """Test that databases created by create_all are stamped, not re-created"""
+    Base.metadata.create_all(bind=engine)
+
+    revision = run_migrations(engine)
+
+    assert revision == get_head_revision()
+
+
+def test_version_check_accepts_newer_and_rejects_older_revisions(engine):
+    """Test that a rolling deploy's newer schema is accepted but an older one is not"""
+    run_migrations(engine)
+
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE alembic_version SET version_num = '9999_from_newer_build'"))
+    check_schema_version(engine)
+
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE alembic_version SET version_num = '0001'"))
+    with pytest.raises(RuntimeError):
+        check_schema_version(engine)
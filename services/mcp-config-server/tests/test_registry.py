@@ -2,9 +2,9 @@
 Tests for service registry
 """
 
+import json
 import pytest
 from src.registry.service_registry import ServiceRegistry
-from pathlib import Path
 
 
 def test_registry_initialization():
@@ -50,3 +50,287 @@ def test_search_marketplace():
     results = registry.search_marketplace(category="lead_generation")
     assert isinstance(results, list)
 
+
+
+@pytest.fixture
+def definitions_dir(tmp_path):
+    """Small set of service definitions for search tests"""
+    definitions = {
+        "alpha_mail": ("Alpha Mail", "email", "Transactional email delivery", ["send_email"], 50, True),
+        "beta_leads": ("Beta Leads", "lead_generation", "Find leads and verify email addresses", ["find_emails"], 90, True),
+        "gamma_enrich": ("Gamma", "data_enrichment", "Company enrichment", ["enrich_company"], 70, True),
+        "delta_old": ("Delta Mail", "email", "Legacy email service", ["send_email"], 99, False),
+    }
+    for service_id, (name, category, description, capabilities, score, active) in definitions.items():
+        (tmp_path / f"{service_id}.yaml").write_text(
+            f"id: {service_id}\n"
+            f"name: {name}\n"
+            f"category: {category}\n"
+            f"description: {description}\n"
+            f"is_active: {str(active).lower()}\n"
+            f"popularity_score: {score}\n"
+            f"capabilities: [{', '.join(capabilities)}]\n"
+        )
+    return tmp_path
+
+
+def test_search_ranks_name_matches_first(definitions_dir):
+    """Test that name matches outrank description matches"""
+    registry = ServiceRegistry(str(definitions_dir))
+
+    results = registry.list_services(search_query="mail")
+
+    assert [s["id"] for s in results] == ["alpha_mail", "beta_leads"]
+
+
+def test_search_matches_prefixes_and_capabilities(definitions_dir):
+    """Test prefix matching across name, description and capabilities"""
+    registry = ServiceRegistry(str(definitions_dir))
+
+    assert [s["id"] for s in registry.search_marketplace(use_case="enrich")] == ["gamma_enrich"]
+    assert [s["id"] for s in registry.search_marketplace(use_case="verify email")] == ["beta_leads"]
+    assert registry.search_marketplace(use_case="nonexistent") == []
+
+
+def test_search_excludes_inactive_services(definitions_dir):
+    """Test that inactive services are only returned when requested"""
+    registry = ServiceRegistry(str(definitions_dir))
+
+    assert "delta_old" not in [s["id"] for s in registry.list_services()]
+    assert "delta_old" in [s["id"] for s in registry.list_services(active_only=False)]
+
+
+def test_search_pagination_and_facets(definitions_dir):
+    """Test pagination totals and category facet counts"""
+    registry = ServiceRegistry(str(definitions_dir))
+
+    result = registry.search(limit=2, offset=1)
+
+    # Default order is by popularity
+    assert [s["id"] for s in result["services"]] == ["gamma_enrich", "alpha_mail"]
+    assert result["total"] == 3
+    assert result["facets"]["category"] == {
+        "email": 1,
+        "lead_generation": 1,
+        "data_enrichment": 1
+    }
+
+    # Facets ignore the category filter itself
+    filtered = registry.search(category="email")
+    assert filtered["total"] == 1
+    assert filtered["facets"]["category"]["lead_generation"] == 1
+
+
+def test_snapshot_skips_parsing_unchanged_files(definitions_dir, monkeypatch):
+    """Test that a second startup loads definitions from the snapshot"""
+    ServiceRegistry(str(definitions_dir))
+    assert (definitions_dir / ".registry_snapshot.json").exists()
+
+    def fail_parse(self, yaml_file):
+        raise AssertionError(f"{yaml_file} should not be parsed")
+
+    monkeypatch.setattr(ServiceRegistry, "_load_definition", fail_parse)
+    registry = ServiceRegistry(str(definitions_dir))
+
+    assert registry.get_service("alpha_mail")["name"] == "Alpha Mail"
+    assert len(registry.list_services(active_only=False)) == 4
+
+
+def test_snapshot_round_trips_yaml_values():
+    """Test that non-string keys and dates survive the JSON snapshot"""
+    from datetime import date
+    from src.registry.service_registry import _decode_value, _encode_value
+
+    definition = {"error_messages": {401: "Bad key"}, "since": date(2024, 1, 2), "tags": ["a", {"__snapshot_x": 1}]}
+    assert _decode_value(json.loads(json.dumps(_encode_value(definition)))) == definition
+
+
+def test_refresh_reloads_only_changed_files(definitions_dir, monkeypatch):
+    """Test incremental reload of added, changed and removed definitions"""
+    registry = ServiceRegistry(str(definitions_dir))
+    version = registry.version
+    assert registry.refresh() is False
+
+    (definitions_dir / "alpha_mail.yaml").write_text("id: alpha_mail\nname: Alpha Mail Pro\ncategory: email\n")
+    (definitions_dir / "epsilon.yaml").write_text("id: epsilon\nname: Epsilon\ncategory: analytics\n")
+    (definitions_dir / "gamma_enrich.yaml").unlink()
+
+    parsed = []
+    original = ServiceRegistry._load_definition
+
+    def tracking_parse(self, yaml_file):
+        parsed.append(yaml_file.name)
+        return original(self, yaml_file)
+
+    monkeypatch.setattr(ServiceRegistry, "_load_definition", tracking_parse)
+    assert registry.refresh() is True
+
+    assert sorted(parsed) == ["alpha_mail.yaml", "epsilon.yaml"]
+    assert registry.version == version + 1
+    assert registry.get_service("alpha_mail")["name"] == "Alpha Mail Pro"
+    assert registry.get_service("gamma_enrich") is None
+    assert [s["id"] for s in registry.list_services(search_query="epsilon")] == ["epsilon"]
+
+
+def test_response_cache_invalidates_on_new_registry_version():
+    """Test that cached responses are rebuilt after a registry reload"""
+    from src.registry.response_cache import ResponseCache
+
+    cache = ResponseCache(max_entries=2)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b'{"services": []}'
+
+    first = cache.get(("marketplace",), 1, build)
+    assert cache.get(("marketplace",), 1, build) == first
+    assert len(builds) == 1
+
+    cache.get(("marketplace",), 2, build)
+    assert len(builds) == 2
+
+
+def test_usage_flush_updates_scores_and_ranking(definitions_dir, tmp_path):
+    """Test that counted usage is flushed to the database and re-ranks services"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.database.connection import Base
+    from src.database.models import ServiceRegistry as ServiceRegistryRow
+    from src.registry.popularity import UsageTracker
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'popularity.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    tracker = UsageTracker(ServiceRegistry(str(definitions_dir)), session_factory=session_factory)
+    assert [service_id for service_id, _ in tracker.ranking.top(2)] == ["delta_old", "beta_leads"]
+
+    tracker.record("alpha_mail", "configuration", 3)
+    tracker.record("alpha_mail", "action", 50)
+    tracker.flush()
+    assert tracker.ranking.top(1) == [("alpha_mail", 130)]
+
+    # Existing rows are incremented rather than recreated
+    tracker.record("alpha_mail", "action", 5)
+    tracker.flush()
+    assert tracker.ranking.score("alpha_mail") == 135
+    with session_factory() as db:
+        assert db.get(ServiceRegistryRow, "alpha_mail").popularity_score == 135
+
+
+def test_usage_flush_keeps_counts_when_it_fails(definitions_dir, tmp_path):
+    """Test that failed flushes keep pending counts and integrity errors are retried once"""
+    import redis
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.orm import sessionmaker
+    from src.database.connection import Base
+    from src.registry.popularity import UsageTracker
+
+    class FailingPipeline:
+        def hincrby(self, *args):
+            pass
+
+        def execute(self):
+            raise redis.ConnectionError("connection lost")
+
+    class FailingRedis:
+        def pipeline(self):
+            return FailingPipeline()
+
+    registry = ServiceRegistry(str(definitions_dir))
+    tracker = UsageTracker(registry, redis_client=FailingRedis(), session_factory=lambda: None)
+    tracker.record("alpha_mail", "configuration")
+    with pytest.raises(redis.ConnectionError):
+        tracker.flush()
+    assert tracker._take_pending() == {"alpha_mail": 10}
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'popularity.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    commits = []
+
+    def failing_session():
+        db = session_factory()
+
+        def commit():
+            commits.append(1)
+            raise IntegrityError("INSERT", {}, Exception("constraint"))
+
+        db.commit = commit
+        return db
+
+    tracker = UsageTracker(registry, session_factory=failing_session)
+    tracker.record("alpha_mail", "configuration")
+    with pytest.raises(IntegrityError):
+        tracker.flush()
+    assert len(commits) == 2
+    assert tracker._take_pending() == {"alpha_mail": 10}
+
+
+def test_redis_flush_drains_counts_once_and_respects_other_locks(definitions_dir, tmp_path):
+    """Test that shared counts leave Redis before they are applied and other replicas' locks are kept"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.database.connection import Base
+    from src.registry.popularity import FLUSH_LOCK_KEY, PENDING_KEY, UsageTracker
+
+    class FakeRedis:
+        """Just enough of redis.Redis for the tracker's flush"""
+
+        def __init__(self):
+            self.data = {}
+
+        def pipeline(self):
+            client, calls = self, []
+
+            class Pipeline:
+                def __getattr__(self, name):
+                    return lambda *args: calls.append((name, args))
+
+                def execute(self):
+                    return [getattr(client, name)(*args) for name, args in calls]
+
+            return Pipeline()
+
+        def hincrby(self, key, field, amount):
+            self.data.setdefault(key, {})[field] = self.data.get(key, {}).get(field, 0) + amount
+
+        def hgetall(self, key):
+            return {field: str(value) for field, value in self.data.get(key, {}).items()}
+
+        def delete(self, *keys):
+            for key in keys:
+                self.data.pop(key, None)
+
+        def set(self, key, value, nx=False, ex=None):
+            if nx and key in self.data:
+                return False
+            self.data[key] = value
+            return True
+
+        def eval(self, script, numkeys, key, token):
+            if self.data.get(key) == token:
+                self.delete(key)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'popularity.db'}")
+    Base.metadata.create_all(bind=engine)
+    client = FakeRedis()
+    tracker = UsageTracker(
+        ServiceRegistry(str(definitions_dir)), redis_client=client, session_factory=sessionmaker(bind=engine)
+    )
+
+    static_score = tracker.ranking.score("alpha_mail")
+
+    # Another replica holds the lock: counts are shared but not applied, and its lock survives
+    client.data[FLUSH_LOCK_KEY] = "other-replica"
+    tracker.record("alpha_mail", "configuration")
+    tracker.flush()
+    assert client.data[PENDING_KEY] == {"alpha_mail": 10}
+    assert client.data[FLUSH_LOCK_KEY] == "other-replica"
+
+    client.delete(FLUSH_LOCK_KEY)
+    tracker.flush()
+    assert tracker.ranking.score("alpha_mail") == static_score + 10
+    assert PENDING_KEY not in client.data and FLUSH_LOCK_KEY not in client.data
@@ -0,0 +1,93 @@
+"""
+Tests for connection test retention and rollups
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.database.connection import Base
+from src.database.models import ServiceConfiguration, ConnectionTest, ConnectionTestRollup
+from src.database.retention import rollup_connection_tests, prune_connection_tests
+
+
+NOW = datetime(2026, 10, 19, 12, 30)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Create a SQLite database with two configurations"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        for service_id in ("sendgrid", "hunter_io"):
+            db.add(ServiceConfiguration(service_id=service_id, config_name="default", encrypted_credentials=b"x"))
+        db.commit()
+    return factory
+
+
+def add_tests(session_factory, configuration_id, tested_at, durations, failures=0):
+    with session_factory() as db:
+        for i, duration in enumerate(durations):
+            db.add(ConnectionTest(
+                configuration_id=configuration_id,
+                test_status="failed" if i < failures else "success",
+                test_duration_ms=duration,
+                tested_at=tested_at
+            ))
+        db.commit()
+
+
+def test_rollup_aggregates_completed_hours_once(session_factory):
+    """Test hourly success counts and duration percentiles per service"""
+    add_tests(session_factory, 1, NOW - timedelta(hours=2), list(range(10, 210, 10)), failures=5)
+    add_tests(session_factory, 2, NOW - timedelta(hours=2), [300])
+    add_tests(session_factory, 1, NOW - timedelta(hours=30), [50, 70])
+    add_tests(session_factory, 1, NOW, [999])  # Current hour: not complete yet
+
+    assert rollup_connection_tests(session_factory, now=NOW) == 3
+
+    with session_factory() as db:
+        rollups = {
+            (r.service_id, r.hour): r
+            for r in db.query(ConnectionTestRollup).all()
+        }
+    sendgrid = rollups[("sendgrid", datetime(2026, 10, 19, 10))]
+    assert (sendgrid.test_count, sendgrid.success_count) == (20, 15)
+    assert (sendgrid.p50_duration_ms, sendgrid.p95_duration_ms) == (100, 190)
+    assert rollups[("hunter_io", datetime(2026, 10, 19, 10))].p95_duration_ms == 300
+    assert rollups[("sendgrid", datetime(2026, 10, 18, 6))].test_count == 2
+
+    # Already rolled up hours are skipped; the current hour follows once complete
+    assert rollup_connection_tests(session_factory, now=NOW) == 0
+    assert rollup_connection_tests(session_factory, now=NOW + timedelta(hours=1)) == 1
+
+
+def test_rollup_waits_for_late_commits_of_the_previous_hour(session_factory):
+    """Test that an hour is only rolled up after the grace period, so late commits are counted"""
+    just_after_hour = datetime(2026, 10, 19, 12, 5)
+    add_tests(session_factory, 1, datetime(2026, 10, 19, 11, 50), [100])
+
+    assert rollup_connection_tests(session_factory, now=just_after_hour, grace_seconds=900) == 0
+
+    # Stamped before the hour ended, committed after it
+    add_tests(session_factory, 1, datetime(2026, 10, 19, 11, 59), [200])
+    later = just_after_hour + timedelta(minutes=15)
+    assert rollup_connection_tests(session_factory, now=later, grace_seconds=900) == 1
+    with session_factory() as db:
+        assert db.query(ConnectionTestRollup).one().test_count == 2
+
+
+def test_prune_deletes_old_history_in_batches(session_factory):
+    """Test that only rows past the retention period are deleted"""
+    add_tests(session_factory, 1, NOW - timedelta(days=40), [10] * 5)
+    add_tests(session_factory, 2, NOW - timedelta(days=1), [10] * 3)
+
+    deleted = prune_connection_tests(
+        session_factory, retention_days=30, batch_size=2, pause_seconds=0, now=NOW
+    )
+
+    assert deleted == 5
+    with session_factory() as db:
+        assert db.query(ConnectionTest).count() == 3
@@ -1,25 +1,108 @@
 """
-Debug logging helper - safe logging that doesn't crash if file can't be written
+Debug logging helper - structured, non-blocking debug event logging
+
+Events are put on an in-memory queue and written as JSON lines by a
+background listener thread, so callers never block on file I/O.
+Logging is disabled unless DEBUG_LOG_PATH is set, in which case
+debug_log() returns immediately.
+
+Environment:
+    DEBUG_LOG_PATH: Output file for JSON-lines events (unset = disabled)
+    DEBUG_LOG_LEVEL: Minimum level to record (default: DEBUG)
+    DEBUG_LOG_SAMPLE_RATE: Fraction of events to keep, 0.0-1.0 (default: 1.0)
+
+Kept identical to services/auth-service/src/debug_log.py: each service
+is built from its own directory (see its Dockerfile), so nothing outside
+it can be imported at runtime. Change both copies together.
 """
+import atexit
 import json
+import logging
+import logging.handlers
+import math
 import os
+import queue
+import random
+import time
+
+LOG_PATH = os.getenv("DEBUG_LOG_PATH", "")
+LOG_LEVEL = os.getenv("DEBUG_LOG_LEVEL", "DEBUG").upper()
+
+_logger = logging.getLogger("debug_events")
+_logger.propagate = False
+_listener = None
+
+
+def _parse_sample_rate(value: str) -> float:
+    """Sampling fraction clamped to 0.0-1.0; a malformed value keeps every event"""
+    try:
+        rate = float(value)
+        if math.isnan(rate):
+            raise ValueError(value)
+    except ValueError:
+        logging.getLogger(__name__).warning(f"Invalid DEBUG_LOG_SAMPLE_RATE {value!r}, using 1.0")
+        return 1.0
+    if not 0.0 <= rate <= 1.0:
+        logging.getLogger(__name__).warning(f"DEBUG_LOG_SAMPLE_RATE {value!r} outside 0.0-1.0, clamping")
+    return min(max(rate, 0.0), 1.0)
+
+
+SAMPLE_RATE = _parse_sample_rate(os.getenv("DEBUG_LOG_SAMPLE_RATE", "1.0"))
+
+
+class _JSONLineFormatter(logging.Formatter):
+    """Render the structured event attached to a record as one JSON line"""
 
-LOG_PATH = '/Users/jimmy/Documents/Repos/Private_Repos/Marketing_Automation_Pipeline/.cursor/debug.log'
+    def format(self, record):
+        return json.dumps(getattr(record, "event", {"message": record.getMessage()}), default=str)
+
+
+def _start_listener() -> bool:
+    """Attach the queue handler and start the writer thread if enabled"""
+    global _listener
+    if not LOG_PATH:
+        return False
+
+    try:
+        log_dir = os.path.dirname(LOG_PATH)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.FileHandler(LOG_PATH, delay=True)
+    except OSError:
+        return False  # Don't crash the service over debug logging
+
+    file_handler.setFormatter(_JSONLineFormatter())
+
+    event_queue = queue.SimpleQueue()
+    _logger.addHandler(logging.handlers.QueueHandler(event_queue))
+    level = logging.getLevelName(LOG_LEVEL)
+    _logger.setLevel(level if isinstance(level, int) else logging.DEBUG)
+
+    _listener = logging.handlers.QueueListener(event_queue, file_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return True
+
+
+ENABLED = _start_listener()
+
+
+def debug_log(session_id, run_id, hypothesis_id, location, message, data=None, level=logging.DEBUG):
+    """Queue a debug log entry (no-op unless DEBUG_LOG_PATH is set)"""
+    if not ENABLED or not _logger.isEnabledFor(level):
+        return
+    if SAMPLE_RATE < 1.0 and random.random() >= SAMPLE_RATE:
+        return
 
-def debug_log(session_id, run_id, hypothesis_id, location, message, data=None):
-    """Safely write debug log entry"""
     try:
-        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-        with open(LOG_PATH, 'a') as f:
-            f.write(json.dumps({
-                "sessionId": session_id,
-                "runId": run_id,
-                "hypothesisId": hypothesis_id,
-                "location": location,
-                "message": message,
-                "data": data or {},
-                "timestamp": int(__import__('time').time() * 1000)
-            }) + '\n')
+        _logger.log(level, message, extra={"event": {
+            "sessionId": session_id,
+            "runId": run_id,
+            "hypothesisId": hypothesis_id,
+            "location": location,
+            "message": message,
+            "data": data or {},
+            "timestamp": int(time.time() * 1000)
+        }})
     except Exception:
         pass  # Silently fail - don't crash the service
-
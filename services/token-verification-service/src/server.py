@@ -40,39 +40,17 @@ app.add_middleware(
 @app.get("/health")
 async def health():
     """Health check"""
-    # #region agent log
-    try:
-        from .debug_log import debug_log
-        debug_log("debug-session", "health", "H2,H3,H5", "token-verification-service/src/server.py:40", "Health check endpoint called", {"service": "token-verification-service"})
-    except Exception:
-        pass
-    # #endregion
     networks_status = {}
     for network in ['ethereum', 'polygon', 'arbitrum']:
         client = web3_client.get_client(network)
-        # #region agent log
-        try:
-            from .debug_log import debug_log
-            debug_log("debug-session", "health", "H5", "token-verification-service/src/server.py:44", "Checking network connection in health check", {"network": network, "has_client": client is not None})
-        except Exception:
-            pass
-        # #endregion
         networks_status[network] = client.is_connected() if client else False
     
-    result = {
+    return {
         "status": "healthy",
         "service": "token-verification-service",
         "networks": networks_status,
         "cache_enabled": token_cache.enabled
     }
-    # #region agent log
-    try:
-        from .debug_log import debug_log
-        debug_log("debug-session", "health", "H2,H3", "token-verification-service/src/server.py:52", "Health check response prepared", {"networks_status": networks_status, "cache_enabled": token_cache.enabled})
-    except Exception:
-        pass
-    # #endregion
-    return result
 
 
 @app.post("/v1/verify-token", response_model=TokenVerificationResponse)
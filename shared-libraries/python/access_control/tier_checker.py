@@ -3,7 +3,8 @@ Tier checking utilities
 """
 
 import httpx
-from typing import Optional, Dict
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
 import os
 import logging
 
@@ -47,6 +48,10 @@ class TierChecker:
     def __init__(self):
         self.auth_service_url = os.getenv('AUTH_SERVICE_URL', 'http://auth-service:8001')
         self.token_verification_url = os.getenv('TOKEN_VERIFICATION_URL', 'http://token-verification-service:8002')
+        # user_id -> (etag, tier) for conditional revalidation against auth service,
+        # least recently used first and bounded so it cannot grow with the user base
+        self._tier_etags: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.max_tier_etags = int(os.getenv('TIER_ETAG_CACHE_SIZE', '10000'))
     
     async def get_user_tier(self, user_id: str, wallet_address: Optional[str] = None) -> str:
         """
@@ -59,16 +64,29 @@ class TierChecker:
         Returns:
             Tier string (free, bronze, silver, gold)
         """
-        # First, try to get tier from auth service
+        # First, try to get tier from auth service (revalidating any cached ETag)
         try:
+            headers = {}
+            cached = self._tier_etags.get(user_id)
+            if cached:
+                self._tier_etags.move_to_end(user_id)
+                headers['If-None-Match'] = cached[0]
+            
             async with httpx.AsyncClient() as client:
                 response = await client.get(
                     f"{self.auth_service_url}/v1/users/{user_id}/tier",
+                    headers=headers,
                     timeout=5.0
                 )
+                if response.status_code == 304 and cached:
+                    return cached[1]
                 if response.status_code == 200:
                     data = response.json()
-                    return data.get('tier', 'free')
+                    tier = data.get('tier', 'free')
+                    etag = response.headers.get('etag')
+                    if etag:
+                        self._remember_etag(user_id, etag, tier)
+                    return tier
         except Exception as e:
             logger.warning(f"Error getting tier from auth service: {str(e)}")
         
@@ -96,6 +114,13 @@ class TierChecker:
         
         return 'free'
     
+    def _remember_etag(self, user_id: str, etag: str, tier: str):
+        """Cache a user's tier ETag, evicting the least recently used entries"""
+        self._tier_etags[user_id] = (etag, tier)
+        self._tier_etags.move_to_end(user_id)
+        while len(self._tier_etags) > self.max_tier_etags:
+            self._tier_etags.popitem(last=False)
+    
     def check_tier_access(self, user_tier: str, required_tier: str) -> bool:
         """
         Check if user tier meets required tier